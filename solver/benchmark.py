@@ -0,0 +1,203 @@
+'''
+Benchmark harness comparing the solvers over directories of DIMACS files.
+
+Every (solver, instance) pair runs in its own subprocess with a timeout, so a
+crash, a runaway recursion or memory growth cannot affect the other runs.
+The worker reports its statistics as JSON on stdout.
+
+    python -m solver.benchmark tests/cnf_files --timeout 60 --csv results.csv --json results.json
+'''
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+import argparse
+import csv
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+# Solver name -> (module, class, constructor options); the first three names match the comparative analysis notebook
+SOLVERS = {
+    'CDCL': ('solver.cdcl', 'CDCL', {}),
+    'CDCL_No_VSIDS': ('solver.cdcl_without_vsids', 'CDCL', {}),
+    'DPLL': ('solver.dpll', 'DPLL', {}),
+    'CDCL_Chrono': ('solver.cdcl', 'CDCL', {'chrono_threshold': 100}),
+}
+
+FIELDS = ['solver', 'instance', 'status', 'wall_time', 'solve_time', 'peak_rss',
+          'decisions', 'conflicts', 'propagations',
+          'decisions_per_sec', 'conflicts_per_sec', 'propagations_per_sec', 'error']
+
+
+def peak_rss() -> int:
+    '''
+    Peak resident set size of this process in bytes
+    '''
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == 'darwin' else usage * 1024 # Linux reports KiB
+
+
+def run_instance(solver_name: str, path: str) -> Dict[str, Any]:
+    '''
+    Parses and solves one instance in the current process. Used by the worker subprocess
+    '''
+    from .dimacs_parser import DIMACS_Parser
+    module, class_name, options = SOLVERS[solver_name]
+    solver_class = getattr(importlib.import_module(module), class_name)
+
+    cnf = DIMACS_Parser(path).cnf
+    solver = solver_class(cnf, **options)
+    start = time.perf_counter()
+    result = solver.solve()
+    solve_time = time.perf_counter() - start
+
+    stats = {
+        'status': 'SAT' if result else 'UNSAT' if result is False else 'UNKNOWN',
+        'solve_time': solve_time,
+        'peak_rss': peak_rss(),
+        'decisions': solver.num_decisions,
+        'conflicts': solver.num_conflicts,
+        'propagations': solver.num_propagations,
+    }
+    for counter in ('decisions', 'conflicts', 'propagations'):
+        stats[f'{counter}_per_sec'] = stats[counter] / solve_time if solve_time > 0 else 0.0
+    return stats
+
+
+class Benchmark:
+    '''
+    Runs every solver on every instance and collects one row per run.
+
+    Status is SAT, UNSAT, UNKNOWN, TIMEOUT or ERROR. `wall_time` is measured
+    around the subprocess (interpreter start and parsing included),
+    `solve_time` only around `solve`. The timeout applies to `wall_time`, so
+    PAR-2 scores and cactus data use `wall_time` as well.
+    '''
+    def __init__(self, instances: List[str], solvers: Optional[List[str]] = None, timeout: float = 60.0):
+        self.instances = instances
+        self.solvers = solvers or list(SOLVERS)
+        for name in self.solvers:
+            if name not in SOLVERS:
+                raise ValueError(f"Unknown solver {name!r}, expected one of {list(SOLVERS)}")
+        self.timeout = timeout
+        self.rows: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def find_instances(paths: List[str]) -> List[str]:
+        '''
+        Expands directories to the (possibly compressed) .cnf files below them
+        '''
+        instances = []
+        for path in map(Path, paths):
+            if path.is_dir():
+                instances.extend(sorted(str(p) for p in path.rglob('*')
+                                        if p.is_file() and '.cnf' in p.suffixes))
+            else:
+                instances.append(str(path))
+        return instances
+
+    def run_one(self, solver_name: str, path: str) -> Dict[str, Any]:
+        row = {'solver': solver_name, 'instance': path}
+        env = dict(os.environ)
+        package_root = str(Path(__file__).resolve().parents[1])
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+        start = time.perf_counter()
+        try:
+            process = subprocess.run([sys.executable, '-m', 'solver.benchmark', '--worker', solver_name, path],
+                                     capture_output=True, text=True, timeout=self.timeout, env=env)
+        except subprocess.TimeoutExpired:
+            row.update(status='TIMEOUT', wall_time=time.perf_counter() - start)
+            return row
+        row['wall_time'] = time.perf_counter() - start
+        if process.returncode != 0:
+            lines = process.stderr.strip().splitlines()
+            row.update(status='ERROR', error=lines[-1] if lines else f"exit code {process.returncode}")
+            return row
+        row.update(json.loads(process.stdout.strip().splitlines()[-1]))
+        return row
+
+    def run(self, progress: bool = False) -> List[Dict[str, Any]]:
+        for path in self.instances:
+            for solver_name in self.solvers:
+                row = self.run_one(solver_name, path)
+                self.rows.append(row)
+                if progress:
+                    print(f"{solver_name:>14} {row['status']:>7} {row['wall_time']:8.2f}s  {path}", flush=True)
+        return self.rows
+
+    def solved(self, row: Dict[str, Any]) -> bool:
+        return row['status'] in ('SAT', 'UNSAT')
+
+    def par2_scores(self) -> Dict[str, float]:
+        '''
+        Mean PAR-2 score per solver: wall time for solved instances, twice the timeout otherwise
+        '''
+        scores = {}
+        for name in self.solvers:
+            times = [row['wall_time'] if self.solved(row) else 2 * self.timeout
+                     for row in self.rows if row['solver'] == name]
+            scores[name] = sum(times) / len(times) if times else 0.0
+        return scores
+
+    def cactus_data(self) -> Dict[str, List[List[float]]]:
+        '''
+        Per solver, [number of instances solved, time] points: the k-th fastest
+        wall time against k. Plotting them gives the cactus plot
+        '''
+        data = {}
+        for name in self.solvers:
+            times = sorted(row['wall_time'] for row in self.rows if row['solver'] == name and self.solved(row))
+            data[name] = [[k, t] for k, t in enumerate(times, 1)]
+        return data
+
+    def summary(self) -> Dict[str, Any]:
+        par2 = self.par2_scores()
+        return {name: {'solved': sum(1 for row in self.rows if row['solver'] == name and self.solved(row)),
+                       'runs': sum(1 for row in self.rows if row['solver'] == name),
+                       'par2': par2[name]}
+                for name in self.solvers}
+
+    def write_csv(self, path: str):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in self.rows:
+                writer.writerow({field: row.get(field, '') for field in FIELDS})
+
+    def write_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({'timeout': self.timeout, 'runs': self.rows, 'summary': self.summary(),
+                       'cactus': self.cactus_data()}, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='+', help='.cnf files or directories containing them')
+    parser.add_argument('--solvers', nargs='+', default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument('--timeout', type=float, default=60.0, help='seconds per run')
+    parser.add_argument('--csv', help='write one row per run to this file')
+    parser.add_argument('--json', help='write runs, summary and cactus data to this file')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        # Worker subprocess: paths is [solver name, instance]
+        solver_name, path = args.paths
+        print(json.dumps(run_instance(solver_name, path)))
+        return
+
+    benchmark = Benchmark(Benchmark.find_instances(args.paths), args.solvers, args.timeout)
+    benchmark.run(progress=True)
+    for name, stats in benchmark.summary().items():
+        print(f"{name}: solved {stats['solved']}/{stats['runs']}, PAR-2 {stats['par2']:.2f}")
+    if args.csv:
+        benchmark.write_csv(args.csv)
+    if args.json:
+        benchmark.write_json(args.json)
+
+
+if __name__ == '__main__':
+    main()
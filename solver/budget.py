@@ -0,0 +1,66 @@
+from typing import Optional
+import time
+
+
+class Budget:
+    '''
+    Resource limits for one solve call.
+
+    `max_conflicts` and `max_propagations` count from the solver's counters at
+    the start of the call. `time_limit` is in seconds from the start of the
+    call, `deadline` an absolute time.monotonic() value. `cancel` is anything
+    with an is_set() method, e.g. a threading.Event or multiprocessing.Event.
+
+    Counters are compared on every check; the clock and the cancellation flag
+    are polled every `check_interval` checks to keep the cost per check low.
+    After a check fails, `reason` says which limit was hit.
+    '''
+    def __init__(self, max_conflicts: Optional[int] = None, max_propagations: Optional[int] = None,
+                 time_limit: Optional[float] = None, deadline: Optional[float] = None,
+                 cancel=None, check_interval: int = 64):
+        self.max_conflicts = max_conflicts
+        self.max_propagations = max_propagations
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.cancel = cancel
+        self.check_interval = check_interval
+        self.reason: Optional[str] = None
+
+    def start(self, solver):
+        inf = float('inf')
+        self.conflict_limit = inf if self.max_conflicts is None else solver.num_conflicts + self.max_conflicts
+        self.propagation_limit = (inf if self.max_propagations is None
+                                  else solver.num_propagations + self.max_propagations)
+        self.stop_at = inf if self.deadline is None else self.deadline
+        if self.time_limit is not None:
+            self.stop_at = min(self.stop_at, time.monotonic() + self.time_limit)
+        self.countdown = 0 # Poll the clock and the flag on the first check
+        self.reason = None
+
+    def exhausted(self, solver) -> bool:
+        if solver.num_conflicts >= self.conflict_limit:
+            self.reason = 'conflicts'
+        elif solver.num_propagations >= self.propagation_limit:
+            self.reason = 'propagations'
+        else:
+            self.countdown -= 1
+            if self.countdown > 0:
+                return False
+            self.countdown = self.check_interval
+            if self.cancel is not None and self.cancel.is_set():
+                self.reason = 'cancelled'
+            elif time.monotonic() >= self.stop_at:
+                self.reason = 'time'
+            else:
+                return False
+        return True
+
+
+def make_budget(max_conflicts: Optional[int] = None, max_propagations: Optional[int] = None,
+                time_limit: Optional[float] = None, deadline: Optional[float] = None, cancel=None) -> Optional[Budget]:
+    '''
+    Returns a Budget, or None if no limit is given
+    '''
+    if max_conflicts is None and max_propagations is None and time_limit is None and deadline is None and cancel is None:
+        return None
+    return Budget(max_conflicts, max_propagations, time_limit, deadline, cancel)
@@ -1,32 +1,101 @@
 from .cnf import CNFFormula, Clause
-from typing import Optional, List, Tuple, Dict
-
-class CDCL:
-    def __init__(self, cnf: CNFFormula):
-        self.cnf = cnf
-        self.assignments: Dict[int, bool] = {}
-        self.trail: List[int] = [] # List of (literal, decision_level, antecedent_clause)
-        self.decision_level = 0
-        self.tried_phase: Dict[int, bool] = {}
-        self.vsids_scores: Dict[int, float] = {i: 0.0 for i in range(1, cnf.num_vars + 1)}
-        self.decay_factor: float = 0.95  # or 0.95–0.99
+from .budget import Budget, make_budget
+from .clause_db import LearnedClause, LearnedClauseDB
+from .drat import DRATWriter
+from .evaluation import first_falsified
+from .inprocess import Inprocessor
+from .instrumentation import Instrumentation, elapsed_since
+from .phases import PhaseSelector
+from .propagation import WatchedLiterals
+from .restarts import make_restart_policy
+from .sharing import ClauseExchange
+from .state import SolverState, UNASSIGNED, TRUE, FALSE, lit_index, lit_dimacs
+from .vsids import VSIDS
+from array import array
+from time import perf_counter_ns
+from typing import Optional, List, Tuple, Dict, Any
+import json
+import random
+import time
+
+class CDCL(SolverState):
+    def __init__(self, cnf: CNFFormula, max_learned_clauses: Optional[int] = None,
+                 restart_policy: str = 'luby', default_phase: str = 'false', phase_saving: bool = True,
+                 target_phases: bool = False, rephase_interval: Optional[int] = None,
+                 seed: Optional[int] = None, vsids_decay: float = 0.95,
+                 exchange: Optional[ClauseExchange] = None, instrumentation: Optional[Instrumentation] = None,
+                 proof: Optional[DRATWriter] = None, chrono_threshold: Optional[int] = None,
+                 inprocessing: bool = False):
+        # Values, levels, reasons and the trail live in the arrays of SolverState
+        super().__init__(cnf.num_vars)
+        self.cnf = cnf # Learned clauses go to clause_db, never into cnf
+        self.clause_db = LearnedClauseDB(max_clauses=max_learned_clauses)
+        self.vsids = self.make_vsids(vsids_decay, seed)
+        self.restarts = make_restart_policy(restart_policy) # 'none', 'luby', 'geometric' or 'glucose'
+        self.phases = PhaseSelector(self, default=default_phase, saving=phase_saving, target=target_phases,
+                                    rephase_interval=rephase_interval, seed=seed)
         self.num_decisions = 0
         self.num_conflicts = 0
         self.num_propagations = 0
         self.num_learned_clauses = 0
+        self.num_restarts = 0
+        self.exchange = exchange # Shares learned clauses with parallel solvers, see sharing.py
+        self.instrumentation = instrumentation # Phase timers, progress reports, profiling
+        if proof is not None and exchange is not None:
+            raise ValueError("Clauses imported from other solvers cannot be justified in a DRAT proof")
+        # Chronological backtracking: jumps longer than this many levels go back one level only (None = never)
+        self.chrono_threshold = chrono_threshold
+        self.num_chrono_backtracks = 0
+        self.inprocessor = Inprocessor(self) if inprocessing else None # Runs after restarts, see inprocess.py
+        self.proof = proof # Learned and deleted clauses are written here (see drat.py); it refers to cnf plus added_clauses
+        self.solve_time = 0.0 # Seconds spent in solve, summed over calls
+        self.solve_start: Optional[float] = None
         self.max_decision_level = 0
+        self.num_learned_literals = 0
+        self.num_learned_literals_before_minimization = 0
+        self.seen = array('b', [0]) * (cnf.num_vars + 1) # Scratch marks for conflict analysis
 
+        # Watched-literal propagation over the solver's own copies of the clauses. Copying is
+        # deliberate: watching reorders literals and needs literal indices, and cnf's arena
+        # may be shared or read-only (shared memory, mmap), so it is only read once here
+        self.propagator = WatchedLiterals(self)
+        self.root_conflict: Optional[Clause] = None
+        for i in range(len(cnf)):
+            self.attach_clause(cnf.clause_literals(i))
 
-        
-        
+        # Incremental use: clauses added between solve calls and the assumptions of the last call
+        self.added_clauses: List[Clause] = []
+        self.assumptions: List[int] = [] # Literal indices
+        self.failed_assumptions: List[int] = [] # DIMACS literals
+        self.stop_reason: Optional[str] = None # Budget that stopped the last solve call
+
+    def attach_clause(self, literals: List[int]):
+        '''
+        Starts watching a clause given in DIMACS literals. Must be called at decision level 0
+        '''
+        literals = list(dict.fromkeys(literals)) # Drop duplicate literals
+        if any(-lit in literals for lit in literals):
+            return # Tautologies are always satisfied
+        conflict = self.propagator.add_clause(Clause([lit_index(lit) for lit in literals]))
+        if conflict is not None:
+            self.root_conflict = conflict
+
+    def check_literals(self, literals: List[int]):
+        for lit in literals:
+            if lit == 0 or abs(lit) > self.num_vars:
+                raise ValueError(f"Literal {lit} is not a literal over variables 1..{self.num_vars}")
+
+    def add_clause(self, literals: List[int]):
+        '''
+        Adds a clause (DIMACS literals) between solve calls. Learned clauses,
+        VSIDS scores and saved phases are kept; `cnf` is not modified
+        '''
+        self.check_literals(literals)
+        self.backjump(0)
+        self.added_clauses.append(Clause(list(literals)))
+        if self.root_conflict is None:
+            self.attach_clause(literals)
 
-    def literal_status(self, literal: int) -> Optional[bool]:
-        var = abs(literal)
-        if var not in self.assignments:
-            return None
-        value = self.assignments[var]
-        return value if literal > 0 else not value
-    
     def clause_status(self, clause: Clause) -> Optional[bool]:
         has_unassigned = False
         for lit in clause.literals:
@@ -40,253 +109,490 @@ class CDCL:
             return None
         return False
     
-    def find_unit_clauses(self):
-        '''
-        Clause is unit iff clause is NOT satisfied, exactly 1 literal unassigned and all other literals False
-        
-        Returns list of (unit_literal, clause) pairs
+    def assign(self, lit: int, antecedent: Optional[Clause] = None):
         '''
-        units = []
-        for clause in self.cnf.clauses:
-            unassigned_lit = None
-            all_false = True
-            
-            for lit in clause.literals:
-                status = self.literal_status(lit)
-                if status == True: # Not unit clause (Clause already True)
-                    all_false = False
-                    break
-                if status is None:
-                    if unassigned_lit == None:
-                        unassigned_lit = lit
-                    else: # Not unit clause (Multiple Unassigned literals)
-                        all_false = False
-                        break
-            if all_false and unassigned_lit is not None:
-                units.append((unassigned_lit, clause))
-        return units
-    
-    def assign(self, literal: int, antecedent: Optional[Clause] = None):
-        '''
-        Assigns a literal at the current decision level.
+        Assigns a literal index at the current decision level.
         Returns False if a conflict arises, else True
         '''
-        var = abs(literal)
-        value = literal > 0
-        if var in self.assignments:
-            if self.assignments[var] != value:
-                return False  # Conflict
-            return True  # Already assigned consistently
-        
-        self.assignments[var] = value
-        self.trail.append((literal, self.decision_level, antecedent))
+        value = self.values[lit]
+        if value != UNASSIGNED:
+            return value == TRUE  # False on conflict, True if already assigned consistently
+
+        if antecedent is not None and self.chrono_threshold is not None:
+            # The trail may mix levels, so the implied level is the highest among the other literals
+            level = 0
+            levels = self.levels
+            for q in antecedent.literals:
+                if q != lit and levels[q >> 1] > level:
+                    level = levels[q >> 1]
+            self.enqueue(lit, antecedent, level)
+        else:
+            self.enqueue(lit, antecedent)
         if antecedent is not None:
             self.num_propagations += 1
         return True
     
-    def unit_propagate(self):
-        while True:
-            units = self.find_unit_clauses()
-            if not units:
-                return None
-
-            for lit, clause in units:
-                status = self.clause_status(clause)
-                if status is False:
-                    # print(f"Conflict detected in unit_propagate! Clause: {clause.literals}")
-                    return clause
-                if status is None:
-                    # print(f"Unit propagate assigning literal {lit} from clause {clause.literals}")
-                    check = self.assign(lit, clause)
-                    
-                    if not check:
-                        # print(f"Conflict during assignment of literal {lit}")
-                        return clause
+    def unit_propagate(self) -> Optional[Clause]:
+        '''
+        Propagates all pending assignments using the watched-literal engine
+        Returns the conflicting clause, else None
+        '''
+        return self.propagator.propagate()
 
+    def pick_branch_variable(self) -> Optional[int]:
+        '''
+        Returns the unassigned variable with the highest VSIDS score, or None if all are assigned
+        '''
+        return self.vsids.pick(self.is_assigned)
 
-    
     def decide(self):
         """
         Makes a decision assignment at a new decision level using VSIDS.
         """
-        unassigned_vars = [v for v in range(1, self.cnf.num_vars + 1) if v not in self.assignments]
-        if not unassigned_vars:
+        var = self.pick_branch_variable()
+        if var is None:
             return  # Nothing to decide
-        
-        # Pick the variable with the highest VSIDS score
-        var = max(unassigned_vars, key=lambda v: self.vsids_scores[v])
-        
-        self.decision_level += 1
+
+        self.new_decision_level()
         self.num_decisions += 1
         self.max_decision_level = max(self.max_decision_level, self.decision_level)
-        # Flip phase if we've tried True before
-        value = True
-        if var in self.tried_phase:
-            value = not self.tried_phase[var]
-        self.tried_phase[var] = value
-        literal = var if value else -var
-        check = self.assign(literal)
+        value = self.phases.pick(var)
+        check = self.assign(var << 1 if value else (var << 1) | 1)
         assert check, "Conflict on decision assignment"
 
         
-    def find_conflict(self) -> Optional[Clause]:
+    def make_vsids(self, decay: float, seed: Optional[int]) -> Optional[VSIDS]:
         '''
-        Checks for conflicts in the current assignments
-        Returns the first conflicting clause found, else None
+        The decision heuristic's activity heap; subclasses that decide differently return None
         '''
-        for clause in self.cnf.clauses:
-            status = self.clause_status(clause)
-            if status == False:
-                return clause
-        return None
-    
+        vsids = VSIDS(self.num_vars, decay_factor=decay)  # or 0.95–0.99
+        if seed is not None:
+            vsids.randomize(random.Random(seed)) # Seeded solvers also differ in their first decisions
+        return vsids
+
     def backjump(self, level: int):
         # print(f"Backjumping from level {self.decision_level} to level {level}")
-        new_trail = []
-        new_assignments = {}
-        for lit, dl, antecedent in self.trail:
-            if dl <= level:
-                new_trail.append((lit, dl, antecedent))
-                new_assignments[abs(lit)] = lit > 0
-        self.trail = new_trail
-        self.assignments = new_assignments
-        self.decision_level = level
+        self.propagator.backtrack(self.backtrack(level))
+
+    def unassign(self, var: int):
+        super().unassign(var)
+        self.vsids.push(var) # Unassigned variables become decision candidates again
 
-        
-    def trail_level(self, var: int) -> int:
-        '''
-        Returns the decision level at which the variable was assigned
-        '''
-        for lit, dl, _ in reversed(self.trail):
-            if abs(lit) == var:
-                return dl
-        return -1  # Variable not assigned
 
-    def resolve(self, clause1: List[int], clause2: List[int], literal: int) -> List[int]:
-        '''
-        Resolves two clauses on the given pivot literal
-        Returns the resulting clause as a list of literals
-        '''
-        resolvent = set()
-        for lit in clause1:
-            if abs(lit) != abs(literal):
-                resolvent.add(lit)
-        for lit in clause2:
-            if abs(lit) != abs(literal):
-                resolvent.add(lit)
-        return list(resolvent)
-    
     def analyze_conflict(self, conflict_clause: Clause):
         '''
-        Performs conflict analysis and learns a new clause and backjump level
+        First-UIP conflict analysis.
+        Walks the trail backwards from the conflict, resolving away current-level
+        literals until only one (the first unique implication point) is left.
+        `seen` marks variables already in the clause being built, so every
+        variable is visited at most once.
+
+        Returns (learned clause as literal indices with the asserting literal first, backjump level)
         '''
         self.num_conflicts += 1
-        learned = conflict_clause.literals.copy()
+        seen = self.seen
+        levels = self.levels
+        trail = self.trail
+        learned = [0] # learned[0] is filled in with the negated UIP
+        pending = 0 # Current-level literals still to be resolved
+        lit = None
+        clause = conflict_clause
+        index = len(trail) - 1
         while True:
-            level_count = sum(1 for lit in learned if self.trail_level(abs(lit)) == self.decision_level)
-            if level_count <= 1:
+            if isinstance(clause, LearnedClause):
+                self.clause_db.bump(clause)
+            for q in clause.literals:
+                var = q >> 1
+                if seen[var] or levels[var] == 0 or (lit is not None and var == lit >> 1):
+                    continue # Level 0 literals are False forever and can be dropped
+                seen[var] = 1
+                if levels[var] >= self.decision_level:
+                    pending += 1
+                else:
+                    learned.append(q)
+
+            # Next marked current-level literal on the trail (lower levels may appear out of order)
+            while not seen[trail[index] >> 1] or levels[trail[index] >> 1] < self.decision_level:
+                index -= 1
+            lit = trail[index]
+            index -= 1
+            seen[lit >> 1] = 0
+            pending -= 1
+            if pending == 0:
                 break
-            # print('HERE')
-            for lit, dl, antecedent in reversed(self.trail):
-                # print('ANALYZE LOOP ', learned, lit, dl)
-                if abs(lit) in [abs(l) for l in learned] and dl == self.decision_level:
-                    if antecedent is not None:
-                        # print('TEST RESOLVE ENTER')
-                        learned = self.resolve(learned, antecedent.literals, abs(lit))
-                    break
-        backjump_level = max((self.trail_level(abs(lit)) for lit in learned if self.trail_level(abs(lit)) < self.decision_level), default=0)
+            clause = self.reasons[lit >> 1]
+        learned[0] = lit ^ 1
+
+        self.num_learned_literals_before_minimization += len(learned)
+        learned = self.minimize(learned)
+        self.num_learned_literals += len(learned)
+
+        # The backjump level is the highest level among the remaining literals
+        backjump_level = 0
+        for i in range(1, len(learned)):
+            if levels[learned[i] >> 1] > backjump_level:
+                backjump_level = levels[learned[i] >> 1]
+                learned[1], learned[i] = learned[i], learned[1]
         return learned, backjump_level
-    
-    def bump_vsids(self, clause_literals: List[int], constant: float = 1.0):
+
+    def minimize(self, learned: List[int]) -> List[int]:
+        '''
+        Recursive learned-clause minimization: removes every literal whose
+        reason clause is (transitively) implied by the other literals of the
+        learned clause. Expects `seen` to mark the variables of learned[1:] and
+        clears it before returning.
+        '''
+        # One bit per decision level (mod 32) lets lit_redundant give up early
+        abstract_levels = 0
+        for lit in learned[1:]:
+            abstract_levels |= 1 << (self.levels[lit >> 1] & 31)
+
+        to_clear = learned[1:]
+        minimized = [learned[0]]
+        for lit in learned[1:]:
+            if self.reasons[lit >> 1] is None or not self.lit_redundant(lit, abstract_levels, to_clear):
+                minimized.append(lit)
+
+        for lit in to_clear:
+            self.seen[lit >> 1] = 0
+        return minimized
+
+    def lit_redundant(self, lit: int, abstract_levels: int, to_clear: List[int]) -> bool:
+        '''
+        Checks whether a learned-clause literal is implied by the other marked
+        literals, following reason clauses depth first with an explicit stack.
+        Variables proven redundant stay marked in `seen` and are added to to_clear.
+        '''
+        seen = self.seen
+        levels = self.levels
+        reasons = self.reasons
+        stack = [lit]
+        top = len(to_clear)
+        while stack:
+            var = stack.pop() >> 1
+            for q in reasons[var].literals:
+                v = q >> 1
+                if v == var or seen[v] or levels[v] == 0:
+                    continue
+                if reasons[v] is not None and (1 << (levels[v] & 31)) & abstract_levels:
+                    seen[v] = 1
+                    stack.append(q)
+                    to_clear.append(q)
+                else:
+                    # Reached a decision or a level outside the clause: not redundant
+                    for j in range(top, len(to_clear)):
+                        seen[to_clear[j] >> 1] = 0
+                    del to_clear[top:]
+                    return False
+        return True
+
+    def bump_vsids(self, clause_literals: List[int]):
         for lit in clause_literals:
-            var = abs(lit)
-            self.vsids_scores[var] += constant  # or some constant increment
+            self.vsids.bump(lit >> 1)
 
     def decay_vsids(self):
-        for var in self.vsids_scores:
-            self.vsids_scores[var] *= self.decay_factor
+        self.vsids.decay()
+
+    def restart(self):
+        self.backjump(0)
+        self.restarts.on_restart()
+        self.num_restarts += 1
+
+    def import_shared_clauses(self) -> Optional[Clause]:
+        '''
+        Adds the clauses other solvers exported, at decision level 0.
+        Returns a clause that is falsified at level 0, else None
+        '''
+        for literals, lbd in self.exchange.receive():
+            clause = LearnedClause(literals, lbd)
+            if len(literals) > 1:
+                self.clause_db.add(clause)
+            conflict = self.propagator.add_clause(clause)
+            if conflict is not None:
+                return conflict
+        return None
+
+    def refuted(self):
+        '''
+        Called when a conflict at decision level 0 shows the clauses are unsatisfiable
+        '''
+        if not self.added_clauses:
+            self.cnf.satisfiable = False # Clauses added later are not part of cnf
+        if self.proof is not None:
+            self.proof.add([]) # The empty clause ends the proof
+            self.proof.flush()
+
+    def analyze_final(self, lit: int) -> List[int]:
+        '''
+        Called when assumption `lit` (literal index) is False. Walks the trail
+        back to find the assumptions that imply its negation.
+        Returns them together with lit itself, as DIMACS literals
+        '''
+        failed = [lit_dimacs(lit)]
+        if self.decision_level == 0 or self.levels[lit >> 1] == 0:
+            return failed
+        seen = self.seen
+        seen[lit >> 1] = 1
+        for i in range(len(self.trail) - 1, self.trail_lim[0] - 1, -1):
+            var = self.trail[i] >> 1
+            if not seen[var]:
+                continue
+            reason = self.reasons[var]
+            if reason is None:
+                failed.append(lit_dimacs(self.trail[i])) # Only assumptions are decided here
+            else:
+                for q in reason.literals[1:]:
+                    if self.levels[q >> 1] > 0:
+                        seen[q >> 1] = 1
+            seen[var] = 0
+        seen[lit >> 1] = 0
+        return failed
+
+    def chrono_conflict(self, conflict: Clause) -> Optional[Clause]:
+        '''
+        With chronological backtracking a conflict can lie below the current
+        decision level. Backtracks to the conflict level and watches the two
+        highest-level literals of the clause. If only one literal is at that
+        level, the clause is unit one level further down: it is used to imply
+        that literal and None is returned. Otherwise returns the conflict,
+        ready for analysis at the current level
+        '''
+        levels = self.levels
+        lits = conflict.literals
+        conflict_level = 0
+        num_at_level = 0
+        second_level = 0 # Highest level below conflict_level
+        for q in lits:
+            level = levels[q >> 1]
+            if level > conflict_level:
+                second_level = conflict_level
+                conflict_level = level
+                num_at_level = 1
+            elif level == conflict_level:
+                num_at_level += 1
+            elif level > second_level:
+                second_level = level
+        if conflict_level == 0:
+            self.backjump(0)
+            return conflict
+
+        rewatch = levels[lits[0] >> 1] != conflict_level or levels[lits[1] >> 1] != conflict_level
+        if rewatch:
+            self.propagator.remove_clauses([conflict])
+        if num_at_level == 1:
+            self.backjump(second_level)
+            self.propagator.add_clause(conflict) # Unit now: implies its conflict-level literal
+            return None
+        self.backjump(conflict_level)
+        if rewatch:
+            self.propagator.add_clause(conflict) # All False: watches the two highest-level literals
+        return conflict
+
+    def reduce_learned_clauses(self):
+        '''
+        Deletes low-value learned clauses, keeping glue clauses and current reasons
+        '''
+        reasons = self.reasons
+        deleted = self.clause_db.reduce(self.num_conflicts, lambda c: reasons[c.literals[0] >> 1] is c)
+        self.propagator.remove_clauses(deleted)
+        if self.proof is not None:
+            for clause in deleted:
+                self.proof.delete([lit_dimacs(lit) for lit in clause.literals])
+
+    @property
+    def avg_learned_clause_length(self) -> float:
+        return self.num_learned_literals / max(self.num_learned_clauses, 1)
+
+    @property
+    def avg_learned_clause_length_before_minimization(self) -> float:
+        return self.num_learned_literals_before_minimization / max(self.num_learned_clauses, 1)
 
-    def solve(self) -> bool:
+    def stats(self) -> Dict[str, Any]:
+        '''
+        Counters, rates and (with instrumentation timers) per-phase times, as a
+        JSON-serializable dict. Also valid while solve is running
+        '''
+        elapsed = self.solve_time + elapsed_since(self.solve_start)
+        stats = {
+            'time': elapsed,
+            'decisions': self.num_decisions,
+            'conflicts': self.num_conflicts,
+            'propagations': self.num_propagations,
+            'restarts': self.num_restarts,
+            'chrono_backtracks': self.num_chrono_backtracks,
+            'learned_clauses': self.num_learned_clauses,
+            'learned_clauses_kept': len(self.clause_db),
+            'deleted_clauses': self.clause_db.num_deleted,
+            'decision_level': self.decision_level,
+            'max_decision_level': self.max_decision_level,
+            'avg_learned_clause_length': self.avg_learned_clause_length,
+            'avg_learned_clause_length_before_minimization': self.avg_learned_clause_length_before_minimization,
+            'stop_reason': self.stop_reason,
+        }
+        for counter in ('decisions', 'conflicts', 'propagations'):
+            stats[f'{counter}_per_sec'] = stats[counter] / elapsed if elapsed > 0 else 0.0
+        if self.inprocessor is not None:
+            stats['inprocessing'] = self.inprocessor.stats()
+        if self.instrumentation is not None and self.instrumentation.timers:
+            stats['phase_time'] = self.instrumentation.phase_seconds()
+        return stats
+
+    def stats_json(self, **kwargs) -> str:
+        return json.dumps(self.stats(), **kwargs)
+
+    def solve(self, assumptions: Optional[List[int]] = None, max_conflicts: Optional[int] = None,
+              max_propagations: Optional[int] = None, time_limit: Optional[float] = None,
+              deadline: Optional[float] = None, cancel=None) -> Optional[bool]:
         """
-        CDCL Solver main loop with sparse debug prints.
-        Returns True if satisfiable, False if unsatisfiable.
+        Returns True if satisfiable, False if unsatisfiable, None (unknown) if
+        a budget ran out first (see budget.Budget; `stop_reason` says which).
+
+        `assumptions` (DIMACS literals) only hold for this call: they are decided
+        first, one per decision level. If they cannot all hold, False is returned
+        and `failed_assumptions` is the subset of them (the core) found to be
+        contradictory. The solver may be called again, also after add_clause,
+        and keeps its learned clauses, VSIDS scores and saved phases, so a call
+        stopped by its budget can be resumed by calling solve again.
         """
-        iteration = 0
+        budget = make_budget(max_conflicts, max_propagations, time_limit, deadline, cancel)
+        instrumentation = self.instrumentation
+        self.solve_start = time.perf_counter()
+        try:
+            if instrumentation is not None and instrumentation.profiler is not None:
+                return instrumentation.profiler.runcall(self.search, assumptions, budget)
+            return self.search(assumptions, budget)
+        finally:
+            self.solve_time += time.perf_counter() - self.solve_start
+            self.solve_start = None
 
-        while True:
-            iteration += 1
+    def search(self, assumptions: Optional[List[int]] = None, budget: Optional[Budget] = None) -> Optional[bool]:
+        """
+        CDCL Solver main loop
+        """
+        instrumentation = self.instrumentation
+        timers = instrumentation is not None and instrumentation.timers
+        phase_ns = instrumentation.phase_ns if timers else None
 
-            # Sparse debug prints (every 100 iterations)
-            # if iteration % 100 == 0:
-            #     print(f"\n--- ITERATION {iteration} ---")
-            #     print(f"Decision Level: {self.decision_level}")
-            #     print(f"Assignments: {len(self.assignments)} variables assigned")
-            #     print(f"Trail length: {len(self.trail)}")
-            #     print(f'------------------------ Number of Clauses: {len(self.cnf.clauses)} ------------------------')
+        assumptions = list(assumptions or ())
+        self.check_literals(assumptions)
+        self.backjump(0)
+        self.assumptions = [lit_index(lit) for lit in assumptions]
+        self.failed_assumptions = []
+        self.stop_reason = None
+        if budget is not None:
+            budget.start(self)
 
-            # --- Unit Propagation ---
-            conflict = self.unit_propagate()
+        if self.root_conflict is not None:
+            self.refuted()
+            return False
+
+        while True:
+            if budget is not None and budget.exhausted(self):
+                self.stop_reason = budget.reason
+                return None
 
-            if conflict is None:
-                conflict = self.find_conflict()
+            # --- Unit Propagation (also detects conflicts) ---
+            if timers:
+                start = perf_counter_ns()
+            conflict = self.unit_propagate()
+            if timers:
+                phase_ns['propagate'] += perf_counter_ns() - start
 
             if conflict is not None:
+                if self.chrono_threshold is not None and self.decision_level > 0:
+                    conflict = self.chrono_conflict(conflict)
+                    if conflict is None:
+                        continue
                 if self.decision_level == 0:
-                    self.cnf.satisfiable = False
+                    self.root_conflict = conflict
+                    self.refuted()
                     return False
 
+                if timers:
+                    start = perf_counter_ns()
                 learned_clause, backjump_level = self.analyze_conflict(conflict)
+                if self.proof is not None:
+                    self.proof.add([lit_dimacs(lit) for lit in learned_clause])
                 self.bump_vsids(learned_clause)
                 self.decay_vsids()
+                lbd = len({self.levels[lit >> 1] for lit in learned_clause})
+                self.phases.on_conflict(self.num_conflicts)
+                if timers:
+                    now = perf_counter_ns()
+                    phase_ns['analyze'] += now - start
+                    start = now
+                if self.chrono_threshold is not None and self.decision_level - backjump_level > self.chrono_threshold:
+                    backjump_level = self.decision_level - 1 # The learned clause still asserts at its own level
+                    self.num_chrono_backtracks += 1
                 self.backjump(backjump_level)
-                self.cnf.add_clause(Clause(learned_clause))
+                if timers:
+                    phase_ns['backjump'] += perf_counter_ns() - start
+                clause = LearnedClause(learned_clause, lbd)
+                if len(learned_clause) > 1:
+                    self.clause_db.add(clause)
+                self.clause_db.decay()
+                self.propagator.add_clause(clause) # Asserts the learned clause's unit literal
                 self.num_learned_clauses += 1
+                self.restarts.on_conflict(lbd)
+                if self.exchange is not None:
+                    self.exchange.export(learned_clause, lbd)
+                if instrumentation is not None and self.num_conflicts >= instrumentation.next_progress:
+                    instrumentation.on_conflict(self)
                 continue
 
-            
-            if conflict is not None:
-                if self.decision_level == 0:
-                    self.cnf.satisfiable = False
-                    # print("Conflict at level 0 → UNSAT")
-                    return False  # Unsatisfiable
-                
-                # Analyze conflict, backjump, learn clause
-                learned_clause, backjump_level = self.analyze_conflict(conflict)
-                self.bump_vsids(learned_clause)
-                self.decay_vsids()
-                # print(f"Learned clause: {learned_clause}, backjump to level {backjump_level}")
-
-                # if iteration % 10000 == 0:
-                #     print(f"Conflict detected! Learned clause: {learned_clause}, backjumping to level {backjump_level}")
-                self.backjump(backjump_level)
-                self.cnf.add_clause(Clause(learned_clause))
-                self.num_learned_clauses += 1
+            # --- Assumptions are decided first, one decision level each ---
+            if self.decision_level < len(self.assumptions):
+                lit = self.assumptions[self.decision_level]
+                value = self.values[lit]
+                if value == FALSE:
+                    self.failed_assumptions = self.analyze_final(lit)
+                    return False
+                self.new_decision_level() # Kept even if lit is already True, so levels match assumptions
+                if value != TRUE:
+                    self.assign(lit)
                 continue
 
             # --- Check if all variables are assigned ---
-            if len(self.assignments) == self.cnf.num_vars:
-                # Verify all clauses are satisfied
-                all_satisfied = True
-                for clause in self.cnf.clauses:
-                    status = self.clause_status(clause)
-                    if status is not True:
-                        all_satisfied = False
-                        # Treat this as a conflict
-                        conflict_clause = clause
-                        break
-
-                if all_satisfied:
-                    self.cnf.satisfiable = True
-                    # print("All variables assigned → SATISFIABLE!")
-                    return True
-                else:
+            if len(self.trail) == self.num_vars:
+                # Verify all clauses are satisfied; the original formula is checked in bulk
+                if (first_falsified(self.cnf, self.values) is not None
+                        or any(self.clause_status(clause) is not True for clause in self.added_clauses)):
                     # This should never happen if propagation is correct
                     raise RuntimeError(
                         "All variables assigned but formula unsatisfied — "
                         "conflict should have been detected during propagation"
                     )
+                self.cnf.satisfiable = True
+                return True
+
+            # --- Restart: keeps learned clauses and VSIDS scores ---
+            if self.decision_level > 0 and self.restarts.should_restart():
+                if timers:
+                    start = perf_counter_ns()
+                self.restart()
+                if timers:
+                    phase_ns['backjump'] += perf_counter_ns() - start
+                if self.exchange is not None:
+                    conflict = self.import_shared_clauses()
+                    if conflict is not None:
+                        self.root_conflict = conflict
+                        self.refuted()
+                        return False
+                if self.inprocessor is not None and self.inprocessor.should_run():
+                    conflict = self.inprocessor.run()
+                    if conflict is not None:
+                        self.root_conflict = conflict
+                        self.refuted()
+                        return False
+                continue
 
+            if self.clause_db.should_reduce(self.num_conflicts):
+                self.reduce_learned_clauses()
 
             # --- Make a decision for the next unassigned variable ---
+            if timers:
+                start = perf_counter_ns()
             self.decide()
+            if timers:
+                phase_ns['decide'] += perf_counter_ns() - start
 
@@ -0,0 +1,130 @@
+from .cnf import Clause
+from typing import Optional, List, Callable
+
+
+class LearnedClause(Clause):
+    '''
+    A clause learned during conflict analysis (literal indices), with the
+    scores the clause database uses to decide which clauses to keep
+    '''
+    __slots__ = ('lbd', 'activity', 'vivified')
+
+    def __init__(self, literals: List[int], lbd: int):
+        super().__init__(literals)
+        self.lbd = lbd # Literal block distance: number of distinct decision levels when learned
+        self.activity = 0.0
+        self.vivified = False # Set once inprocessing has tried to shorten the clause
+
+    def __repr__(self):
+        return f"LearnedClause({self.literals}, lbd={self.lbd})"
+
+
+class LearnedClauseDB:
+    '''
+    Learned clauses kept apart from the original formula.
+
+    Every clause is scored by its literal block distance (LBD) and by an
+    activity that is bumped whenever the clause takes part in conflict
+    analysis. Periodically (every `reduce_interval` conflicts, with the
+    interval growing by `reduce_increment` each time) or whenever more than
+    `max_clauses` clauses are stored, the database is reduced: glue clauses
+    (LBD <= `glue_lbd`) and clauses that are currently the reason for an
+    assignment are kept, and the worse half of the rest is deleted.
+
+    A reduction triggered by the cap also deletes the worst glue clauses if
+    that is needed to get back under it. Clauses that are reasons are never
+    deleted. If they alone exceed the cap, it is not checked again until the
+    database has doubled.
+    '''
+    ACTIVITY_LIMIT = 1e20
+
+    def __init__(self, reduce_interval: int = 2000, reduce_increment: int = 300,
+                 max_clauses: Optional[int] = None, glue_lbd: int = 2, decay_factor: float = 0.999):
+        self.clauses: List[LearnedClause] = []
+        self.reduce_interval = reduce_interval
+        self.reduce_increment = reduce_increment
+        self.max_clauses = max_clauses
+        self.glue_lbd = glue_lbd
+        self.decay_factor = decay_factor
+        self.increment = 1.0
+        self.next_reduce = reduce_interval
+        self.num_reductions = 0 # Periodic reductions, they set the schedule
+        self.num_cap_reductions = 0 # Reductions triggered by max_clauses
+        self.cap_limit = max_clauses # Size above which the cap triggers a reduction
+        self.num_deleted = 0
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def __iter__(self):
+        return iter(self.clauses)
+
+    def add(self, clause: LearnedClause):
+        self.clauses.append(clause)
+
+    def remove(self, clauses: List[LearnedClause]):
+        removed = set(map(id, clauses))
+        self.clauses = [c for c in self.clauses if id(c) not in removed]
+
+    def bump(self, clause: LearnedClause):
+        clause.activity += self.increment
+        if clause.activity > self.ACTIVITY_LIMIT:
+            for c in self.clauses:
+                c.activity *= 1.0 / self.ACTIVITY_LIMIT
+            self.increment *= 1.0 / self.ACTIVITY_LIMIT
+
+    def decay(self):
+        self.increment /= self.decay_factor
+
+    def should_reduce(self, num_conflicts: int) -> bool:
+        if self.cap_limit is not None and len(self.clauses) > self.cap_limit:
+            return True
+        return num_conflicts >= self.next_reduce
+
+    def reduce(self, num_conflicts: int, is_locked: Callable[[LearnedClause], bool]) -> List[LearnedClause]:
+        '''
+        Deletes the worse half of the non-glue, unlocked clauses, and if the
+        database is over the cap, as many more clauses as needed (worst first).
+        Returns the deleted clauses so the caller can stop watching them
+        '''
+        if num_conflicts >= self.next_reduce:
+            self.num_reductions += 1
+            self.next_reduce = num_conflicts + self.reduce_interval + self.num_reductions * self.reduce_increment
+        else:
+            self.num_cap_reductions += 1
+
+        keep = []
+        glue = []
+        candidates = []
+        for clause in self.clauses:
+            if is_locked(clause):
+                keep.append(clause)
+            elif clause.lbd <= self.glue_lbd:
+                glue.append(clause)
+            else:
+                candidates.append(clause)
+
+        # Best first: low LBD, then high activity
+        candidates.sort(key=lambda c: (c.lbd, -c.activity))
+        cut = len(candidates) - len(candidates) // 2
+        deleted = candidates[cut:]
+        candidates = candidates[:cut]
+        if self.max_clauses is not None:
+            # Get back under the cap: worst non-glue clauses first, then the worst glue clauses
+            excess = len(keep) + len(glue) + len(candidates) - self.max_clauses
+            if excess > 0:
+                cut = max(len(candidates) - excess, 0)
+                excess -= len(candidates) - cut
+                deleted += candidates[cut:]
+                candidates = candidates[:cut]
+            if excess > 0:
+                glue.sort(key=lambda c: (c.lbd, -c.activity))
+                cut = max(len(glue) - excess, 0)
+                deleted += glue[cut:]
+                glue = glue[:cut]
+        self.clauses = keep + glue + candidates
+        self.num_deleted += len(deleted)
+        if self.max_clauses is not None:
+            # Only locked clauses can keep the database over the cap
+            self.cap_limit = self.max_clauses if len(self.clauses) <= self.max_clauses else 2 * len(self.clauses)
+        return deleted
@@ -1,7 +1,11 @@
-from typing import List
+from array import array
+from collections.abc import Sequence
+from typing import List, Optional
 
 # Define Clauses as objects
 class Clause:
+    __slots__ = ('literals',)
+
     def __init__(self, literals: List[int]):
         self.literals = literals
 
@@ -12,32 +16,95 @@ class Clause:
         return f"Clause({self.literals})"
 
 
-# Define CNF formulae as lists of 'Clause' class objects
+class ClauseView(Clause):
+    '''
+    Read-only view of clause `index` in a CNFFormula's clause arena.
+    `literals` is materialized from the arena on access.
+    '''
+    __slots__ = ('formula', 'index')
+
+    def __init__(self, formula: 'CNFFormula', index: int):
+        self.formula = formula
+        self.index = index
+
+    @property
+    def literals(self) -> List[int]:
+        offsets = self.formula.offsets
+        return self.formula.literals[offsets[self.index]:offsets[self.index + 1]].tolist()
+
+    def __len__(self):
+        offsets = self.formula.offsets
+        return offsets[self.index + 1] - offsets[self.index]
+
+
+class ClauseList(Sequence):
+    '''
+    Read-only sequence of ClauseViews over a CNFFormula's clause arena.
+    It has no append: clauses are added with CNFFormula.add_clause
+    '''
+    __slots__ = ('formula',)
+
+    def __init__(self, formula: 'CNFFormula'):
+        self.formula = formula
+
+    def __len__(self):
+        return len(self.formula)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ClauseView(self.formula, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("clause index out of range")
+        return ClauseView(self.formula, index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield ClauseView(self.formula, i)
+
+
+# Define CNF formulae as a clause arena: all literals back to back in one
+# array('i') buffer, clause i being literals[offsets[i]:offsets[i + 1]] (CSR layout)
 class CNFFormula:
-    def __init__(self, num_vars: int):
+    def __init__(self, num_vars: int, literals: Optional[array] = None, offsets: Optional[array] = None):
+        '''
+        `literals` and `offsets` may be passed to wrap an existing arena (e.g. the
+        parser's arrays, or a memoryview over shared memory) without copying it
+        '''
         self.num_vars = num_vars
-        self.clauses: List[Clause] = []
+        self.literals = array('i') if literals is None else literals
+        self.offsets = array('i', [0]) if offsets is None else offsets
         self.satisfiable: bool = None #None = unknown, True = satisfiable, False = unsatisfiable
 
+    @property
+    def clauses(self) -> ClauseList:
+        '''
+        A read-only view of the clauses; appending to it is not possible, use add_clause
+        '''
+        return ClauseList(self)
 
-    
-    
     def add_clause(self, clause: Clause):
-        self.clauses.append(clause)
-        
+        self.literals.extend(clause.literals)
+        self.offsets.append(len(self.literals))
+
+    def clause_literals(self, index: int) -> List[int]:
+        return self.literals[self.offsets[index]:self.offsets[index + 1]].tolist()
+
     # Convert CNF to DIMACS format
     def to_dimacs(self) -> str:
-        lines = [f"p cnf {self.num_vars} {len(self.clauses)}"]
-        for clause in self.clauses:
-            line = ' '.join(map(str, clause.literals)) + ' 0'
+        lines = [f"p cnf {self.num_vars} {len(self)}"]
+        for i in range(len(self)):
+            line = ' '.join(map(str, self.clause_literals(i))) + ' 0'
             lines.append(line)
         return '\n'.join(lines)
 
     def __len__(self):
-        return len(self.clauses)
+        return len(self.offsets) - 1
 
     def __repr__(self):
-        return f"CNF(num_vars={self.num_vars}, clauses={len(self.clauses)})"
-    
+        return f"CNF(num_vars={self.num_vars}, clauses={len(self)})"
+
     def __iter__(self):
-        return iter(self.clauses)
+        for i in range(len(self)):
+            yield ClauseView(self, i)
@@ -0,0 +1,412 @@
+from .cdcl import CDCL
+from .cnf import CNFFormula
+from .portfolio import SharedFormula, attach_formula, release_formula
+from .state import lit_dimacs
+from array import array
+from collections import deque
+from multiprocessing.connection import Listener, Client
+from typing import Optional, List, Dict, Tuple, Any, Callable
+import heapq
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+
+
+class Cuber:
+    '''
+    Lookahead cubing: splits the search space into at most `num_cubes` cubes
+    (conjunctions of literals) whose union covers every model of the formula.
+
+    At each node the `num_candidates` unassigned variables occurring most often
+    are looked ahead on: both values are propagated, and the variable whose two
+    branches imply the most assignments (product of the two counts) is split
+    on. A value whose propagation conflicts is a failed literal, so the
+    opposite value is added to the cube instead; a node where both values of
+    a variable fail is refuted and produces no cube.
+
+    The search runs on a CDCL instance's propagation engine, nothing is learned.
+    '''
+    def __init__(self, cnf: CNFFormula, num_cubes: int = 64, num_candidates: int = 32):
+        self.cnf = cnf
+        self.num_cubes = num_cubes
+        self.num_candidates = num_candidates
+        self.solver = CDCL(cnf)
+        self.occurrences = array('i', [0]) * (cnf.num_vars + 1)
+        for lit in cnf.literals[:cnf.offsets[len(cnf)]]:
+            self.occurrences[abs(lit)] += 1
+        self.cubes: List[List[int]] = []
+        self.unsatisfiable = False
+        self.num_refuted = 0
+        self.num_failed_literals = 0
+
+    def propagate_literal(self, lit: int) -> Optional[int]:
+        '''
+        Returns the number of assignments implied by the literal index, or None
+        if it leads to a conflict. The solver state is left unchanged
+        '''
+        solver = self.solver
+        level = solver.decision_level
+        size = len(solver.trail)
+        solver.new_decision_level()
+        solver.assign(lit)
+        conflict = solver.unit_propagate()
+        implied = len(solver.trail) - size
+        solver.backjump(level)
+        return None if conflict is not None else implied
+
+    def assume(self, lit: int) -> bool:
+        '''
+        Assigns the literal index at a new decision level. Returns False on conflict
+        '''
+        solver = self.solver
+        solver.new_decision_level()
+        solver.assign(lit)
+        return solver.unit_propagate() is None
+
+    def split(self, cube: List[int], depth: int):
+        solver = self.solver
+        while True:
+            if depth == 0 or len(solver.trail) == solver.num_vars:
+                self.cubes.append(cube)
+                return
+            candidates = heapq.nlargest(self.num_candidates,
+                                        (var for var in range(1, solver.num_vars + 1) if not solver.is_assigned(var)),
+                                        key=self.occurrences.__getitem__)
+            best, best_score, forced = None, -1, None
+            for var in candidates:
+                positive = self.propagate_literal(var << 1)
+                negative = self.propagate_literal((var << 1) | 1)
+                if positive is None and negative is None:
+                    self.num_refuted += 1
+                    return
+                if positive is None or negative is None:
+                    forced = (var << 1) | 1 if positive is None else var << 1
+                    break
+                score = positive * negative
+                if score > best_score:
+                    best, best_score = var, score
+            if forced is None:
+                break
+            self.num_failed_literals += 1
+            if not self.assume(forced):
+                self.num_refuted += 1
+                return
+            cube = cube + [lit_dimacs(forced)]
+
+        for lit in (best << 1, (best << 1) | 1):
+            level = solver.decision_level
+            if self.assume(lit):
+                self.split(cube + [lit_dimacs(lit)], depth - 1)
+            else:
+                self.num_refuted += 1
+            solver.backjump(level)
+
+    def run(self) -> List[List[int]]:
+        '''
+        Returns the cubes as lists of DIMACS literals. An empty list means the
+        formula is unsatisfiable
+        '''
+        solver = self.solver
+        if solver.root_conflict is not None or solver.unit_propagate() is not None:
+            self.unsatisfiable = True
+            return []
+        depth = math.ceil(math.log2(self.num_cubes)) if self.num_cubes > 1 else 0
+        self.split([], depth)
+        self.unsatisfiable = not self.cubes
+        return self.cubes
+
+
+def solve_cube(cnf: CNFFormula, cube: List[int], config: Optional[Dict[str, Any]] = None):
+    '''
+    Solves the formula with the cube's literals as assumptions.
+    Returns (result, assignments, stats)
+    '''
+    solver = CDCL(cnf, **(config or {}))
+    result = solver.solve(assumptions=cube)
+    stats = {'decisions': solver.num_decisions, 'conflicts': solver.num_conflicts}
+    return result, solver.assignments if result else {}, stats
+
+
+def take_cube(ranges, lock, worker_id: int) -> Optional[int]:
+    '''
+    Work stealing over cube index ranges: worker w owns [ranges[2w], ranges[2w + 1]).
+    Takes the next cube of the worker's own range; when that is empty, steals
+    the back half of the largest remaining range. Returns None when no cubes are left
+    '''
+    with lock:
+        start, end = ranges[2 * worker_id], ranges[2 * worker_id + 1]
+        if start < end:
+            ranges[2 * worker_id] = start + 1
+            return start
+        victim = max(range(len(ranges) // 2), key=lambda w: ranges[2 * w + 1] - ranges[2 * w])
+        remaining = ranges[2 * victim + 1] - ranges[2 * victim]
+        if remaining <= 0:
+            return None
+        end = ranges[2 * victim + 1]
+        middle = end - (remaining + 1) // 2
+        ranges[2 * victim + 1] = middle
+        ranges[2 * worker_id] = middle + 1
+        ranges[2 * worker_id + 1] = end
+        return middle
+
+
+def run_cube_worker(results, handle: Tuple[str, int, int, int], cubes: List[List[int]], ranges, lock,
+                    worker_id: int, config: Optional[Dict[str, Any]]):
+    '''
+    Process entry point for local cube solving. Reports (worker_id, cube index, result, assignments)
+    for each cube, then (worker_id, None, None, None) when no cubes are left
+    '''
+    try:
+        shm, cnf = attach_formula(handle)
+        try:
+            while True:
+                index = take_cube(ranges, lock, worker_id)
+                if index is None:
+                    break
+                result, assignments, _ = solve_cube(cnf, cubes[index], config)
+                results.put((worker_id, index, result, assignments))
+        finally:
+            release_formula(shm, cnf)
+        results.put((worker_id, None, None, None))
+    except BaseException as e:
+        results.put((worker_id, -1, e, None))
+
+
+class CubeServer:
+    '''
+    Simple work queue serving cubes over TCP (multiprocessing.connection, with
+    an authentication key). Workers on any host connect with `connect_worker`,
+    fetch the formula once, then pull cubes and report results until the queue
+    is empty or a satisfiable cube has been found. A cube whose worker
+    disconnects before reporting is put back in the queue.
+
+    multiprocessing.connection exchanges pickles, so anyone holding the key
+    can run code on the server. Without `authkey` a random key is generated
+    (`self.authkey`); the server listens on 127.0.0.1 unless another address
+    is given.
+    '''
+    def __init__(self, cnf: CNFFormula, cubes: List[List[int]], config: Optional[Dict[str, Any]] = None,
+                 address: Tuple[str, int] = ('127.0.0.1', 0), authkey: Optional[bytes] = None):
+        num_literals = cnf.offsets[len(cnf)]
+        self.payload = (cnf.num_vars, array('i', cnf.literals[:num_literals]).tobytes(),
+                        array('i', cnf.offsets[:len(cnf) + 1]).tobytes(), config or {})
+        self.pending = deque(enumerate(cubes))
+        self.results = queue.Queue() # (index, result, assignments)
+        self.lock = threading.Lock()
+        self.num_connections = 0 # Workers currently connected
+        self.stopped = threading.Event()
+        self.authkey = os.urandom(32) if authkey is None else authkey
+        self.listener = Listener(address, authkey=self.authkey)
+        self.address = self.listener.address
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def accept_loop(self):
+        while not self.stopped.is_set():
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                return # Listener closed
+            except Exception:
+                continue # Failed handshake
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        current = None # Cube handed out on this connection and not reported yet
+        with self.lock:
+            self.num_connections += 1
+        with conn:
+            try:
+                while True:
+                    request = conn.recv()
+                    if request[0] == 'formula':
+                        conn.send(self.payload)
+                    elif request[0] == 'next':
+                        current = self.next_cube()
+                        conn.send(current)
+                    elif request[0] == 'report':
+                        self.results.put(request[1:])
+                        current = None
+            except (EOFError, OSError):
+                pass
+        with self.lock:
+            if current is not None and not self.stopped.is_set():
+                self.pending.appendleft(current)
+            self.num_connections -= 1
+
+    def next_cube(self) -> Optional[Tuple[int, List[int]]]:
+        with self.lock:
+            if self.stopped.is_set() or not self.pending:
+                return None
+            return self.pending.popleft()
+
+    def stop(self):
+        self.stopped.set()
+        self.listener.close()
+
+
+def connect_worker(address: Tuple[str, int], authkey: bytes):
+    '''
+    Worker loop for a (possibly remote) host: solves cubes from a CubeServer until none are left.
+    `authkey` is the server's key (bytes.fromhex of the key it printed)
+    '''
+    with Client(address, authkey=authkey) as conn:
+        conn.send(('formula',))
+        num_vars, literals, offsets, config = conn.recv()
+        cnf = CNFFormula(num_vars, array('i'), array('i'))
+        cnf.literals.frombytes(literals)
+        cnf.offsets.frombytes(offsets)
+        while True:
+            conn.send(('next',))
+            item = conn.recv()
+            if item is None:
+                return
+            index, cube = item
+            result, assignments, _ = solve_cube(cnf, cube, config)
+            conn.send(('report', index, result, assignments))
+
+
+class CubeAndConquer:
+    '''
+    Cube-and-conquer: a lookahead Cuber splits the formula into cubes, which
+    are then solved by CDCL workers. The formula is satisfiable iff some cube
+    is; solving stops at the first satisfiable cube.
+
+    By default the cubes are solved by `num_workers` local processes sharing
+    the formula through shared memory, with work stealing between them. With an
+    `address`, the cubes are served by a CubeServer instead: `num_workers`
+    local processes connect to it over the socket, and workers on other hosts
+    may join with `connect_worker(address, authkey)`. Without `authkey` a
+    random key is generated and printed to stderr with the server address.
+
+    `progress(num_solved, num_cubes)` is called after every solved cube.
+    '''
+    def __init__(self, cnf: CNFFormula, num_cubes: int = 64, num_workers: Optional[int] = None,
+                 config: Optional[Dict[str, Any]] = None, num_candidates: int = 32,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 address: Optional[Tuple[str, int]] = None, authkey: Optional[bytes] = None):
+        self.cnf = cnf
+        self.num_cubes = num_cubes
+        self.num_workers = (os.cpu_count() or 1) if num_workers is None else num_workers
+        self.config = config
+        self.num_candidates = num_candidates
+        self.progress = progress
+        self.address = address
+        self.authkey = authkey
+        self.cubes: List[List[int]] = []
+        self.num_solved = 0
+        self.assignments: Dict[int, bool] = {}
+        self.sat_cube: Optional[List[int]] = None
+
+    def solve(self) -> Optional[bool]:
+        '''
+        Returns True if satisfiable, False if unsatisfiable, None if some cube was left unsolved
+        '''
+        if self.cnf.satisfiable is False:
+            return False
+        self.cubes = Cuber(self.cnf, self.num_cubes, self.num_candidates).run()
+        if not self.cubes:
+            result = False
+        elif self.address is None:
+            result = self.solve_local()
+        else:
+            result = self.solve_socket()
+        if result is not None:
+            self.cnf.satisfiable = result
+        return result
+
+    def record(self, index: int, result: Optional[bool], assignments: Dict[int, bool]) -> bool:
+        '''
+        Books a solved cube. Returns True if solving can stop
+        '''
+        self.num_solved += 1
+        if self.progress is not None:
+            self.progress(self.num_solved, len(self.cubes))
+        if result:
+            self.sat_cube = self.cubes[index]
+            self.assignments = assignments
+            return True
+        return False
+
+    def solve_local(self) -> Optional[bool]:
+        context = multiprocessing.get_context()
+        num_workers = max(1, min(self.num_workers, len(self.cubes)))
+        results = context.Queue()
+        lock = context.Lock()
+        ranges = context.Array('i', 2 * num_workers, lock=False)
+        for w in range(num_workers):
+            ranges[2 * w] = w * len(self.cubes) // num_workers
+            ranges[2 * w + 1] = (w + 1) * len(self.cubes) // num_workers
+
+        shared = SharedFormula(self.cnf)
+        workers = [context.Process(target=run_cube_worker, daemon=True,
+                                   args=(results, shared.handle, self.cubes, ranges, lock, w, self.config))
+                   for w in range(num_workers)]
+        try:
+            for process in workers:
+                process.start()
+            finished = 0
+            unknown = False
+            while finished < num_workers:
+                try:
+                    worker_id, index, result, assignments = results.get(timeout=0.1)
+                except queue.Empty:
+                    for w, process in enumerate(workers):
+                        if process.exitcode not in (None, 0):
+                            raise RuntimeError(f"Cube worker {w} died with exit code {process.exitcode}")
+                    continue
+                if index is None:
+                    finished += 1
+                    continue
+                if isinstance(result, BaseException):
+                    raise result
+                unknown = unknown or result is None
+                if self.record(index, result, assignments):
+                    return True
+            return None if unknown else False
+        finally:
+            for process in workers:
+                if process.is_alive():
+                    process.terminate() # Stops the remaining cubes
+            for process in workers:
+                process.join()
+            results.close()
+            shared.close()
+
+    def solve_socket(self) -> Optional[bool]:
+        server = CubeServer(self.cnf, self.cubes, self.config, self.address, self.authkey)
+        if self.authkey is None:
+            print(f"c cube server at {server.address}, authkey {server.authkey.hex()}", file=sys.stderr)
+        context = multiprocessing.get_context()
+        workers = [context.Process(target=connect_worker, args=(server.address, server.authkey), daemon=True)
+                   for _ in range(self.num_workers)]
+        try:
+            for process in workers:
+                process.start()
+            unknown = False
+            remaining = len(self.cubes)
+            while remaining:
+                try:
+                    index, result, assignments = server.results.get(timeout=0.1)
+                except queue.Empty:
+                    # Results are queued before a worker disconnects, so with every local
+                    # worker gone and no connection left, no result can arrive anymore
+                    if (workers and all(process.exitcode is not None for process in workers)
+                            and server.num_connections == 0 and server.results.empty()):
+                        exitcodes = [process.exitcode for process in workers]
+                        raise RuntimeError(f"All cube workers exited (exit codes {exitcodes}) with {remaining} cubes unsolved")
+                    continue
+                remaining -= 1
+                unknown = unknown or result is None
+                if self.record(index, result, assignments):
+                    return True
+            return None if unknown else False
+        finally:
+            server.stop()
+            for process in workers:
+                if process.is_alive():
+                    process.terminate()
+            for process in workers:
+                process.join()
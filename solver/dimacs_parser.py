@@ -1,12 +1,58 @@
-from solver.cnf import CNFFormula, Clause
+from solver.cnf import CNFFormula
+from array import array
+from typing import List
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+import re
+import sys
+import warnings
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, the pure-Python tokenizer is used without it
+    np = None
+
 
 class DIMACSParseError(Exception):
     pass
 
+
+# Comment ('c') and problem ('p') lines, and anything after a '%' end marker on a line.
+# Clause lines only contain digits, '-' and whitespace, so the line start need not be anchored.
+SKIP_LINES = re.compile(rb'[cp%][^\n]*')
+PROBLEM_LINE = re.compile(rb'^[ \t\r\f\v]*p[^\n]*', re.M)
+
+# Magic bytes of the compressed formats benchmark sets are shipped in
+COMPRESSION_MAGIC = [
+    (b'\x1f\x8b', gzip.open),
+    (b'\xfd7zXZ\x00', lzma.open),
+    (b'BZh', bz2.open),
+]
+
+CHUNK_SIZE = 1 << 24 # Bytes tokenized at once
+
+
 class DIMACS_Parser:
-    def __init__(self, filename):
+    '''
+    Bulk DIMACS CNF parser.
+
+    `filename` may be a path, '-' for stdin, or an open (binary or text) file
+    object. gzip, xz and bzip2 compression is detected from the magic bytes.
+    Plain files are memory-mapped. The input is processed in chunks of whole
+    lines: comment/problem lines are stripped with a regex and the remaining
+    text is converted to integers in one call per chunk (NumPy if available).
+
+    The result is stored flat: `literals` holds all clause literals back to back
+    and clause i is literals[offsets[i]:offsets[i + 1]].
+    '''
+    def __init__(self, filename, chunk_size: int = CHUNK_SIZE):
         self.filename = filename
-        self.clauses = []
+        self.chunk_size = chunk_size
+        self.literals = array('i')
+        self.offsets = array('i', [0])
         self.num_clauses = 0
         self.num_vars = 0
         self.satisfiable = None
@@ -14,46 +60,186 @@ class DIMACS_Parser:
         self.sanity_check()
         self.cnf = self.to_cnf()
 
+    @property
+    def clauses(self) -> List[List[int]]:
+        offsets = self.offsets
+        return [self.literals[offsets[i]:offsets[i + 1]].tolist() for i in range(len(offsets) - 1)]
+
+    def open_stream(self):
+        '''
+        Returns (binary or text stream, whether the parser opened it, whether it is compressed)
+        '''
+        source = self.filename
+        if source == '-':
+            source = sys.stdin.buffer
+        if hasattr(source, 'read'):
+            stream, opened = source, False
+        else:
+            stream, opened = open(source, 'rb'), True
+
+        # Peek at the first bytes to detect compression
+        if hasattr(stream, 'peek'):
+            magic = stream.peek(6)[:6]
+        elif hasattr(stream, 'seekable') and stream.seekable():
+            position = stream.tell()
+            magic = stream.read(6)
+            stream.seek(position)
+        else:
+            magic = b''
+        if isinstance(magic, bytes):
+            for prefix, open_compressed in COMPRESSION_MAGIC:
+                if magic.startswith(prefix):
+                    return open_compressed(stream, 'rb'), True, True
+        return stream, opened, False
+
+    def read_chunks(self):
+        '''
+        Yields the input as bytes chunks that end on line boundaries
+        '''
+        stream, opened, compressed = self.open_stream()
+        try:
+            mapped = None
+            if not compressed:
+                try:
+                    if os.fstat(stream.fileno()).st_size > 0 and stream.tell() == 0:
+                        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+                except (AttributeError, OSError, ValueError):
+                    mapped = None # Not a regular file (pipe, in-memory buffer, ...)
+
+            if mapped is not None:
+                with mapped:
+                    start = 0
+                    while start < len(mapped):
+                        end = mapped.find(b'\n', start + self.chunk_size)
+                        end = len(mapped) if end == -1 else end + 1
+                        yield mapped[start:end]
+                        start = end
+                return
+
+            rest = b''
+            while True:
+                block = stream.read(self.chunk_size)
+                if not block:
+                    break
+                if isinstance(block, str):
+                    block = block.encode()
+                data = rest + block
+                cut = data.rfind(b'\n') + 1
+                rest = data[cut:]
+                if cut:
+                    yield data[:cut]
+            if rest:
+                yield rest
+        finally:
+            if opened:
+                stream.close()
+
+    def strip_lines(self, chunk: bytes):
+        '''
+        Blanks out comment/problem lines and end markers. Only the span between the
+        first and last such line is searched, which is usually just the header.
+
+        Returns (the chunk with those lines blanked, the span that was searched)
+        '''
+        first = min((i for i in (chunk.find(b'c'), chunk.find(b'p'), chunk.find(b'%')) if i >= 0), default=-1)
+        if first == -1:
+            return chunk, b''
+        last = max(chunk.rfind(b'c'), chunk.rfind(b'p'), chunk.rfind(b'%'))
+        end = chunk.find(b'\n', last)
+        end = len(chunk) if end == -1 else end
+        span = chunk[first:end]
+        return chunk[:first] + SKIP_LINES.sub(b' ', span) + chunk[end:], span
+
+    def tokenize(self, data: bytes):
+        '''
+        Converts a whitespace-separated chunk of integers in one call
+        '''
+        if b'_' in data: # int() accepts digit separators, DIMACS does not
+            raise DIMACSParseError(f"Invalid token in {self.filename}")
+        if np is not None:
+            # fromstring reads a lone sign as part of the next number ("- 2" as -2) or
+            # as 0 at the end, where int() rejects it: find signs not followed by a digit
+            chars = np.frombuffer(data, dtype=np.uint8)
+            after_signs = np.flatnonzero((chars == ord('-')) | (chars == ord('+'))) + 1
+            if len(after_signs) and (after_signs[-1] == len(chars) or np.any(chars[after_signs] <= ord(' '))):
+                raise DIMACSParseError(f"Invalid token in {self.filename}: lone sign")
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                try:
+                    return np.fromstring(data, dtype=np.int64, sep=' ')
+                except (ValueError, DeprecationWarning) as e:
+                    raise DIMACSParseError(f"Invalid token in {self.filename}") from e
+        try:
+            return array('q', map(int, data.split()))
+        except ValueError as e:
+            raise DIMACSParseError(f"Invalid token in {self.filename}: {e}") from e
+
     def read_dimacs(self):
-        with open(self.filename, 'r') as f:
-            curr_clause = []
-            for line in f:
-                line = line.strip()
-                if line.startswith('c'):
-                    continue # Comment Line
-                elif line.startswith('p'):  
-                    info = line.split()
-                    self.num_vars = int(info[2])
-                    self.num_clauses = int(info[3])
-                else:
-                    literals = list(line.split())
-                    for lit in literals:
-                        if lit == '%':
-                            break
-                        lit = int(lit)
-                        if lit == 0:
-                            if curr_clause:
-                                self.clauses.append(curr_clause)
-                                curr_clause = []
-                        else:
-                            if abs(lit) > self.num_vars:
-                                raise DIMACSParseError(f"Literal {lit} exceeds declared number of variables {self.num_vars}.")
-                            curr_clause.append(lit)
-            if curr_clause:
-                self.satisfiable = False
+        chunks = []
+        for chunk in self.read_chunks():
+            data, span = self.strip_lines(chunk)
+            for match in PROBLEM_LINE.finditer(span):
+                info = match.group().split()
+                self.num_vars = int(info[2])
+                self.num_clauses = int(info[3])
+            chunks.append(self.tokenize(data))
+
+        if np is not None:
+            self.split_clauses_numpy(np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64))
+        else:
+            tokens = array('q')
+            for chunk in chunks:
+                tokens.extend(chunk)
+            self.split_clauses(tokens)
+
+    def split_clauses_numpy(self, tokens):
+        '''
+        Splits the 0-terminated token stream into literals and clause offsets, vectorized
+        '''
+        zeros = np.flatnonzero(tokens == 0)
+        last_end = zeros[-1] + 1 if len(zeros) else 0
+        if np.any(tokens[last_end:]):
+            self.satisfiable = False # Unterminated last clause
+        tokens = tokens[:last_end]
+
+        literals = tokens[tokens != 0]
+        too_large = np.flatnonzero(np.abs(literals) > self.num_vars)
+        if len(too_large):
+            lit = int(literals[too_large[0]])
+            raise DIMACSParseError(f"Literal {lit} exceeds declared number of variables {self.num_vars}.")
+
+        # Position of each terminating 0 in the literal array; repeated positions are empty clauses
+        ends = zeros - np.arange(len(zeros))
+        offsets = np.concatenate(([0], ends))
+        offsets = np.concatenate(([0], ends[np.diff(offsets) > 0]))
+        self.literals = array('i', literals.astype(np.int32).tobytes())
+        self.offsets = array('i', offsets.astype(np.int32).tobytes())
+
+    def split_clauses(self, tokens: array):
+        literals = self.literals
+        offsets = self.offsets
+        num_vars = self.num_vars
+        for lit in tokens:
+            if lit == 0:
+                if len(literals) > offsets[-1]:
+                    offsets.append(len(literals))
+            else:
+                if abs(lit) > num_vars:
+                    raise DIMACSParseError(f"Literal {lit} exceeds declared number of variables {num_vars}.")
+                literals.append(lit)
+        if len(literals) > offsets[-1]:
+            self.satisfiable = False # Unterminated last clause
+            del literals[offsets[-1]:]
 
     def sanity_check(self):
         if self.satisfiable is False:
             return
-        if len(self.clauses) != self.num_clauses:
-            raise DIMACSParseError(f"Expected {self.num_clauses} clauses, but found {len(self.clauses)}.")
-        for clause in self.clauses:
-            assert len(clause) > 0, "Empty clause found."
+        if len(self.offsets) - 1 != self.num_clauses:
+            raise DIMACSParseError(f"Expected {self.num_clauses} clauses, but found {len(self.offsets) - 1}.")
 
     def to_cnf(self) -> CNFFormula:
-        cnf = CNFFormula(self.num_vars)
+        # The formula shares the parser's literal and offset arrays, nothing is copied
+        cnf = CNFFormula(self.num_vars, self.literals, self.offsets)
         if self.satisfiable is not None:
             cnf.satisfiable = self.satisfiable
-        for clause in self.clauses:
-            cnf.add_clause(Clause(clause))
-        return cnf
\ No newline at end of file
+        return cnf
@@ -1,18 +1,55 @@
+from .budget import make_budget
 from .cnf import CNFFormula, Clause
-from typing import Optional
+from array import array
+from typing import Optional, List
+
+
 class DPLL:
+    '''
+    Plain DPLL: unit propagation, then branching on the smallest unassigned
+    variable (True first, then False) with chronological backtracking. No
+    clause learning, no heuristics, so it stays a baseline for comparisons.
+
+    The search is iterative. Assigned literals go on a trail and the decision
+    stack records the trail length at each decision, so backtracking pops the
+    trail and undoes only those assignments instead of copying the
+    assignment. Every clause counts its True and False literals; the counters
+    are updated through per-literal occurrence lists, so a clause is only
+    examined when one of its literals is assigned.
+    '''
     def __init__(self, formula: CNFFormula):
-        self.clauses = formula
+        self.formula = formula
+        self.clauses = [Clause(formula.clause_literals(i)) for i in range(len(formula))] # Materialized once from the clause arena
         self.assignments = {} # Variable assignments
-        self.calls = 0
         self.num_decisions = 0
         self.num_propagations = 0
         self.num_conflicts = 0
-        self.max_depth = 0
-
+        self.calls = 0 # Search nodes visited: the root plus every branch tried, as calls of a recursive DPLL
+        self.max_depth = 0 # Most decisions on the stack at once, as the recursion depth of a recursive DPLL
 
+        num_vars = formula.num_vars
+        self.has_empty_clause = False
+        self.search_clauses: List[List[int]] = [] # Clauses without duplicate literals
+        self.occurrences: List[List[int]] = [[] for _ in range(2 * num_vars + 1)] # lit + num_vars -> clause ids
+        for clause in self.clauses:
+            literals = list(dict.fromkeys(clause.literals))
+            if not literals:
+                self.has_empty_clause = True
+            for lit in literals:
+                self.occurrences[lit + num_vars].append(len(self.search_clauses))
+            self.search_clauses.append(literals)
+        self.num_true = array('i', [0]) * len(self.search_clauses)
+        self.num_false = array('i', [0]) * len(self.search_clauses)
+        self.num_satisfied = 0
+
+        self.trail: List[int] = [] # Literals in assignment order
+        self.units: List[int] = [] # Ids of clauses that became unit
+        self.next_var = 1 # No variable below this one is unassigned
+        self.decisions = [] # (trail length before the decision, variable, value tried)
+        self.ok = True # False while a conflict is waiting to be backtracked
+        self.started = False
+        self.stop_reason: Optional[str] = None # Budget that stopped the last solve call
 
-        
     def literal_status(self, literal) -> Optional[bool]:
         if abs(literal) in self.assignments:
             value = self.assignments[abs(literal)]
@@ -32,115 +69,127 @@ class DPLL:
         if num_assigned == len(clause):
             return False
         return None # Undecided
-    
-    def formula_status(self) -> Optional[bool]:
-        num_satisfied = 0
-        for clause in self.clauses:
-            status = self.clause_status(clause)
-            if status is True:
-                num_satisfied += 1
-            elif status is False:
-                return False
-        if num_satisfied == len(self.clauses):
-            return True
-        return None # Undecided
 
-    def find_unit_literals(self):
-        unit_literals = []
-
-        for clause in self.clauses:
-            unassigned_literal = None
-            all_other_false = True
+    def assign(self, lit: int) -> bool:
+        '''
+        Makes a literal True and updates the clause counters.
+        Returns False if a clause became falsified
+        '''
+        num_vars = self.formula.num_vars
+        self.assignments[abs(lit)] = lit > 0
+        self.trail.append(lit)
+        num_true = self.num_true
+        num_false = self.num_false
+        for c in self.occurrences[lit + num_vars]:
+            num_true[c] += 1
+            if num_true[c] == 1:
+                self.num_satisfied += 1
+        ok = True
+        for c in self.occurrences[num_vars - lit]:
+            num_false[c] += 1
+            if num_true[c] == 0:
+                remaining = len(self.search_clauses[c]) - num_false[c]
+                if remaining == 1:
+                    self.units.append(c)
+                elif remaining == 0:
+                    ok = False
+        return ok
+
+    def undo(self, trail_length: int):
+        '''
+        Unassigns the trail above trail_length, newest first
+        '''
+        num_vars = self.formula.num_vars
+        num_true = self.num_true
+        num_false = self.num_false
+        while len(self.trail) > trail_length:
+            lit = self.trail.pop()
+            for c in self.occurrences[lit + num_vars]:
+                num_true[c] -= 1
+                if num_true[c] == 0:
+                    self.num_satisfied -= 1
+            for c in self.occurrences[num_vars - lit]:
+                num_false[c] -= 1
+            var = abs(lit)
+            del self.assignments[var]
+            if var < self.next_var:
+                self.next_var = var
+        self.units.clear()
 
-            for literal in clause.literals:
-                status = self.literal_status(literal)
-
-                if status is True:
-                    all_other_false = False
-                    break
-
-                if status is None:
-                    if unassigned_literal is None:
-                        unassigned_literal = literal
-                    else:
-                        all_other_false = False
-                        break
-
-            if unassigned_literal is not None and all_other_false:
-                unit_literals.append(unassigned_literal)
-
-        return unit_literals
-
-    
-    
     def unit_propagate(self) -> bool:
-        
-        unit_literals = self.find_unit_literals()
-        # print('unit literals: ', unit_literals)
-        # print('assignments: ', self.assignments)
-        while unit_literals:
-            for lit in unit_literals:
-                var = abs(lit)
-                status = self.literal_status(lit)
-                if status == False:
-                    self.num_conflicts += 1
-                    return False
-                elif status == None:
-                    self.assignments[var] = (lit>0)
-                    self.num_propagations += 1
-                else:
-                    continue
-            
-            unit_literals = self.find_unit_literals()
-        # print('unit literals: ', unit_literals)
-        # print('assignments: ', self.assignments)
+        '''
+        Assigns the remaining literal of every unit clause until none is left.
+        Returns False on conflict
+        '''
+        units = self.units
+        while units:
+            c = units.pop()
+            if self.num_true[c]:
+                continue # Satisfied since it became unit
+            for lit in self.search_clauses[c]:
+                if abs(lit) not in self.assignments:
+                    break
+            else:
+                return False
+            self.num_propagations += 1
+            if not self.assign(lit):
+                return False
         return True
-    
-    def solve(self) -> bool:
-        self.max_depth = max(self.max_depth, self.calls)
-        self.calls += 1
-        if self.calls % 100_000 == 0:
-            print("Calls:", self.calls)
 
-        
-        if not self.unit_propagate():
-            self.calls-=1
-            return False
+    def pick_branch_variable(self) -> Optional[int]:
+        for var in range(self.next_var, self.formula.num_vars + 1):
+            if var not in self.assignments:
+                self.next_var = var
+                return var
+        return None
 
-        status = self.formula_status()
-        if status is True:
-            self.calls -= 1
-            return True
-        elif status is False:
+    def solve(self, max_conflicts: Optional[int] = None, max_propagations: Optional[int] = None,
+              time_limit: Optional[float] = None, deadline: Optional[float] = None, cancel=None) -> Optional[bool]:
+        '''
+        Returns True if satisfiable, False if unsatisfiable, None (unknown) if a
+        budget ran out first (see budget.Budget). Calling solve again resumes
+        the search where it stopped
+        '''
+        budget = make_budget(max_conflicts, max_propagations, time_limit, deadline, cancel)
+        if budget is not None:
+            budget.start(self)
+        self.stop_reason = None
+        if self.has_empty_clause:
             self.num_conflicts += 1
-            self.calls -= 1
             return False
-
-        # Choose one decision variable
-        for var in range(1, self.clauses.num_vars + 1):
-            if var not in self.assignments:
-                chosen_var = var
-                break
-
-        saved = self.assignments.copy()
-        self.num_decisions += 1
-        
-        # Try True
-        self.assignments[chosen_var] = True
-        if self.solve():
-            self.calls -= 1
-            return True
-
-        # Backtrack, try False
-        self.assignments = saved.copy()
-        
-        self.assignments[chosen_var] = False
-        if self.solve():
-            self.calls -= 1
-            return True
-
-        # Backtrack
-        self.assignments = saved
-        self.calls -= 1
-        return False
-
+        if not self.started:
+            self.started = True
+            self.calls += 1
+            for c, literals in enumerate(self.search_clauses):
+                if len(literals) == 1:
+                    self.units.append(c)
+
+        decisions = self.decisions
+        while True:
+            if budget is not None and budget.exhausted(self):
+                self.stop_reason = budget.reason
+                return None
+
+            if self.ok and self.unit_propagate():
+                if self.num_satisfied == len(self.search_clauses):
+                    return True
+                var = self.pick_branch_variable()
+                self.num_decisions += 1
+                self.calls += 1
+                decisions.append((len(self.trail), var, True))
+                self.max_depth = max(self.max_depth, len(decisions))
+                self.ok = self.assign(var)
+                continue
+
+            # Conflict: undo up to the last decision whose False branch is untried
+            self.num_conflicts += 1
+            while decisions:
+                trail_length, var, value = decisions.pop()
+                self.undo(trail_length)
+                if value:
+                    decisions.append((trail_length, var, False))
+                    self.calls += 1
+                    self.ok = self.assign(-var)
+                    break
+            else:
+                return False
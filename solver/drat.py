@@ -0,0 +1,581 @@
+'''
+DRAT proofs: writing them during search and checking them independently.
+
+A proof is the sequence of clauses the solver learned ("lemmas") and deleted.
+Text DRAT writes one clause per line, deletions prefixed with "d":
+
+    1 -3 0
+    d 1 -3 4 0
+
+Binary DRAT writes 'a' or 'd', then every literal as the variable-length
+(7 bits per byte) encoding of 2*var + sign, then a 0 byte.
+
+    python -m solver.drat formula.cnf proof.drat
+'''
+from .cnf import CNFFormula
+from .evaluation import literal_values, formula_status
+from .state import TRUE, FALSE, UNASSIGNED
+from array import array
+from typing import Optional, List, Dict, Iterator, Tuple, Callable
+import argparse
+import sys
+
+
+class DRATWriter:
+    '''
+    Buffered DRAT output. `output` is a path or a binary file object; the
+    buffer is written out whenever it grows past `buffer_size` bytes
+    '''
+    def __init__(self, output, binary: bool = False, buffer_size: int = 1 << 16):
+        if hasattr(output, 'write'):
+            self.file, self.opened = output, False
+        else:
+            self.file, self.opened = open(output, 'wb'), True
+        self.binary = binary
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        self.num_added = 0
+        self.num_deleted = 0
+
+    def write_clause(self, tag: bytes, literals: List[int]):
+        buffer = self.buffer
+        if self.binary:
+            buffer += tag
+            for lit in literals:
+                code = 2 * lit if lit > 0 else -2 * lit + 1
+                while code > 127:
+                    buffer.append((code & 127) | 128)
+                    code >>= 7
+                buffer.append(code)
+            buffer.append(0)
+        else:
+            if tag == b'd':
+                buffer += b'd '
+            buffer += ' '.join(map(str, literals)).encode()
+            buffer += b' 0\n' if literals else b'0\n'
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def add(self, literals: List[int]):
+        '''
+        Records a lemma (DIMACS literals)
+        '''
+        self.num_added += 1
+        self.write_clause(b'a', literals)
+
+    def delete(self, literals: List[int]):
+        self.num_deleted += 1
+        self.write_clause(b'd', literals)
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        if self.opened:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_proof(path: str, binary: Optional[bool] = None, chunk_size: int = 1 << 20) -> Iterator[Tuple[bool, List[int]]]:
+    '''
+    Yields (is_deletion, DIMACS literals) for every proof line. Unless
+    `binary` is given, binary proofs are recognized by their first bytes
+    ('a', or a byte text DRAT cannot contain)
+    '''
+    with open(path, 'rb') as f:
+        if binary is None:
+            head = f.read(64)
+            f.seek(0)
+            text_bytes = set(b'0123456789- d\n\r\tc')
+            binary = bool(head) and (head[0] == ord('a') or any(b not in text_bytes for b in head))
+        if not binary:
+            for line in f:
+                tokens = line.split()
+                if not tokens or tokens[0] == b'c':
+                    continue
+                deletion = tokens[0] == b'd'
+                literals = list(map(int, tokens[1 if deletion else 0:]))
+                if literals and literals[-1] == 0:
+                    literals.pop()
+                yield deletion, literals
+            return
+
+        literals = []
+        deletion = None
+        code = shift = 0
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            for byte in chunk:
+                if deletion is None:
+                    if byte not in (0x61, 0x64):
+                        raise ValueError(f"Invalid binary DRAT tag {byte:#x} in {path}")
+                    deletion = byte == 0x64
+                    continue
+                code |= (byte & 127) << shift
+                if byte & 128:
+                    shift += 7
+                    continue
+                if code == 0:
+                    yield deletion, literals
+                    literals = []
+                    deletion = None
+                else:
+                    literals.append(code >> 1 if not code & 1 else -(code >> 1))
+                code = shift = 0
+        if deletion is not None:
+            raise ValueError(f"Truncated binary DRAT proof {path}")
+
+
+def check_model(cnf: CNFFormula, assignments: Dict[int, bool]) -> bool:
+    '''
+    True if the {variable: value} assignment satisfies every clause of the formula
+    '''
+    return formula_status(cnf, literal_values(cnf.num_vars, assignments)) is True
+
+
+def clause_hash(literals) -> int:
+    '''
+    Hash of a clause's literal indices that does not depend on their order
+    '''
+    total, product, xor = 0, 1, 0
+    for lit in literals:
+        total += lit
+        product = product * lit & 0xffffffff
+        xor ^= lit
+    return (1023 * total + product ^ 31 * xor) & 0x7fffffff
+
+
+class ClauseIndex:
+    '''
+    Open-addressing hash table (linear probing) from clause contents to clause
+    ids, used to find the clause a deletion refers to. Holds one int32 hash per
+    clause and an int32 table kept at most half full, about 12 bytes per clause.
+    `clause(c)` returns the literal indices of clause c
+    '''
+    EMPTY = -1
+    REMOVED = -2
+
+    def __init__(self, clause: Callable[[int], array]):
+        self.clause = clause
+        self.hashes = array('i') # Per clause id
+        self.table = array('i', [self.EMPTY]) * 1024
+        self.num_live = 0
+        self.num_used = 0 # Live and removed slots
+
+    def add(self, c: int):
+        '''
+        Indexes clause c; ids must be added in order 0, 1, 2, ...
+        '''
+        h = clause_hash(self.clause(c))
+        self.hashes.append(h)
+        if 2 * (self.num_used + 1) > len(self.table):
+            self.resize(len(self.table) * 2 if 4 * self.num_live >= len(self.table) else len(self.table))
+        self.insert(c, h)
+
+    def insert(self, c: int, h: int):
+        table, mask = self.table, len(self.table) - 1
+        i = h & mask
+        while table[i] >= 0:
+            i = (i + 1) & mask
+        if table[i] == self.EMPTY:
+            self.num_used += 1
+        table[i] = c
+        self.num_live += 1
+
+    def resize(self, size: int):
+        live = [c for c in self.table if c >= 0]
+        self.table = array('i', [self.EMPTY]) * size
+        self.num_live = self.num_used = 0
+        for c in live:
+            self.insert(c, self.hashes[c])
+
+    def find(self, literals: List[int]) -> int:
+        '''
+        Slot of an indexed clause with exactly these (distinct) literal indices, or -1
+        '''
+        h = clause_hash(literals)
+        key = sorted(literals)
+        table, hashes, mask = self.table, self.hashes, len(self.table) - 1
+        i = h & mask
+        while table[i] != self.EMPTY:
+            c = table[i]
+            if c >= 0 and hashes[c] == h and sorted(self.clause(c)) == key:
+                return i
+            i = (i + 1) & mask
+        return -1
+
+    def remove(self, slot: int):
+        self.table[slot] = self.REMOVED
+        self.num_live -= 1
+
+
+class DRATChecker:
+    '''
+    Backward DRAT checker for unsatisfiability proofs.
+
+    Formula and lemmas are stored in one flat arena of literal indices
+    (2*var + sign) with int32 watch lists and an int32 hash index for
+    deletions, so proofs with millions of lemmas fit in memory. The forward pass adds lemmas and applies deletions with
+    top-level unit propagation over two watched literals until a conflict is
+    reached. The backward pass then walks the proof in reverse, restoring
+    deleted clauses and removing lemmas, and checks only the lemmas that took
+    part in deriving the conflict (the core): each must be RUP (propagating
+    its negation yields a conflict) or RAT on its first literal as written in
+    the proof. Clauses used in a successful check join the core.
+
+    As in drat-trim, deletions of unit and reason clauses are ignored.
+    After `check`, `error` describes why a proof was rejected. A checker
+    checks one proof; create a new one for the next.
+    '''
+    def __init__(self, cnf: CNFFormula):
+        self.cnf = cnf
+        num_vars = cnf.num_vars
+        self.num_vars = num_vars
+        self.lits = array('i') # Clause arena of literal indices
+        self.starts = array('i', [0])
+        self.pivots = array('i') # First literal of each clause as read (-1 if empty); attach reorders the arena
+        self.values = array('b', [UNASSIGNED]) * (2 * num_vars + 2)
+        self.reasons = array('i', [-1]) * (num_vars + 1) # Clause id, -1 for none
+        self.trail = array('i')
+        self.trail_pos = array('i', [-1]) * (num_vars + 1)
+        # Per trail entry, where propagation must resume if that entry is undone
+        self.origins = array('i')
+        self.qhead = 0
+        self.watches = [array('i') for _ in range(2 * num_vars + 2)]
+        self.active = bytearray()
+        self.units: List[int] = [] # Ids of unit clauses
+        self.seen = bytearray(num_vars + 1)
+        self.conflict = -1 # Id of the clause falsified at the top level, if any
+        self.num_formula_clauses = 0
+        self.num_lemmas = 0
+        self.num_core_lemmas = 0
+        self.num_rat_checks = 0
+        self.checked = False
+        self.error: Optional[str] = None
+
+    def store(self, literals: List[int]) -> int:
+        for lit in dict.fromkeys(literals):
+            if lit == 0 or abs(lit) > self.num_vars:
+                raise ValueError(f"Literal {lit} is not a literal over variables 1..{self.num_vars}")
+            self.lits.append(lit << 1 if lit > 0 else (-lit << 1) | 1)
+        self.pivots.append(self.lits[self.starts[-1]] if len(self.lits) > self.starts[-1] else -1)
+        self.starts.append(len(self.lits))
+        self.active.append(0)
+        return len(self.starts) - 2
+
+    def clause(self, c: int) -> array:
+        return self.lits[self.starts[c]:self.starts[c + 1]]
+
+    def assign(self, lit: int, reason: int, origin: int = -1):
+        '''
+        `origin` is the trail position whose propagation assigned lit (its own position by default)
+        '''
+        self.values[lit] = TRUE
+        self.values[lit ^ 1] = FALSE
+        self.reasons[lit >> 1] = reason
+        self.trail_pos[lit >> 1] = len(self.trail)
+        self.origins.append(origin if origin >= 0 else len(self.trail))
+        self.trail.append(lit)
+
+    def attach(self, c: int):
+        '''
+        Activates clause c at the top level; assigns it if it is unit and
+        records it as the conflict if it is falsified
+        '''
+        self.active[c] = 1
+        start, end = self.starts[c], self.starts[c + 1]
+        lits, values = self.lits, self.values
+        if end - start == 1:
+            self.units.append(c)
+        elif end - start > 1:
+            # Move non-False literals to the watched positions
+            for w in (start, start + 1):
+                if values[lits[w]] == FALSE:
+                    for k in range(w + 1, end):
+                        if values[lits[k]] != FALSE:
+                            lits[w], lits[k] = lits[k], lits[w]
+                            break
+            self.watches[lits[start]].append(c)
+            self.watches[lits[start + 1]].append(c)
+            if values[lits[start + 1]] != FALSE:
+                return
+            other = self.trail_pos[lits[start + 1] >> 1]
+            if values[lits[start]] == TRUE:
+                # Only the first watch satisfies c; undoing it must revisit the false watch
+                pos = self.trail_pos[lits[start] >> 1]
+                self.origins[pos] = min(self.origins[pos], other)
+            elif values[lits[start]] == UNASSIGNED:
+                self.assign(lits[start], c, other)
+                return
+        if end == start or values[lits[start]] == FALSE:
+            self.conflict = c
+        elif values[lits[start]] == UNASSIGNED:
+            self.assign(lits[start], c)
+
+    def propagate(self) -> int:
+        '''
+        Returns the id of a falsified clause, or -1
+        '''
+        lits, starts, values, watches = self.lits, self.starts, self.values, self.watches
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+            watchers = watches[false_lit]
+            i = j = 0
+            while i < len(watchers):
+                c = watchers[i]
+                i += 1
+                start, end = starts[c], starts[c + 1]
+                if lits[start] == false_lit:
+                    lits[start], lits[start + 1] = lits[start + 1], false_lit
+                first = lits[start]
+                if values[first] == TRUE:
+                    watchers[j] = c
+                    j += 1
+                    continue
+                for k in range(start + 2, end):
+                    if values[lits[k]] != FALSE:
+                        lits[start + 1], lits[k] = lits[k], false_lit
+                        watches[lits[start + 1]].append(c)
+                        break
+                else:
+                    watchers[j] = c
+                    j += 1
+                    if values[first] == FALSE:
+                        while i < len(watchers):
+                            watchers[j] = watchers[i]
+                            i += 1
+                            j += 1
+                        del watchers[j:]
+                        return c
+                    self.assign(first, c, self.qhead - 1)
+            del watchers[j:]
+        return -1
+
+    def backtrack(self, length: int):
+        values, reasons = self.values, self.reasons
+        while len(self.trail) > length:
+            lit = self.trail.pop()
+            values[lit] = values[lit ^ 1] = UNASSIGNED
+            reasons[lit >> 1] = -1
+        del self.origins[length:]
+        self.qhead = min(self.qhead, length)
+
+    def repropagate(self, qhead: int = 0) -> int:
+        '''
+        Restores the top-level fixpoint after top-level assignments were
+        undone, propagating again from trail position `qhead`
+        '''
+        self.qhead = min(self.qhead, qhead)
+        for c in self.units:
+            lit = self.lits[self.starts[c]]
+            if self.active[c] and self.values[lit] == UNASSIGNED:
+                self.assign(lit, c)
+            elif self.active[c] and self.values[lit] == FALSE:
+                return c
+        return self.propagate()
+
+    def is_reason(self, c: int) -> bool:
+        start = self.starts[c]
+        return start < self.starts[c + 1] and self.reasons[self.lits[start] >> 1] == c # Reasons imply their first literal
+
+    def remove_watches(self, c: int):
+        self.active[c] = 0
+        start = self.starts[c]
+        if self.starts[c + 1] - start > 1:
+            self.watches[self.lits[start]].remove(c)
+            self.watches[self.lits[start + 1]].remove(c)
+
+    def detach(self, c: int):
+        '''
+        Deactivates clause c. If it implied a top-level literal, that literal
+        and everything assigned after it are undone, and propagation resumes
+        from the earliest position whose propagation assigned one of them
+        '''
+        reason = self.is_reason(c)
+        self.remove_watches(c)
+        if reason:
+            pos = self.trail_pos[self.lits[self.starts[c]] >> 1]
+            resume = min(self.origins[pos:])
+            self.backtrack(pos)
+            self.repropagate(resume)
+
+    def mark_core(self, conflict: int, true_lits: List[int] = ()):
+        '''
+        Adds the conflict clause and the reasons of the assignments it depends on to the core
+        '''
+        seen, reasons, trail = self.seen, self.reasons, self.trail
+        self.core[conflict] = 1
+        for lit in self.clause(conflict):
+            seen[lit >> 1] = 1
+        for lit in true_lits:
+            seen[lit >> 1] = 1
+        for pos in range(len(trail) - 1, -1, -1):
+            var = trail[pos] >> 1
+            if not seen[var]:
+                continue
+            seen[var] = 0
+            reason = reasons[var]
+            if reason >= 0:
+                self.core[reason] = 1
+                for lit in self.clause(reason):
+                    seen[lit >> 1] = 1
+
+    def rup(self, literals: List[int]) -> bool:
+        '''
+        Checks whether propagating the negation of the clause (literal indices)
+        gives a conflict, marking the clauses involved as core. Top-level
+        assignments are restored afterwards
+        '''
+        length = len(self.trail)
+        true_lits = []
+        for lit in literals:
+            value = self.values[lit]
+            if value == TRUE:
+                true_lits.append(lit) # The negation contradicts the top level
+            elif value == UNASSIGNED:
+                self.assign(lit ^ 1, -1)
+        if true_lits:
+            # Any true literal suffices; mark the reasons of one of them
+            conflict = self.reasons[true_lits[0] >> 1]
+            if conflict >= 0:
+                self.mark_core(conflict)
+            self.backtrack(length)
+            return True
+        conflict = self.propagate()
+        if conflict >= 0:
+            self.mark_core(conflict)
+        self.backtrack(length)
+        return conflict >= 0
+
+    def rat(self, c: int) -> bool:
+        lemma = self.clause(c)
+        pivot = self.pivots[c] # RAT is checked on the lemma's first literal in the proof
+        if pivot < 0:
+            return False
+        self.num_rat_checks += 1
+        for d in range(len(self.active)):
+            if not self.active[d]:
+                continue
+            other = self.clause(d)
+            if pivot ^ 1 not in other:
+                continue
+            resolvent = list(lemma) + [lit for lit in other if lit != pivot ^ 1]
+            if pivot in other or any(lit ^ 1 in resolvent for lit in resolvent):
+                continue # Tautological resolvent
+            if not self.rup(resolvent):
+                return False
+            self.core[d] = 1
+        return True
+
+    def check(self, proof: str, binary: Optional[bool] = None) -> bool:
+        '''
+        Returns True if the DRAT proof (path, text or binary) refutes the formula
+        '''
+        try:
+            return self.check_proof(proof, binary)
+        except ValueError as e:
+            self.error = str(e)
+            return False
+
+    def check_proof(self, proof: str, binary: Optional[bool]) -> bool:
+        if self.checked:
+            raise RuntimeError("DRATChecker has already checked a proof; create a new one")
+        self.checked = True
+        self.error = None
+        cnf = self.cnf
+        for i in range(len(cnf)):
+            self.store(cnf.clause_literals(i))
+        self.num_formula_clauses = len(cnf)
+        for c in range(len(cnf)):
+            if self.conflict < 0:
+                self.attach(c)
+        if self.conflict < 0:
+            self.conflict = self.propagate()
+        if self.conflict >= 0:
+            return True # Refuted by unit propagation alone
+
+        # Forward pass: clause id per event, deletions as ~id; stops at the first top-level conflict
+        events = array('i')
+        index = ClauseIndex(self.clause) # Active clauses
+        for c in range(len(cnf)):
+            index.add(c)
+        for deletion, literals in read_proof(proof, binary):
+            if not deletion:
+                c = self.store(literals)
+                self.num_lemmas += 1
+                index.add(c)
+                events.append(c)
+                self.attach(c)
+                if self.conflict < 0:
+                    self.conflict = self.propagate()
+                if self.conflict >= 0:
+                    break
+                continue
+            key = list({lit << 1 if lit > 0 else (-lit << 1) | 1 for lit in literals})
+            slot = index.find(key)
+            if slot < 0:
+                continue # Deleting a clause that does not exist is ignored
+            c = index.table[slot]
+            if len(key) == 1 or self.is_reason(c):
+                continue # Unit and reason deletions are ignored
+            index.remove(slot)
+            self.remove_watches(c)
+            events.append(~c)
+        else:
+            self.error = "The proof does not lead to a conflict"
+            return False
+
+        # Backward pass, starting with the lemma that led to the conflict
+        self.core = bytearray(len(self.active))
+        self.mark_core(self.conflict)
+        self.remove_watches(events[-1])
+        self.backtrack(0)
+        self.conflict = -1
+        self.repropagate() # No conflict, or the forward pass would have stopped earlier
+        for pos in range(len(events) - 1, -1, -1):
+            c = events[pos]
+            if c < 0:
+                c = ~c
+                self.attach(c)
+                self.propagate()
+                continue
+            if pos < len(events) - 1:
+                self.detach(c)
+            if not self.core[c]:
+                continue
+            self.num_core_lemmas += 1
+            if not self.rup(list(self.clause(c))) and not self.rat(c):
+                self.error = f"Lemma {c - self.num_formula_clauses + 1} is neither RUP nor RAT"
+                return False
+        return True
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Check a DRAT proof of unsatisfiability")
+    parser.add_argument('formula', help='DIMACS CNF file')
+    parser.add_argument('proof', help='text or binary DRAT proof')
+    args = parser.parse_args(argv)
+
+    from .dimacs_parser import DIMACS_Parser
+    checker = DRATChecker(DIMACS_Parser(args.formula).cnf)
+    if checker.check(args.proof):
+        print(f"s VERIFIED ({checker.num_core_lemmas}/{checker.num_lemmas} lemmas in the core)")
+    else:
+        print(f"s NOT VERIFIED: {checker.error}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+from .cnf import CNFFormula
+from .state import TRUE, FALSE, UNASSIGNED
+from array import array
+from typing import Optional, Dict
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, clauses are evaluated in a Python loop without it
+    np = None
+
+STATUS_BYTE = {status: array('b', [status]).tobytes() for status in (TRUE, FALSE, UNASSIGNED)}
+
+
+def literal_values(num_vars: int, assignments: Dict[int, bool]) -> array:
+    '''
+    Converts a {variable: value} assignment to the per-literal-index value
+    array used by SolverState (see state.lit_index)
+    '''
+    values = array('b', [UNASSIGNED]) * (2 * num_vars + 2)
+    for var, value in assignments.items():
+        values[var << 1] = TRUE if value else FALSE
+        values[(var << 1) | 1] = FALSE if value else TRUE
+    return values
+
+
+def clause_statuses(cnf: CNFFormula, values) -> array:
+    '''
+    Evaluates every clause of the formula under `values` (indexed by literal
+    index, TRUE / FALSE / UNASSIGNED per entry). Returns one entry per clause:
+    TRUE if satisfied, FALSE if all literals are False, UNASSIGNED otherwise.
+
+    With NumPy the clause arena is evaluated in bulk: literals are mapped to
+    literal indices, their values gathered and ranked FALSE < UNASSIGNED <
+    TRUE, and the maximum rank is taken per clause with one reduceat over the
+    clause offsets
+    '''
+    num_clauses = len(cnf)
+    if np is None:
+        statuses = array('b', [FALSE]) * num_clauses
+        literals, offsets = cnf.literals, cnf.offsets
+        for i in range(num_clauses):
+            status = FALSE
+            for k in range(offsets[i], offsets[i + 1]):
+                lit = literals[k]
+                value = values[lit << 1 if lit > 0 else (-lit << 1) | 1]
+                if value == TRUE:
+                    status = TRUE
+                    break
+                if value == UNASSIGNED:
+                    status = UNASSIGNED
+            statuses[i] = status
+        return statuses
+
+    offsets = np.frombuffer(cnf.offsets, dtype=np.int32)[:num_clauses + 1]
+    literals = np.frombuffer(cnf.literals, dtype=np.int32)[:offsets[-1]] if num_clauses else np.zeros(0, np.int32)
+    indices = np.abs(literals).astype(np.intp) * 2 + (literals < 0)
+    rank = np.array([0, 2, 1], dtype=np.int8) # Indexed by value: FALSE -> 0, TRUE -> 2, UNASSIGNED (-1) -> 1
+    ranks = rank[np.frombuffer(values, dtype=np.int8)[indices]]
+
+    # reduceat cannot express empty segments, so empty clauses keep the FALSE default
+    starts = offsets[:-1]
+    nonempty = offsets[1:] > starts
+    best = np.zeros(num_clauses, dtype=np.int8)
+    if len(ranks):
+        best[nonempty] = np.maximum.reduceat(ranks, starts[nonempty])
+    statuses = np.array([FALSE, UNASSIGNED, TRUE], dtype=np.int8)[best]
+    return array('b', statuses.tobytes())
+
+
+def first_falsified(cnf: CNFFormula, values) -> Optional[int]:
+    '''
+    Index of the first clause whose literals are all False, or None
+    '''
+    index = clause_statuses(cnf, values).tobytes().find(STATUS_BYTE[FALSE]) # One byte per clause
+    return None if index < 0 else index
+
+
+def formula_status(cnf: CNFFormula, values) -> Optional[bool]:
+    '''
+    True if every clause is satisfied, False if some clause is falsified,
+    None (undecided) otherwise
+    '''
+    statuses = clause_statuses(cnf, values).tobytes()
+    if STATUS_BYTE[FALSE] in statuses:
+        return False
+    if STATUS_BYTE[UNASSIGNED] in statuses:
+        return None
+    return True
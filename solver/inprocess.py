@@ -0,0 +1,212 @@
+from .cnf import Clause
+from .clause_db import LearnedClause
+from .state import TRUE, FALSE, UNASSIGNED, lit_dimacs
+from typing import Optional, List, Dict, Any
+
+
+class Inprocessor:
+    '''
+    Simplification that runs inside the CDCL search, at decision level 0
+    right after a restart:
+
+    - Learned-clause subsumption: a learned clause containing all literals
+      of another clause is deleted.
+    - Vivification of learned clauses (best LBD first): the negations of a
+      clause's literals are assumed one by one and propagated with the clause
+      itself detached. A conflict or an implied literal ends the clause early;
+      literals implied False are dropped.
+    - Failed-literal probing: a literal whose assignment propagates to a
+      conflict is fixed to False at level 0. Variables are probed round-robin
+      across runs.
+
+    A run starts every `interval` conflicts (the interval grows with the
+    number of runs). Vivification and probing share a budget of
+    `effort` times the propagations made since the previous run, at least
+    `min_propagations`; vivification may use half of it. Clauses changed or found are written to the solver's
+    DRAT proof, if there is one.
+    '''
+    def __init__(self, solver, interval: int = 2000, effort: float = 0.05, min_propagations: int = 2000,
+                 subsumption: bool = True, vivification: bool = True, probing: bool = True):
+        self.solver = solver
+        self.interval = interval
+        self.effort = effort
+        self.min_propagations = min_propagations
+        self.use_subsumption = subsumption
+        self.use_vivification = vivification
+        self.use_probing = probing
+        self.next_run = interval
+        self.last_propagations = 0
+        self.next_probe = 1 # Next variable to probe
+        self.num_runs = 0
+        self.num_subsumed = 0
+        self.num_vivified_clauses = 0 # Clauses shortened
+        self.num_vivified_literals = 0 # Literals removed by vivification
+        self.num_satisfied = 0 # Clauses deleted because they are satisfied at level 0
+        self.num_probes = 0
+        self.num_failed_literals = 0
+
+    def should_run(self) -> bool:
+        return self.solver.num_conflicts >= self.next_run
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'runs': self.num_runs,
+            'subsumed_clauses': self.num_subsumed,
+            'vivified_clauses': self.num_vivified_clauses,
+            'vivified_literals': self.num_vivified_literals,
+            'satisfied_clauses': self.num_satisfied,
+            'probes': self.num_probes,
+            'failed_literals': self.num_failed_literals,
+        }
+
+    def run(self) -> Optional[Clause]:
+        '''
+        Runs the enabled techniques at decision level 0.
+        Returns a clause falsified at level 0 if the formula was found unsatisfiable, else None
+        '''
+        solver = self.solver
+        self.num_runs += 1
+        self.next_run = solver.num_conflicts + self.interval * (self.num_runs + 1)
+        budget = max(self.min_propagations, int(self.effort * (solver.num_propagations - self.last_propagations)))
+        stop_at = solver.num_propagations + budget
+
+        conflict = solver.unit_propagate()
+        if conflict is None and self.use_subsumption:
+            self.subsume_learned()
+        if conflict is None and self.use_vivification:
+            conflict = self.vivify_learned(stop_at - budget // 2 if self.use_probing else stop_at)
+        if conflict is None and self.use_probing:
+            conflict = self.probe(stop_at)
+        self.last_propagations = solver.num_propagations
+        return conflict
+
+    def is_locked(self, clause: LearnedClause) -> bool:
+        return self.solver.reasons[clause.literals[0] >> 1] is clause
+
+    def delete(self, clauses: List[LearnedClause]):
+        solver = self.solver
+        solver.clause_db.remove(clauses)
+        solver.propagator.remove_clauses(clauses)
+        if solver.proof is not None:
+            for clause in clauses:
+                solver.proof.delete([lit_dimacs(lit) for lit in clause.literals])
+
+    def subsume_learned(self):
+        '''
+        Deletes learned clauses that are subsumed by a shorter (or equal) learned clause
+        '''
+        # Every kept clause is listed under one of its literals; a subsuming clause
+        # shares all of its literals with the candidate, so checking the lists of
+        # the candidate's literals finds it
+        occurrences: Dict[int, List[LearnedClause]] = {}
+        subsumed = []
+        for clause in sorted(self.solver.clause_db, key=len):
+            literals = set(clause.literals)
+            subsumer = None
+            for lit in literals:
+                for other in occurrences.get(lit, ()):
+                    if len(other.literals) <= len(literals) and literals.issuperset(other.literals):
+                        subsumer = other
+                        break
+                if subsumer is not None:
+                    break
+            if subsumer is not None and not self.is_locked(clause):
+                subsumer.lbd = min(subsumer.lbd, clause.lbd)
+                subsumed.append(clause)
+                continue
+            lit = min(clause.literals, key=lambda q: len(occurrences.get(q, ())))
+            occurrences.setdefault(lit, []).append(clause)
+        if subsumed:
+            self.delete(subsumed)
+            self.num_subsumed += len(subsumed)
+
+    def vivify_learned(self, stop_at: int) -> Optional[Clause]:
+        solver = self.solver
+        candidates = [c for c in solver.clause_db if not c.vivified and len(c.literals) > 2]
+        candidates.sort(key=lambda c: (c.lbd, len(c.literals)))
+        for clause in candidates:
+            if solver.num_propagations >= stop_at:
+                break
+            if self.is_locked(clause):
+                continue
+            conflict = self.vivify(clause)
+            if conflict is not None:
+                return conflict
+        return None
+
+    def vivify(self, clause: LearnedClause) -> Optional[Clause]:
+        solver = self.solver
+        values = solver.values
+        levels = solver.levels
+        clause.vivified = True
+        solver.propagator.remove_clauses([clause]) # Must not propagate on itself
+        literals = clause.literals
+        kept = []
+        satisfied = False
+        for lit in literals:
+            value = values[lit]
+            if value == TRUE:
+                if levels[lit >> 1] == 0:
+                    satisfied = True
+                else:
+                    kept.append(lit) # Implied by the negations of the kept literals
+                break
+            if value == FALSE:
+                continue # False at level 0 or implied False: dropped
+            kept.append(lit)
+            solver.new_decision_level()
+            solver.assign(lit ^ 1)
+            if solver.unit_propagate() is not None:
+                break
+        solver.backjump(0)
+
+        if satisfied:
+            solver.clause_db.remove([clause])
+            if solver.proof is not None:
+                solver.proof.delete([lit_dimacs(lit) for lit in literals])
+            self.num_satisfied += 1
+            return None
+        if len(kept) < len(literals):
+            self.num_vivified_clauses += 1
+            self.num_vivified_literals += len(literals) - len(kept)
+            if solver.proof is not None:
+                solver.proof.add([lit_dimacs(lit) for lit in kept])
+                solver.proof.delete([lit_dimacs(lit) for lit in literals])
+            clause.literals = kept
+            clause.lbd = min(clause.lbd, len(kept))
+            if len(kept) < 2:
+                solver.clause_db.remove([clause]) # Units are not stored in the clause database
+        if solver.propagator.add_clause(clause) is not None:
+            return clause
+        return solver.unit_propagate()
+
+    def probe(self, stop_at: int) -> Optional[Clause]:
+        solver = self.solver
+        values = solver.values
+        num_vars = solver.num_vars
+        for _ in range(num_vars):
+            if solver.num_propagations >= stop_at:
+                break
+            var = self.next_probe
+            self.next_probe = var % num_vars + 1
+            for lit in (var << 1, (var << 1) | 1):
+                if values[lit] != UNASSIGNED:
+                    break
+                self.num_probes += 1
+                solver.new_decision_level()
+                solver.assign(lit)
+                conflict = solver.unit_propagate()
+                solver.backjump(0)
+                if conflict is None:
+                    continue
+                # lit fails: its negation holds at level 0
+                self.num_failed_literals += 1
+                unit = Clause([lit ^ 1])
+                if solver.proof is not None:
+                    solver.proof.add([lit_dimacs(lit ^ 1)])
+                solver.propagator.add_clause(unit)
+                conflict = solver.unit_propagate()
+                if conflict is not None:
+                    return conflict
+                break
+        return None
@@ -0,0 +1,53 @@
+from typing import Optional, Dict, Callable, Any
+import cProfile
+import sys
+import time
+
+PHASES = ('propagate', 'analyze', 'backjump', 'decide')
+
+
+class Instrumentation:
+    '''
+    Optional run-time instrumentation for a CDCL solver.
+
+    - `timers`: accumulates perf_counter_ns time spent in each search phase
+      (propagate, analyze, backjump, decide) in `phase_ns`.
+    - `progress`: called with the solver's stats dict every
+      `progress_interval` conflicts (e.g. `print_progress`).
+    - `profile`: runs every `solve` call under cProfile; the profiler is kept
+      in `profiler` for pstats.
+
+    A solver without instrumentation only pays for an `is None` check per
+    conflict; timers cost two perf_counter_ns calls per phase when enabled.
+    '''
+    def __init__(self, timers: bool = False, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 progress_interval: int = 1000, profile: bool = False):
+        self.timers = timers
+        self.phase_ns = dict.fromkeys(PHASES, 0)
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.next_progress = progress_interval if progress is not None else float('inf')
+        self.profiler = cProfile.Profile() if profile else None
+
+    def on_conflict(self, solver):
+        '''
+        Reports progress when the conflict interval is reached
+        '''
+        self.next_progress = solver.num_conflicts + self.progress_interval
+        self.progress(solver.stats())
+
+    def phase_seconds(self) -> Dict[str, float]:
+        return {phase: ns / 1e9 for phase, ns in self.phase_ns.items()}
+
+
+def print_progress(stats: Dict[str, Any]):
+    '''
+    Progress callback printing one DIMACS-style comment line to stderr
+    '''
+    print(f"c {stats['time']:8.2f}s  conflicts {stats['conflicts']:>9}  decisions {stats['decisions']:>9}  "
+          f"props/s {stats['propagations_per_sec']:>10.0f}  learned {stats['learned_clauses_kept']:>7}  "
+          f"restarts {stats['restarts']:>5}  level {stats['decision_level']:>4}", file=sys.stderr, flush=True)
+
+
+def elapsed_since(start: Optional[float]) -> float:
+    return 0.0 if start is None else time.perf_counter() - start
@@ -0,0 +1,98 @@
+from .state import UNASSIGNED, TRUE
+from array import array
+from typing import Optional
+import random
+
+
+class PhaseSelector:
+    '''
+    Chooses the value (polarity) of decision variables.
+
+    - Phase saving: a variable is decided with the value it had when it was
+      last unassigned (SolverState.saved_phase), so a backjump does not lose
+      the parts of the assignment that were working.
+    - Target phases (optional): the assignment of the longest conflict-free
+      trail prefix seen since the last rephase takes precedence over saved phases.
+    - Rephasing (optional): every `rephase_interval` conflicts the saved phases
+      are reset, alternating between the best (longest conflict-free) assignment
+      found so far and the default phase.
+    - Variables without a saved phase get the default: 'false' (the default), 'true' or
+      'random' (seeded with `seed`).
+    '''
+    DEFAULTS = ('false', 'true', 'random')
+
+    def __init__(self, solver, default: str = 'false', saving: bool = True, target: bool = False,
+                 rephase_interval: Optional[int] = None, seed: Optional[int] = None):
+        if default not in self.DEFAULTS:
+            raise ValueError(f"Unknown default phase {default!r}, expected one of {self.DEFAULTS}")
+        self.solver = solver
+        self.default = default
+        self.saving = saving
+        self.rng = random.Random(seed)
+        num_vars = solver.num_vars
+
+        self.use_target = target
+        self.target = array('b', [UNASSIGNED]) * (num_vars + 1)
+        self.target_size = 0
+        self.best = array('b', [UNASSIGNED]) * (num_vars + 1)
+        self.best_size = 0
+
+        self.rephase_interval = rephase_interval
+        self.next_rephase = rephase_interval
+        self.num_rephases = 0
+
+    def default_phase(self) -> bool:
+        if self.default == 'random':
+            return self.rng.random() < 0.5
+        return self.default == 'true'
+
+    def pick(self, var: int) -> bool:
+        if self.use_target and self.target[var] != UNASSIGNED:
+            return self.target[var] == TRUE
+        if self.saving:
+            saved = self.solver.saved_phase[var]
+            if saved != UNASSIGNED:
+                return saved == TRUE
+        return self.default_phase()
+
+    def on_conflict(self, num_conflicts: int):
+        '''
+        Called before backjumping: records the conflict-free part of the trail
+        (every level below the conflict level) as target / best phases
+        '''
+        solver = self.solver
+        if solver.decision_level > 0:
+            size = solver.trail_lim[solver.decision_level - 1]
+            if self.use_target and size > self.target_size:
+                self._copy_trail(self.target, size)
+                self.target_size = size
+            if self.rephase_interval and size > self.best_size:
+                self._copy_trail(self.best, size)
+                self.best_size = size
+
+        if self.rephase_interval and num_conflicts >= self.next_rephase:
+            self.rephase()
+            self.next_rephase = num_conflicts + self.rephase_interval * (self.num_rephases + 1)
+
+    def _copy_trail(self, phases: array, size: int):
+        trail = self.solver.trail
+        for i in range(size):
+            lit = trail[i]
+            phases[lit >> 1] = not lit & 1
+
+    def rephase(self):
+        '''
+        Overwrites the saved phases with the best assignment or the default phase, alternately
+        '''
+        self.num_rephases += 1
+        saved = self.solver.saved_phase
+        if self.num_rephases % 2:
+            for var in range(1, len(saved)):
+                if self.best[var] != UNASSIGNED:
+                    saved[var] = self.best[var]
+        else:
+            for var in range(1, len(saved)):
+                saved[var] = self.default_phase()
+        self.target_size = 0
+        for var in range(1, len(self.target)):
+            self.target[var] = UNASSIGNED
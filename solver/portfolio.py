@@ -0,0 +1,200 @@
+from .cdcl import CDCL
+from .cnf import CNFFormula
+from .sharing import ClauseExchange
+from multiprocessing import shared_memory
+from typing import Optional, List, Dict, Tuple, Any
+import multiprocessing
+import os
+import queue
+
+INT_SIZE = 4 # array('i') item size
+
+RESTART_POLICIES = ('luby', 'glucose', 'geometric')
+DEFAULT_PHASES = ('false', 'true', 'random')
+VSIDS_DECAYS = (0.95, 0.99, 0.9, 0.975)
+
+
+def diversify(num_configs: int, seed: int = 0) -> List[Dict[str, Any]]:
+    '''
+    Returns `num_configs` CDCL keyword-argument dicts that differ in seed,
+    VSIDS decay, restart policy and phase policy. The first one is the
+    solver's default configuration.
+    '''
+    configs = [{}]
+    for i in range(1, num_configs):
+        configs.append({
+            'seed': seed + i,
+            'vsids_decay': VSIDS_DECAYS[i % len(VSIDS_DECAYS)],
+            'restart_policy': RESTART_POLICIES[i % len(RESTART_POLICIES)],
+            'default_phase': DEFAULT_PHASES[(i // len(RESTART_POLICIES)) % len(DEFAULT_PHASES)],
+            'target_phases': i % 2 == 1,
+            'rephase_interval': 1000 if i % 4 >= 2 else None,
+        })
+    return configs
+
+
+class SharedFormula:
+    '''
+    A CNFFormula's clause arena copied once into a shared memory block:
+    offsets (num_clauses + 1 ints) followed by literals (num_literals ints).
+    Workers attach by name and wrap the block without copying it.
+    '''
+    def __init__(self, cnf: CNFFormula):
+        self.num_vars = cnf.num_vars
+        self.num_clauses = len(cnf)
+        self.num_literals = cnf.offsets[self.num_clauses]
+        size = (self.num_clauses + 1 + self.num_literals) * INT_SIZE
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        split = (self.num_clauses + 1) * INT_SIZE
+        self.shm.buf[:split] = memoryview(cnf.offsets[:self.num_clauses + 1]).cast('B')
+        self.shm.buf[split:size] = memoryview(cnf.literals[:self.num_literals]).cast('B')
+
+    @property
+    def handle(self) -> Tuple[str, int, int, int]:
+        '''
+        What a worker needs to attach: (name, num_vars, num_clauses, num_literals)
+        '''
+        return self.shm.name, self.num_vars, self.num_clauses, self.num_literals
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_formula(handle: Tuple[str, int, int, int]):
+    '''
+    Returns (shared memory block, CNFFormula over it). Call release_formula when done
+    '''
+    name, num_vars, num_clauses, num_literals = handle
+    shm = shared_memory.SharedMemory(name=name)
+    split = (num_clauses + 1) * INT_SIZE
+    offsets = shm.buf[:split].cast('i')
+    literals = shm.buf[split:split + num_literals * INT_SIZE].cast('i')
+    return shm, CNFFormula(num_vars, literals, offsets)
+
+
+def release_formula(shm: shared_memory.SharedMemory, cnf: CNFFormula):
+    cnf.literals.release()
+    cnf.offsets.release()
+    shm.close()
+
+
+def solve_worker(handle: Tuple[str, int, int, int], index: int, config: Dict[str, Any],
+                 inboxes: Optional[list] = None, sharing: Optional[Dict[str, Any]] = None):
+    '''
+    Runs one portfolio member, exchanging learned clauses through `inboxes` if given.
+    Returns (index, result, assignments, stats)
+    '''
+    shm, cnf = attach_formula(handle)
+    try:
+        exchange = ClauseExchange(index, inboxes, **(sharing or {})) if inboxes is not None else None
+        solver = CDCL(cnf, exchange=exchange, **config)
+        result = solver.solve()
+        stats = {
+            'decisions': solver.num_decisions,
+            'conflicts': solver.num_conflicts,
+            'propagations': solver.num_propagations,
+            'restarts': solver.num_restarts,
+            'learned_clauses': solver.num_learned_clauses,
+        }
+        if exchange is not None:
+            stats['exported_clauses'] = exchange.num_exported
+            stats['imported_clauses'] = exchange.num_imported
+        assignments = solver.assignments if result else {}
+        del solver # Drops the clause views that reference the shared block
+        return index, result, assignments, stats
+    finally:
+        release_formula(shm, cnf)
+
+
+def run_worker(results, handle: Tuple[str, int, int, int], index: int, config: Dict[str, Any],
+               inboxes: Optional[list], sharing: Optional[Dict[str, Any]]):
+    '''
+    Process entry point: reports the outcome (or the exception) on the results queue
+    '''
+    try:
+        results.put(solve_worker(handle, index, config, inboxes, sharing))
+    except BaseException as e:
+        results.put((index, e, {}, {}))
+
+
+class Portfolio:
+    '''
+    Parallel portfolio: runs diversified CDCL configurations on the same
+    formula in a pool of up to `num_workers` processes and returns the first
+    definitive answer, terminating the remaining workers. (Each configuration
+    gets its own process so that it can be killed without disturbing the others.)
+
+    The formula is copied into shared memory once; workers wrap it in place
+    instead of receiving a pickled copy each.
+
+    With `share_clauses`, workers exchange short learned clauses through a
+    ClauseExchange; `sharing` holds its keyword arguments (LBD/size thresholds,
+    rate limits).
+    '''
+    def __init__(self, cnf: CNFFormula, num_workers: Optional[int] = None,
+                 configs: Optional[List[Dict[str, Any]]] = None, seed: int = 0,
+                 share_clauses: bool = True, sharing: Optional[Dict[str, Any]] = None):
+        self.cnf = cnf
+        self.share_clauses = share_clauses
+        self.sharing = sharing
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.configs = configs if configs is not None else diversify(self.num_workers, seed)
+        self.assignments: Dict[int, bool] = {}
+        self.winner: Optional[int] = None # Index into configs of the worker that answered
+        self.stats: Dict[str, int] = {}
+
+    @property
+    def winning_config(self) -> Optional[Dict[str, Any]]:
+        return None if self.winner is None else self.configs[self.winner]
+
+    def solve(self) -> Optional[bool]:
+        '''
+        Returns True if satisfiable, False if unsatisfiable, None if no worker answered
+        '''
+        if self.cnf.satisfiable is False:
+            return False
+
+        context = multiprocessing.get_context()
+        results = context.Queue()
+        shared = SharedFormula(self.cnf)
+        inboxes = [context.Queue() for _ in self.configs] if self.share_clauses and len(self.configs) > 1 else None
+        pending = list(enumerate(self.configs))
+        running = {}
+        try:
+            while pending or running:
+                while pending and len(running) < self.num_workers:
+                    index, config = pending.pop(0)
+                    process = context.Process(target=run_worker, args=(results, shared.handle, index, config,
+                                                                         inboxes, self.sharing),
+                                              daemon=True)
+                    process.start()
+                    running[index] = process
+
+                try:
+                    index, result, assignments, stats = results.get(timeout=0.1)
+                except queue.Empty:
+                    for index, process in running.items():
+                        if process.exitcode not in (None, 0):
+                            raise RuntimeError(f"Portfolio worker {index} died with exit code {process.exitcode}")
+                    continue
+                running.pop(index).join()
+                if isinstance(result, BaseException):
+                    raise result
+                if result is not None:
+                    self.winner = index
+                    self.assignments = assignments
+                    self.stats = stats
+                    self.cnf.satisfiable = result
+                    return result
+            return None
+        finally:
+            for process in running.values():
+                process.terminate() # Cancels every worker still searching
+            for process in running.values():
+                process.join()
+            results.close()
+            for inbox in inboxes or ():
+                inbox.cancel_join_thread()
+                inbox.close()
+            shared.close()
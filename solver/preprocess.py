@@ -0,0 +1,320 @@
+from .cnf import CNFFormula, Clause
+from collections import defaultdict
+from typing import Optional, List, Dict, Set, Tuple
+import time
+
+
+class Preprocessor:
+    '''
+    Simplifies a CNFFormula before it is handed to a solver.
+
+    Passes (each can be switched off):
+        - duplicate literal / tautology / duplicate clause removal (always on)
+        - top-level unit propagation
+        - pure literal elimination
+        - forward/backward subsumption
+        - self-subsuming resolution (clause strengthening)
+        - bounded variable elimination (BVE): a variable is resolved away if
+          that does not increase the number of clauses by more than `clause_growth`
+
+    The passes stop once `time_limit` seconds have passed since `run` was called;
+    the formula produced so far is still equisatisfiable. Variable numbering is
+    unchanged.
+
+    Unit, pure-literal and elimination steps change the set of models, so they
+    are recorded on a reconstruction stack of (witness literal, clause) pairs.
+    `extend_model` replays it backwards, making the witness True whenever its
+    clause is not satisfied, which turns any model of the reduced formula into
+    a model of the original one.
+    '''
+    def __init__(self, cnf: CNFFormula, units: bool = True, pure_literals: bool = True,
+                 subsumption: bool = True, self_subsumption: bool = True,
+                 variable_elimination: bool = True, time_limit: Optional[float] = None,
+                 max_occurrences: int = 16, max_resolvent_size: int = 24, clause_growth: int = 0):
+        self.cnf = cnf
+        self.use_units = units
+        self.use_pure_literals = pure_literals
+        self.use_subsumption = subsumption
+        self.use_self_subsumption = self_subsumption
+        self.use_variable_elimination = variable_elimination
+        self.time_limit = time_limit
+        self.max_occurrences = max_occurrences
+        self.max_resolvent_size = max_resolvent_size
+        self.clause_growth = clause_growth
+        self.deadline = None
+
+        self.clauses: List[Optional[Set[int]]] = [] # None for removed clauses
+        self.occurrences: Dict[int, Set[int]] = defaultdict(set) # literal -> ids of clauses containing it
+        self.values: Dict[int, bool] = {} # Top-level assignments
+        self.pending_units: List[int] = []
+        self.eliminated: Set[int] = set()
+        self.reconstruction: List[Tuple[int, List[int]]] = []
+        self.subsumption_queue: List[int] = []
+        self.satisfiable: Optional[bool] = None # False once the empty clause is derived
+
+        self.num_tautologies = 0
+        self.num_duplicates = 0
+        self.num_units = 0
+        self.num_pure_literals = 0
+        self.num_subsumed = 0
+        self.num_strengthened = 0
+        self.num_eliminated_vars = 0
+        self.num_resolvents = 0
+        self.timed_out = False
+
+    def out_of_time(self) -> bool:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    # --- Clause bookkeeping ---
+
+    def add_clause(self, literals) -> Optional[int]:
+        '''
+        Adds a clause after simplifying it under the top-level assignment.
+        Returns its id, or None if it was dropped
+        '''
+        clause = set()
+        for lit in literals:
+            value = self.values.get(abs(lit))
+            if value is not None:
+                if value == (lit > 0):
+                    return None # Satisfied at top level
+                continue # False at top level
+            if -lit in clause:
+                self.num_tautologies += 1
+                return None
+            clause.add(lit)
+
+        if not clause:
+            self.satisfiable = False
+            return None
+        if len(clause) == 1:
+            self.pending_units.append(next(iter(clause)))
+        cid = len(self.clauses)
+        self.clauses.append(clause)
+        for lit in clause:
+            self.occurrences[lit].add(cid)
+        self.subsumption_queue.append(cid)
+        return cid
+
+    def remove_clause(self, cid: int):
+        for lit in self.clauses[cid]:
+            self.occurrences[lit].discard(cid)
+        self.clauses[cid] = None
+
+    def strengthen(self, cid: int, lit: int):
+        '''
+        Removes a (False or redundant) literal from a clause
+        '''
+        clause = self.clauses[cid]
+        clause.discard(lit)
+        self.occurrences[lit].discard(cid)
+        if not clause:
+            self.satisfiable = False
+        elif len(clause) == 1:
+            self.pending_units.append(next(iter(clause)))
+        self.subsumption_queue.append(cid)
+
+    # --- Passes ---
+
+    def propagate_units(self):
+        if not self.use_units:
+            self.pending_units = []
+            return
+        while self.pending_units and self.satisfiable is not False:
+            lit = self.pending_units.pop()
+            value = self.values.get(abs(lit))
+            if value is not None:
+                if value != (lit > 0):
+                    self.satisfiable = False
+                continue
+            self.values[abs(lit)] = lit > 0
+            self.reconstruction.append((lit, [lit]))
+            self.num_units += 1
+            for cid in list(self.occurrences[lit]):
+                self.remove_clause(cid)
+            for cid in list(self.occurrences[-lit]):
+                self.strengthen(cid, -lit)
+
+    def eliminate_pure_literals(self):
+        candidates = set(abs(lit) for lit in self.occurrences)
+        while candidates and not self.out_of_time():
+            var = candidates.pop()
+            if var in self.values or var in self.eliminated:
+                continue
+            pos, neg = self.occurrences[var], self.occurrences[-var]
+            if bool(pos) == bool(neg):
+                continue # Both polarities occur, or the variable is gone
+            lit = var if pos else -var
+            self.reconstruction.append((lit, [lit]))
+            self.eliminated.add(var)
+            self.num_pure_literals += 1
+            for cid in list(self.occurrences[lit]):
+                for other in self.clauses[cid]:
+                    candidates.add(abs(other))
+                self.remove_clause(cid)
+
+    def subsumes(self, clause: Set[int], other: Set[int]) -> Optional[int]:
+        '''
+        Returns 0 if clause subsumes other, a literal l if clause with l negated
+        subsumes other (so -l can be removed from other), else None
+        '''
+        flipped = 0
+        for lit in clause:
+            if lit in other:
+                continue
+            if flipped == 0 and -lit in other:
+                flipped = lit
+                continue
+            return None
+        return flipped
+
+    def run_subsumption(self):
+        '''
+        Backward subsumption and self-subsuming resolution from every queued clause
+        '''
+        while self.subsumption_queue and self.satisfiable is not False:
+            if self.out_of_time():
+                return
+            queue = sorted(set(self.subsumption_queue), key=lambda c: len(self.clauses[c] or ()))
+            self.subsumption_queue = []
+            for cid in queue:
+                clause = self.clauses[cid]
+                if not clause:
+                    continue
+                # Any clause subsumed or strengthened by this one contains best or -best
+                best = min(clause, key=lambda l: len(self.occurrences[l]) + len(self.occurrences[-l]))
+                for other_id in list(self.occurrences[best] | self.occurrences[-best]):
+                    other = self.clauses[other_id]
+                    if other_id == cid or other is None or len(other) < len(clause):
+                        continue
+                    result = self.subsumes(clause, other)
+                    if result == 0:
+                        self.remove_clause(other_id)
+                        self.num_subsumed += 1
+                    elif result is not None and self.use_self_subsumption:
+                        self.strengthen(other_id, -result)
+                        self.num_strengthened += 1
+                self.propagate_units()
+                if self.satisfiable is False:
+                    return
+
+    def is_subsumed(self, clause: Set[int]) -> bool:
+        '''
+        Forward subsumption check for a new clause
+        '''
+        best = min(clause, key=lambda l: len(self.occurrences[l]))
+        for other_id in self.occurrences[best]:
+            other = self.clauses[other_id]
+            if len(other) <= len(clause) and other <= clause:
+                return True
+        return False
+
+    def try_eliminate(self, var: int) -> bool:
+        pos = [self.clauses[c] for c in self.occurrences[var]]
+        neg = [self.clauses[c] for c in self.occurrences[-var]]
+        if len(pos) > self.max_occurrences or len(neg) > self.max_occurrences:
+            return False
+
+        limit = len(pos) + len(neg) + self.clause_growth
+        resolvents = []
+        for p in pos:
+            for n in neg:
+                resolvent = (p - {var}) | (n - {-var})
+                if any(-lit in resolvent for lit in resolvent):
+                    continue # Tautology
+                if len(resolvent) > self.max_resolvent_size:
+                    return False
+                resolvents.append(resolvent)
+                if len(resolvents) > limit:
+                    return False
+
+        # Reconstruction: first force var False, then flip it if a positive clause needs it
+        for p in pos:
+            self.reconstruction.append((var, list(p)))
+        self.reconstruction.append((-var, [-var]))
+        for cid in list(self.occurrences[var]) + list(self.occurrences[-var]):
+            self.remove_clause(cid)
+        self.eliminated.add(var)
+        self.num_eliminated_vars += 1
+
+        for resolvent in resolvents:
+            if self.use_subsumption and self.is_subsumed(resolvent):
+                continue
+            self.add_clause(resolvent)
+            self.num_resolvents += 1
+        return True
+
+    def eliminate_variables(self):
+        variables = [v for v in range(1, self.cnf.num_vars + 1)
+                     if v not in self.values and v not in self.eliminated]
+        # Cheapest candidates first
+        variables.sort(key=lambda v: len(self.occurrences[v]) * len(self.occurrences[-v]))
+        for var in variables:
+            if self.out_of_time() or self.satisfiable is False:
+                return
+            if var in self.values or var in self.eliminated:
+                continue
+            if not self.occurrences[var] and not self.occurrences[-var]:
+                continue
+            if self.try_eliminate(var):
+                self.propagate_units()
+                if self.use_subsumption:
+                    self.run_subsumption()
+
+    # --- Driver ---
+
+    def run(self) -> CNFFormula:
+        '''
+        Runs the enabled passes and returns the reduced formula
+        '''
+        if self.time_limit is not None:
+            self.deadline = time.perf_counter() + self.time_limit
+
+        seen = set()
+        for i in range(len(self.cnf)):
+            literals = frozenset(self.cnf.clause_literals(i))
+            if literals in seen:
+                self.num_duplicates += 1
+                continue
+            seen.add(literals)
+            self.add_clause(literals)
+        del seen
+
+        self.propagate_units()
+        if self.use_pure_literals and self.satisfiable is not False:
+            self.eliminate_pure_literals()
+        if self.use_subsumption and self.satisfiable is not False:
+            self.run_subsumption()
+        else:
+            self.subsumption_queue = []
+        if self.use_variable_elimination and self.satisfiable is not False:
+            self.eliminate_variables()
+        self.propagate_units()
+        return self.reduced_formula()
+
+    def reduced_formula(self) -> CNFFormula:
+        reduced = CNFFormula(self.cnf.num_vars)
+        if self.satisfiable is False:
+            reduced.add_clause(Clause([]))
+            reduced.satisfiable = False
+            return reduced
+        for clause in self.clauses:
+            if clause is not None:
+                reduced.add_clause(Clause(sorted(clause, key=abs)))
+        return reduced
+
+    def extend_model(self, assignments: Dict[int, bool]) -> Dict[int, bool]:
+        '''
+        Extends a model of the reduced formula to a model of the original formula
+        '''
+        model = {var: assignments.get(var, False) for var in range(1, self.cnf.num_vars + 1)}
+        for witness, clause in reversed(self.reconstruction):
+            if not any(model[abs(lit)] == (lit > 0) for lit in clause):
+                model[abs(witness)] = witness > 0
+        return model
+
+    @property
+    def num_removed_clauses(self) -> int:
+        return len(self.cnf) - sum(1 for clause in self.clauses if clause is not None)
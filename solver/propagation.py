@@ -0,0 +1,134 @@
+from .cnf import Clause
+from .state import TRUE, FALSE
+from typing import Optional, List
+
+
+class WatchedLiterals:
+    '''
+    Two-watched-literal unit propagation.
+
+    Every clause with two or more literals watches its first two literals
+    (clause.literals[0] and clause.literals[1]). A clause only has to be looked
+    at when one of its watched literals becomes False, so propagating an
+    assignment costs time proportional to the clauses watching it, not to the
+    size of the whole formula.
+
+    The engine is driven by the solver's trail: every literal appended to the
+    trail (by a decision or an implication) is queued, and `propagate` works
+    through the queue until it is empty or a clause becomes falsified.
+
+    Clauses hold literal indices (see `state.lit_index`). The solver only needs
+    to provide the `SolverState` arrays and `assign(lit, antecedent)`.
+    '''
+    def __init__(self, solver):
+        self.solver = solver
+        self.watches: List[List[Clause]] = [[] for _ in range(2 * solver.num_vars + 2)]
+        self.qhead = 0 # Index of the next trail entry to propagate
+
+    def add_clause(self, clause: Clause) -> Optional[Clause]:
+        '''
+        Starts watching a clause. The clause may be added under a partial
+        assignment (e.g. a learned clause after backjumping): its literals are
+        reordered so that the watches are valid, and if the clause is unit its
+        remaining literal is assigned.
+
+        Returns the clause if it is falsified by the current assignment, else None
+        '''
+        lits = clause.literals
+        if not lits:
+            return clause
+        values = self.solver.values
+
+        # Non-False literals first, then False literals from the highest decision level down
+        if len(lits) > 1:
+            lits.sort(key=self._watch_priority)
+            self.watches[lits[0]].append(clause)
+            self.watches[lits[1]].append(clause)
+            if values[lits[1]] != FALSE:
+                return None # Two non-False watches, nothing to do
+
+        if values[lits[0]] == FALSE:
+            return clause
+        if values[lits[0]] != TRUE:
+            self.solver.assign(lits[0], clause)
+        return None
+
+    def _watch_priority(self, lit: int):
+        if self.solver.values[lit] != FALSE:
+            return (0, 0)
+        return (1, -self.solver.levels[lit >> 1])
+
+    def remove_clauses(self, clauses: List[Clause]):
+        '''
+        Stops watching the given clauses (they are watched on literals[0] and literals[1])
+        '''
+        removed = set(map(id, clauses))
+        affected = set()
+        for clause in clauses:
+            affected.add(clause.literals[0])
+            affected.add(clause.literals[1])
+        for lit in affected:
+            self.watches[lit] = [c for c in self.watches[lit] if id(c) not in removed]
+
+    def backtrack(self, position: int):
+        '''
+        Called after the solver has removed or moved the trail entries from
+        `position` on. Moved (out-of-order) literals are propagated again
+        '''
+        self.qhead = min(self.qhead, position)
+
+    def propagate(self) -> Optional[Clause]:
+        '''
+        Propagates every queued trail literal.
+        Returns the conflicting clause if a clause became falsified, else None
+        '''
+        solver = self.solver
+        trail = solver.trail
+        values = solver.values
+        watches = self.watches
+
+        while self.qhead < len(trail):
+            false_lit = trail[self.qhead] ^ 1
+            self.qhead += 1
+
+            watchers = watches[false_lit]
+            i = 0 # Read position in watchers
+            j = 0 # Write position for clauses that keep watching false_lit
+            while i < len(watchers):
+                clause = watchers[i]
+                i += 1
+                lits = clause.literals
+
+                # Keep the False watch in position 1
+                if lits[0] == false_lit:
+                    lits[0], lits[1] = lits[1], false_lit
+
+                first = lits[0]
+                first_value = values[first]
+                if first_value == TRUE:
+                    watchers[j] = clause
+                    j += 1
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(lits)):
+                    if values[lits[k]] != FALSE:
+                        lits[1], lits[k] = lits[k], false_lit
+                        watches[lits[1]].append(clause)
+                        break
+                else:
+                    # No replacement: the clause is unit or falsified
+                    watchers[j] = clause
+                    j += 1
+                    if first_value == FALSE:
+                        while i < len(watchers):
+                            watchers[j] = watchers[i]
+                            i += 1
+                            j += 1
+                        del watchers[j:]
+                        self.qhead = len(trail)
+                        return clause
+                    solver.assign(first, clause)
+
+            del watchers[j:]
+        return None
@@ -0,0 +1,133 @@
+from typing import Dict, Type
+
+
+class RestartPolicy:
+    '''
+    Decides when the CDCL search should restart (backjump to level 0).
+    The solver calls `on_conflict` with the LBD of every learned clause and
+    asks `should_restart` before each decision. Learned clauses and VSIDS
+    scores are kept across restarts.
+    '''
+    def __init__(self):
+        self.conflicts_since_restart = 0
+
+    def on_conflict(self, lbd: int):
+        self.conflicts_since_restart += 1
+
+    def should_restart(self) -> bool:
+        return False
+
+    def on_restart(self):
+        self.conflicts_since_restart = 0
+
+
+class NoRestarts(RestartPolicy):
+    pass
+
+
+def luby(i: int) -> int:
+    '''
+    i-th element (starting at 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    '''
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class LubyRestarts(RestartPolicy):
+    '''
+    Restarts after unit * luby(n) conflicts in the n-th run
+    '''
+    def __init__(self, unit: int = 100):
+        super().__init__()
+        self.unit = unit
+        self.run = 1
+        self.limit = unit * luby(1)
+
+    def should_restart(self) -> bool:
+        return self.conflicts_since_restart >= self.limit
+
+    def on_restart(self):
+        super().on_restart()
+        self.run += 1
+        self.limit = self.unit * luby(self.run)
+
+
+class GeometricRestarts(RestartPolicy):
+    '''
+    Restarts after first, first * factor, first * factor^2, ... conflicts
+    '''
+    def __init__(self, first: int = 100, factor: float = 1.5):
+        super().__init__()
+        self.factor = factor
+        self.limit = float(first)
+
+    def should_restart(self) -> bool:
+        return self.conflicts_since_restart >= self.limit
+
+    def on_restart(self):
+        super().on_restart()
+        self.limit *= self.factor
+
+
+class EMA:
+    '''
+    Exponential moving average with bias correction for the first samples
+    '''
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.biased = 0.0
+        self.weight = 0.0
+
+    def update(self, value: float):
+        self.biased += self.alpha * (value - self.biased)
+        self.weight += self.alpha * (1.0 - self.weight)
+
+    @property
+    def value(self) -> float:
+        return self.biased / self.weight if self.weight else 0.0
+
+
+class GlucoseRestarts(RestartPolicy):
+    '''
+    Glucose-style dynamic restarts: restart when the LBD of recently learned
+    clauses (fast moving average) is clearly worse than the long-run average
+    (slow moving average), i.e. the current search prefix is producing poor clauses
+    '''
+    def __init__(self, fast_alpha: float = 1 / 32, slow_alpha: float = 1 / 4096,
+                 margin: float = 1.25, min_conflicts: int = 50):
+        super().__init__()
+        self.fast = EMA(fast_alpha)
+        self.slow = EMA(slow_alpha)
+        self.margin = margin
+        self.min_conflicts = min_conflicts
+
+    def on_conflict(self, lbd: int):
+        super().on_conflict(lbd)
+        self.fast.update(lbd)
+        self.slow.update(lbd)
+
+    def should_restart(self) -> bool:
+        if self.conflicts_since_restart < self.min_conflicts:
+            return False
+        return self.fast.value > self.margin * self.slow.value
+
+
+RESTART_POLICIES: Dict[str, Type[RestartPolicy]] = {
+    'none': NoRestarts,
+    'luby': LubyRestarts,
+    'geometric': GeometricRestarts,
+    'glucose': GlucoseRestarts,
+}
+
+
+def make_restart_policy(name: str, **kwargs) -> RestartPolicy:
+    if name not in RESTART_POLICIES:
+        raise ValueError(f"Unknown restart policy {name!r}, expected one of {sorted(RESTART_POLICIES)}")
+    return RESTART_POLICIES[name](**kwargs)
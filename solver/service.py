@@ -0,0 +1,261 @@
+'''
+Asyncio front end for batches of SAT queries.
+
+Requests wait in a bounded queue (callers are suspended while it is full,
+which gives backpressure), a fixed number of dispatchers hand them to a pool
+of warm worker processes, and every request has a time limit enforced inside
+the worker by the solver's budget. Definitive results are cached under a
+canonical hash of the formula, and identical requests in flight share one solve.
+
+In-process use:
+
+    async with SolverService(num_workers=4) as service:
+        result = await service.solve(cnf, timeout=10)
+
+Over a socket, one JSON object per line in each direction:
+
+    {"id": 1, "dimacs": "p cnf 2 1\\n1 -2 0\\n", "timeout": 10}
+    {"id": 1, "status": "SAT", "model": [1, -2], "stats": {...}, "cached": false}
+'''
+from .cdcl import CDCL
+from .cnf import CNFFormula
+from .dimacs_parser import DIMACS_Parser
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Tuple, Any
+import asyncio
+import hashlib
+import io
+import json
+import os
+
+
+def canonical_hash(cnf: CNFFormula) -> str:
+    '''
+    Hash that is equal for formulas differing only in clause order, literal
+    order within clauses or duplicate literals/clauses
+    '''
+    clauses = sorted(set(tuple(sorted(set(cnf.clause_literals(i)))) for i in range(len(cnf))))
+    digest = hashlib.sha256(f"{cnf.num_vars}\n".encode())
+    for clause in clauses:
+        digest.update(array('i', clause).tobytes())
+        digest.update(b'\0\0\0\0') # Clause terminator (0 is never a literal)
+    return digest.hexdigest()
+
+
+def warm_up() -> int:
+    return os.getpid()
+
+
+def solve_job(num_vars: int, literals: bytes, offsets: bytes, config: Dict[str, Any],
+              timeout: Optional[float]) -> Dict[str, Any]:
+    '''
+    Runs in a worker process: solves the formula with a time budget
+    '''
+    cnf = CNFFormula(num_vars, array('i'), array('i'))
+    cnf.literals.frombytes(literals)
+    cnf.offsets.frombytes(offsets)
+    solver = CDCL(cnf, **config)
+    result = solver.solve(time_limit=timeout)
+    model = None
+    if result:
+        model = [var if value else -var for var, value in sorted(solver.assignments.items())]
+    return {
+        'status': 'SAT' if result else 'UNSAT' if result is False else 'UNKNOWN',
+        'model': model,
+        'stats': solver.stats(),
+    }
+
+
+class SolverService:
+    '''
+    Solves CNFFormulas on a pool of `num_workers` warm processes.
+
+    At most `max_pending` requests wait in the queue; further `solve` calls
+    suspend until there is room. `timeout` is the default per-request time
+    limit in seconds (a request that hits it is answered with status UNKNOWN).
+    The `cache_size` most recent SAT/UNSAT results are kept.
+
+    Over a socket, each connection has at most `max_connection_requests`
+    requests in progress; the next line is only read once one of them is
+    answered, so a client streaming requests is slowed down instead of
+    piling up tasks. A request line may be at most `max_line_bytes` long.
+    '''
+    def __init__(self, num_workers: Optional[int] = None, max_pending: int = 64,
+                 timeout: Optional[float] = None, cache_size: int = 1024,
+                 config: Optional[Dict[str, Any]] = None, max_connection_requests: int = 16,
+                 max_line_bytes: int = 64 << 20):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_connection_requests = max_connection_requests
+        self.max_line_bytes = max_line_bytes
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.config = config or {}
+        self.cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.in_flight: Dict[Tuple[str, Optional[float]], asyncio.Future] = {} # Same formula and time limit share one solve
+        self.queue: Optional[asyncio.Queue] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.dispatchers = []
+        self.num_requests = 0
+        self.num_cache_hits = 0
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self.pool = ProcessPoolExecutor(max_workers=self.num_workers)
+        loop = asyncio.get_running_loop()
+        # Start every worker now so that requests do not pay for process start-up
+        await asyncio.gather(*(loop.run_in_executor(self.pool, warm_up) for _ in range(self.num_workers)))
+        self.dispatchers = [asyncio.create_task(self.dispatch()) for _ in range(self.num_workers)]
+
+    async def close(self):
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.dispatchers = []
+        while self.queue is not None and not self.queue.empty():
+            _, _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("SolverService closed"))
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            cnf, timeout, future = await self.queue.get()
+            try:
+                num_literals = cnf.offsets[len(cnf)]
+                result = await loop.run_in_executor(
+                    self.pool, solve_job, cnf.num_vars,
+                    array('i', cnf.literals[:num_literals]).tobytes(),
+                    array('i', cnf.offsets[:len(cnf) + 1]).tobytes(), self.config, timeout)
+                if not future.done():
+                    future.set_result(result)
+            except asyncio.CancelledError: # close() while the request runs
+                if not future.done():
+                    future.set_exception(RuntimeError("SolverService closed"))
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def solve(self, cnf: CNFFormula, timeout: Optional[float] = None) -> Dict[str, Any]:
+        '''
+        Returns {'status': 'SAT' | 'UNSAT' | 'UNKNOWN', 'model': DIMACS literals or None,
+        'stats': solver stats, 'cached': whether no new solve was needed}
+        '''
+        timeout = self.request_timeout(timeout)
+        key = await asyncio.to_thread(canonical_hash, cnf) # Sorting every clause would block the event loop
+        return await self.solve_hashed(cnf, key, timeout)
+
+    async def solve_dimacs(self, dimacs: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        timeout = self.request_timeout(timeout)
+
+        def parse() -> Tuple[CNFFormula, str]:
+            cnf = DIMACS_Parser(io.BytesIO(dimacs.encode())).cnf
+            return cnf, canonical_hash(cnf)
+
+        cnf, key = await asyncio.to_thread(parse)
+        return await self.solve_hashed(cnf, key, timeout)
+
+    def request_timeout(self, timeout: Optional[float]) -> Optional[float]:
+        '''
+        The time limit for a request: `timeout`, or the service default. Raises ValueError if it is invalid
+        '''
+        if self.queue is None:
+            raise RuntimeError("SolverService is not started")
+        if timeout is None:
+            timeout = self.timeout
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout >= 0):
+            raise ValueError(f"timeout must be a non-negative number of seconds, got {timeout!r}")
+        return timeout
+
+    async def solve_hashed(self, cnf: CNFFormula, key: str, timeout: Optional[float]) -> Dict[str, Any]:
+        self.num_requests += 1
+        if cnf.satisfiable is False: # The parser found an empty clause
+            return {'status': 'UNSAT', 'model': None, 'stats': {}, 'cached': False}
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.num_cache_hits += 1
+            return dict(self.cache[key], cached=True)
+        if (key, timeout) in self.in_flight:
+            self.num_cache_hits += 1
+            return dict(await asyncio.shield(self.in_flight[key, timeout]), cached=True)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key, timeout] = future
+        try:
+            await self.queue.put((cnf, timeout, future)) # Waits while the queue is full
+            result = await asyncio.shield(future)
+        finally:
+            del self.in_flight[key, timeout]
+        if result['status'] != 'UNKNOWN':
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return dict(result, cached=False)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        '''
+        Answers JSON-lines requests; responses are written as they complete and carry the request id
+        '''
+        write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.max_connection_requests)
+        tasks = set()
+
+        async def answer(line):
+            request = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict) or not isinstance(request.get('dimacs'), str):
+                    raise ValueError("Expected a JSON object with a 'dimacs' string")
+                response = await self.solve_dimacs(request['dimacs'], request.get('timeout'))
+            except Exception as e: # Bad requests, but also a broken worker pool or a closed service
+                response = {'status': 'ERROR', 'error': str(e) or type(e).__name__}
+            response['id'] = request.get('id') if isinstance(request, dict) else None
+            try:
+                async with write_lock:
+                    writer.write(json.dumps(response).encode() + b'\n')
+                    await writer.drain()
+            finally:
+                slots.release()
+
+        try:
+            while True:
+                await slots.acquire() # Stop reading while the connection has too many requests in progress
+                try:
+                    line = await reader.readline()
+                except ValueError: # Longer than max_line_bytes
+                    async with write_lock:
+                        writer.write(json.dumps({'status': 'ERROR', 'error': f"Request longer than {self.max_line_bytes} bytes",
+                                                 'id': None}).encode() + b'\n')
+                        await writer.drain()
+                    break
+                if not line:
+                    break
+                task = asyncio.create_task(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 0, path: Optional[str] = None) -> asyncio.AbstractServer:
+        '''
+        Starts a JSON-lines endpoint on TCP (host, port) or, if `path` is given, on a Unix socket
+        '''
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path=path, limit=self.max_line_bytes)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=self.max_line_bytes)
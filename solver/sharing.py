@@ -0,0 +1,79 @@
+from typing import List, Tuple
+import queue
+
+
+class ClauseExchange:
+    '''
+    One worker's end of a learned-clause exchange between parallel solvers.
+
+    Every worker has an inbox (a multiprocessing queue). A clause exported by
+    a worker is put into the inboxes of all the others; a worker drains its own
+    inbox when it restarts. Clauses are sent as literal-index lists, which mean
+    the same thing in every worker solving the same formula.
+
+    Only short, high-quality clauses are shared (LBD <= `max_lbd` and at most
+    `max_size` literals). At most `export_limit` clauses are exported and
+    `import_limit` imported per restart interval, and clauses this worker has
+    already sent or received are dropped, so that sharing does not flood
+    propagation with duplicates.
+    '''
+    def __init__(self, worker_id: int, inboxes: list, max_lbd: int = 2, max_size: int = 8,
+                 export_limit: int = 100, import_limit: int = 1000):
+        self.worker_id = worker_id
+        self.inbox = inboxes[worker_id]
+        self.outboxes = [inbox for i, inbox in enumerate(inboxes) if i != worker_id]
+        self.max_lbd = max_lbd
+        self.max_size = max_size
+        self.export_limit = export_limit
+        self.import_limit = import_limit
+        self.known = set() # Sorted literal tuples already sent or received
+        self.exports_left = export_limit
+
+        self.num_exported = 0
+        self.num_imported = 0
+        self.num_duplicates = 0
+        self.num_rate_limited = 0
+
+        # Do not block process exit on clauses nobody will read any more
+        for outbox in self.outboxes:
+            outbox.cancel_join_thread()
+
+    def export(self, literals: List[int], lbd: int) -> bool:
+        '''
+        Offers a learned clause to the other workers. Returns True if it was sent
+        '''
+        if lbd > self.max_lbd or len(literals) > self.max_size:
+            return False
+        key = tuple(sorted(literals))
+        if key in self.known:
+            self.num_duplicates += 1
+            return False
+        if self.exports_left <= 0:
+            self.num_rate_limited += 1
+            return False
+        self.known.add(key)
+        self.exports_left -= 1
+        self.num_exported += 1
+        for outbox in self.outboxes:
+            outbox.put((key, lbd))
+        return True
+
+    def receive(self) -> List[Tuple[List[int], int]]:
+        '''
+        Drains up to import_limit new clauses from the inbox as (literals, lbd)
+        pairs and starts a new rate-limiting interval
+        '''
+        self.exports_left = self.export_limit
+        received = []
+        while len(received) < self.import_limit:
+            try:
+                key, lbd = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            if key in self.known:
+                self.num_duplicates += 1
+                continue
+            self.known.add(key)
+            received.append((list(key), lbd))
+        self.num_imported += len(received)
+        return received
@@ -0,0 +1,261 @@
+'''
+Binary snapshots of formulas and solver checkpoints.
+
+A snapshot file is a header, a section table and the sections themselves,
+each 8-byte aligned:
+
+    header   magic b'SATSNAP\\0', format version, byte-order mark, section count
+    table    per section: name (24 bytes), typecode (array/memoryview format),
+             offset, size in bytes, number of items
+    data     raw native arrays, e.g. formula.offsets and formula.literals
+
+Reading memory-maps the file and returns memoryviews cast to each section's
+type, so the clause arena of a formula is used in place without parsing or
+copying. A checkpoint additionally holds the learned clause database, the
+level-0 units, clauses added between solve calls, VSIDS activities, saved
+phases and the solver counters, from which a CDCL solver can resume.
+
+    python -m solver.snapshot tests/cnf_files/*.cnf    # writes <name>.snap next to each file
+'''
+from .cdcl import CDCL
+from .clause_db import LearnedClause
+from .cnf import CNFFormula, Clause
+from .state import UNASSIGNED, FALSE
+from array import array
+from typing import Optional, List, Dict, Tuple, Any
+import argparse
+import json
+import mmap
+import struct
+
+MAGIC = b'SATSNAP\0'
+VERSION = 1
+BYTE_ORDER_MARK = struct.pack('=I', 0x01020304) # Native order: differs between little- and big-endian writers
+HEADER = struct.Struct('<8sI4sI4x') # magic, version, byte-order mark, number of sections
+SECTION = struct.Struct('<24s4sQQQ')
+ALIGNMENT = 8
+
+# Solver attributes saved with a checkpoint
+SOLVER_COUNTERS = ('num_decisions', 'num_conflicts', 'num_propagations', 'num_learned_clauses', 'num_restarts',
+                   'num_learned_literals', 'num_learned_literals_before_minimization', 'max_decision_level',
+                   'num_chrono_backtracks', 'solve_time')
+CLAUSE_DB_COUNTERS = ('increment', 'next_reduce', 'num_reductions', 'num_cap_reductions', 'cap_limit', 'num_deleted')
+
+
+def write_snapshot(path: str, sections: List[Tuple[str, Any]], meta: Dict[str, Any]):
+    '''
+    Writes (name, array or memoryview) sections plus a JSON `meta` section
+    '''
+    sections = [(name, memoryview(data)) for name, data in sections]
+    sections.append(('meta', memoryview(json.dumps(meta).encode())))
+    offset = HEADER.size + SECTION.size * len(sections)
+    table = []
+    for name, view in sections:
+        offset += -offset % ALIGNMENT
+        table.append(SECTION.pack(name.encode(), view.format.encode(), offset, view.nbytes, len(view)))
+        offset += view.nbytes
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, len(sections)))
+        for entry in table:
+            f.write(entry)
+        for (name, view), entry in zip(sections, table):
+            f.seek(SECTION.unpack(entry)[2])
+            if view.nbytes:
+                f.write(view.cast('B'))
+
+
+class Snapshot:
+    '''
+    A memory-mapped snapshot file. `section(name)` returns a read-only
+    memoryview of the section's items, backed directly by the mapping
+    '''
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{path} is not a snapshot file")
+        magic, version, byte_order_mark, num_sections = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        if version > VERSION:
+            raise ValueError(f"{path} has snapshot format version {version}, this reader supports up to {VERSION}")
+        if byte_order_mark != BYTE_ORDER_MARK:
+            raise ValueError(f"{path} was written on a machine with a different byte order")
+
+        self.sections: Dict[str, Tuple[str, int, int, int]] = {}
+        for i in range(num_sections):
+            name, typecode, offset, nbytes, count = SECTION.unpack_from(self.map, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b'\0').decode()] = (typecode.rstrip(b'\0').decode(), offset, nbytes, count)
+        self.views: List[memoryview] = []
+        self.meta: Dict[str, Any] = json.loads(bytes(self.section('meta')))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def section(self, name: str) -> memoryview:
+        typecode, offset, nbytes, count = self.sections[name]
+        view = memoryview(self.map)[offset:offset + nbytes].cast(typecode)
+        if len(view) != count:
+            raise ValueError(f"Section {name} of {self.path} does not match this platform's item size for {typecode!r}")
+        self.views.append(view)
+        return view
+
+    def formula(self) -> CNFFormula:
+        '''
+        The formula over the mapped clause arena (read-only, nothing is copied)
+        '''
+        cnf = CNFFormula(self.meta['num_vars'], self.section('formula.literals'), self.section('formula.offsets'))
+        cnf.satisfiable = self.meta.get('satisfiable')
+        return cnf
+
+    def close(self):
+        '''
+        Unmaps the file. Formulas returned by `formula` must not be used afterwards
+        '''
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def formula_sections(cnf: CNFFormula) -> List[Tuple[str, Any]]:
+    num_clauses = len(cnf)
+    return [('formula.offsets', memoryview(cnf.offsets)[:num_clauses + 1]),
+            ('formula.literals', memoryview(cnf.literals)[:cnf.offsets[num_clauses]])]
+
+
+def save_formula(path: str, cnf: CNFFormula):
+    write_snapshot(path, formula_sections(cnf),
+                   {'kind': 'formula', 'num_vars': cnf.num_vars, 'satisfiable': cnf.satisfiable})
+
+
+def load_formula(path: str) -> CNFFormula:
+    '''
+    Memory-maps a formula or checkpoint snapshot; the mapping stays open as long as the formula is referenced
+    '''
+    return Snapshot(path).formula()
+
+
+def save_checkpoint(path: str, solver: CDCL):
+    '''
+    Saves the solver's formula and everything it has learned. Can be called
+    between solve calls, e.g. after a call stopped by its budget
+    '''
+    if solver.vsids is None:
+        raise ValueError("Checkpoints store VSIDS activity; the solver has no VSIDS heap")
+    learned_literals, learned_offsets = array('i'), array('i', [0])
+    lbds, activities = array('i'), array('d')
+    for clause in solver.clause_db:
+        learned_literals.extend(clause.literals)
+        learned_offsets.append(len(learned_literals))
+        lbds.append(clause.lbd)
+        activities.append(clause.activity)
+    added_literals, added_offsets = array('i'), array('i', [0])
+    for clause in solver.added_clauses:
+        added_literals.extend(clause.literals)
+        added_offsets.append(len(added_literals))
+    units = array('i', [lit for lit in solver.trail if solver.levels[lit >> 1] == 0])
+
+    sections = formula_sections(solver.cnf) + [
+        ('learned.offsets', learned_offsets), ('learned.literals', learned_literals),
+        ('learned.lbd', lbds), ('learned.activity', activities),
+        ('added.offsets', added_offsets), ('added.literals', added_literals),
+        ('units', units),
+        ('vsids.activity', solver.vsids.activity),
+        ('saved_phase', solver.saved_phase),
+    ]
+    meta = {
+        'kind': 'checkpoint',
+        'num_vars': solver.num_vars,
+        'satisfiable': solver.cnf.satisfiable,
+        'solver': {name: getattr(solver, name) for name in SOLVER_COUNTERS},
+        'clause_db': {name: getattr(solver.clause_db, name) for name in CLAUSE_DB_COUNTERS},
+        'vsids_increment': solver.vsids.increment,
+    }
+    write_snapshot(path, sections, meta)
+
+
+def restore_checkpoint(solver: CDCL, snapshot: Snapshot):
+    '''
+    Loads a checkpoint into a solver freshly constructed over the same formula.
+    The solver must not write a DRAT proof: the restored clauses were derived
+    in an earlier run, so a new proof could not justify them
+    '''
+    if solver.proof is not None:
+        raise ValueError("Clauses restored from a checkpoint cannot be justified in a DRAT proof")
+    meta = snapshot.meta
+    if meta.get('kind') != 'checkpoint':
+        raise ValueError(f"{snapshot.path} is not a solver checkpoint")
+    if meta['num_vars'] != solver.num_vars:
+        raise ValueError(f"Checkpoint has {meta['num_vars']} variables, the solver {solver.num_vars}")
+
+    offsets, literals = snapshot.section('added.offsets'), snapshot.section('added.literals')
+    for i in range(len(offsets) - 1):
+        solver.add_clause(literals[offsets[i]:offsets[i + 1]].tolist())
+
+    # Level-0 units first, so learned clauses are watched under the level-0 assignment
+    for lit in snapshot.section('units'):
+        if solver.values[lit] == UNASSIGNED:
+            solver.propagator.add_clause(Clause([lit]))
+        elif solver.values[lit] == FALSE and solver.root_conflict is None:
+            solver.root_conflict = Clause([lit])
+    offsets, literals = snapshot.section('learned.offsets'), snapshot.section('learned.literals')
+    lbds, activities = snapshot.section('learned.lbd'), snapshot.section('learned.activity')
+    for i in range(len(lbds)):
+        clause = LearnedClause(literals[offsets[i]:offsets[i + 1]].tolist(), lbds[i])
+        clause.activity = activities[i]
+        if len(clause.literals) > 1:
+            solver.clause_db.add(clause)
+        conflict = solver.propagator.add_clause(clause)
+        if conflict is not None and solver.root_conflict is None:
+            solver.root_conflict = conflict
+
+    solver.vsids.activity[:] = array('d', snapshot.section('vsids.activity'))
+    solver.vsids.increment = meta['vsids_increment']
+    solver.vsids.rebuild_heap()
+    solver.saved_phase[:] = array('b', snapshot.section('saved_phase'))
+    for name, value in meta['solver'].items():
+        setattr(solver, name, value)
+    for name, value in meta['clause_db'].items():
+        setattr(solver.clause_db, name, value)
+
+
+def load_checkpoint(path: str, **options) -> CDCL:
+    '''
+    Returns a CDCL solver (constructed with `options`, which cannot include
+    `proof`) over the checkpoint's memory-mapped formula, with the
+    checkpoint's state restored
+    '''
+    if options.get('proof') is not None:
+        raise ValueError("Clauses restored from a checkpoint cannot be justified in a DRAT proof")
+    snapshot = Snapshot(path)
+    solver = CDCL(snapshot.formula(), **options)
+    restore_checkpoint(solver, snapshot)
+    return solver
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Convert DIMACS CNF files to binary snapshots")
+    parser.add_argument('paths', nargs='+', help='DIMACS CNF files (possibly compressed)')
+    parser.add_argument('-o', '--output', help='output file (only with a single input)')
+    args = parser.parse_args(argv)
+    if args.output and len(args.paths) > 1:
+        parser.error("--output needs a single input file")
+
+    from .dimacs_parser import DIMACS_Parser
+    for path in args.paths:
+        output = args.output or path.split('.cnf')[0] + '.snap'
+        save_formula(output, DIMACS_Parser(path).cnf)
+        print(f"{path} -> {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+from .cnf import Clause
+from array import array
+from typing import Optional, List, Dict
+
+# Values stored per literal index
+TRUE = 1
+FALSE = 0
+UNASSIGNED = -1
+
+
+def lit_index(literal: int) -> int:
+    '''
+    Maps a DIMACS literal to its index 2*var + sign, where sign is 1 for negative literals.
+    The negation of an index is index ^ 1 and its variable is index >> 1
+    '''
+    return literal << 1 if literal > 0 else (-literal << 1) | 1
+
+
+def lit_dimacs(index: int) -> int:
+    '''
+    Maps a literal index back to its DIMACS literal
+    '''
+    return -(index >> 1) if index & 1 else index >> 1
+
+
+class SolverState:
+    '''
+    Compact assignment state shared by the CDCL solvers.
+
+    Everything is stored in flat arrays indexed by variable or by literal index
+    (see `lit_index`), so the value, decision level, reason and trail position of
+    a variable are O(1) lookups costing a few bytes per variable:
+
+        values[lit]     TRUE / FALSE / UNASSIGNED for each literal index
+        levels[var]     decision level the variable was assigned at
+        reasons[var]    clause that implied the variable (None for decisions)
+        trail_pos[var]  index of the variable's literal in the trail
+        trail           literal indices in assignment order
+        trail_lim[d]    trail index where decision level d + 1 starts
+        saved_phase     value each variable had when it was last unassigned
+
+    Normally the trail is ordered by decision level, so backtracking only
+    has to pop the trail suffix above the target level. With chronological
+    backtracking a literal can be implied at a level below the current one
+    and sit on the trail above higher-level literals; such literals survive
+    a backtrack to their level and are moved down to the end of the kept trail.
+    '''
+    def __init__(self, num_vars: int):
+        self.num_vars = num_vars
+        self.values = array('b', [UNASSIGNED]) * (2 * num_vars + 2)
+        self.levels = array('i', [-1]) * (num_vars + 1)
+        self.reasons: List[Optional[Clause]] = [None] * (num_vars + 1)
+        self.trail_pos = array('i', [-1]) * (num_vars + 1)
+        self.trail = array('i')
+        self.trail_lim = array('i')
+        self.decision_level = 0
+        self.saved_phase = array('b', [UNASSIGNED]) * (num_vars + 1)
+
+    def enqueue(self, lit: int, reason: Optional[Clause] = None, level: Optional[int] = None):
+        '''
+        Makes the literal index True at the given decision level (default: the current one)
+        '''
+        var = lit >> 1
+        self.values[lit] = TRUE
+        self.values[lit ^ 1] = FALSE
+        self.levels[var] = self.decision_level if level is None else level
+        self.reasons[var] = reason
+        self.trail_pos[var] = len(self.trail)
+        self.trail.append(lit)
+
+    def new_decision_level(self):
+        self.trail_lim.append(len(self.trail))
+        self.decision_level += 1
+
+    def unassign(self, var: int):
+        self.saved_phase[var] = self.values[var << 1]
+        self.values[var << 1] = UNASSIGNED
+        self.values[(var << 1) | 1] = UNASSIGNED
+        self.reasons[var] = None
+
+    def backtrack(self, level: int) -> int:
+        '''
+        Unassigns every variable above the given decision level, newest first.
+        Returns the trail index from which literals were removed or moved
+        '''
+        if self.decision_level <= level:
+            return len(self.trail)
+        trail = self.trail
+        levels = self.levels
+        start = self.trail_lim[level]
+        kept = []
+        for i in range(len(trail) - 1, start - 1, -1):
+            lit = trail[i]
+            if levels[lit >> 1] > level:
+                self.unassign(lit >> 1)
+            else:
+                kept.append(lit) # Implied out of order at a lower level
+        del trail[start:]
+        for lit in reversed(kept):
+            self.trail_pos[lit >> 1] = len(trail)
+            trail.append(lit)
+        del self.trail_lim[level:]
+        self.decision_level = level
+        return start
+
+    def is_assigned(self, var: int) -> bool:
+        return self.values[var << 1] != UNASSIGNED
+
+    def literal_status(self, literal: int) -> Optional[bool]:
+        '''
+        Status of a DIMACS literal: True, False or None if unassigned
+        '''
+        value = self.values[lit_index(literal)]
+        if value == UNASSIGNED:
+            return None
+        return value == TRUE
+
+    def trail_level(self, var: int) -> int:
+        '''
+        Returns the decision level at which the variable was assigned
+        '''
+        if self.values[var << 1] == UNASSIGNED:
+            return -1  # Variable not assigned
+        return self.levels[var]
+
+    @property
+    def assignments(self) -> Dict[int, bool]:
+        '''
+        Current assignment as a {variable: value} dictionary, in trail order
+        '''
+        return {lit >> 1: not lit & 1 for lit in self.trail}
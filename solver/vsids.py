@@ -0,0 +1,138 @@
+from array import array
+from typing import Optional, Callable
+
+
+class VSIDS:
+    '''
+    MiniSat-style exponential VSIDS (EVSIDS) decision queue.
+
+    Variable activities live in a binary max-heap indexed by variable, so the
+    most active variable is found in O(log n). Instead of multiplying every
+    activity by the decay factor on each conflict, the bump increment is
+    divided by it; activities and the increment are rescaled together when
+    they grow too large. Decay is therefore O(1).
+
+    Assigned variables are removed lazily: `pick` pops them when they reach the
+    top of the heap, and the solver pushes variables back with `push` when they
+    are unassigned on backjump.
+    '''
+    RESCALE_LIMIT = 1e100
+
+    def __init__(self, num_vars: int, decay_factor: float = 0.95):
+        self.decay_factor = decay_factor
+        self.increment = 1.0
+        self.activity = array('d', [0.0]) * (num_vars + 1) # Indexed by variable, entry 0 unused
+        self.heap = array('i')
+        self.position = array('i', [-1]) * (num_vars + 1) # Index of each variable in heap, -1 if absent
+        for var in range(1, num_vars + 1):
+            self.push(var)
+
+    def _before(self, a: int, b: int) -> bool:
+        # Higher activity first, ties broken towards the smaller variable
+        act_a = self.activity[a]
+        act_b = self.activity[b]
+        return act_a > act_b or (act_a == act_b and a < b)
+
+    def _sift_up(self, i: int):
+        heap = self.heap
+        position = self.position
+        var = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not self._before(var, heap[parent]):
+                break
+            heap[i] = heap[parent]
+            position[heap[i]] = i
+            i = parent
+        heap[i] = var
+        position[var] = i
+
+    def _sift_down(self, i: int):
+        heap = self.heap
+        position = self.position
+        var = heap[i]
+        size = len(heap)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and self._before(heap[child + 1], heap[child]):
+                child += 1
+            if not self._before(heap[child], var):
+                break
+            heap[i] = heap[child]
+            position[heap[i]] = i
+            i = child
+        heap[i] = var
+        position[var] = i
+
+    def __contains__(self, var: int) -> bool:
+        return self.position[var] >= 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, var: int):
+        '''
+        Inserts a variable into the queue if it is not already there
+        '''
+        if self.position[var] >= 0:
+            return
+        self.heap.append(var)
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self) -> Optional[int]:
+        '''
+        Removes and returns the most active variable, or None if the queue is empty
+        '''
+        heap = self.heap
+        if not heap:
+            return None
+        top = heap[0]
+        last = heap.pop()
+        self.position[top] = -1
+        if heap:
+            heap[0] = last
+            self._sift_down(0)
+        return top
+
+    def pick(self, is_assigned: Callable[[int], bool]) -> Optional[int]:
+        '''
+        Returns the most active unassigned variable, discarding assigned ones on the way
+        '''
+        while True:
+            var = self.pop()
+            if var is None or not is_assigned(var):
+                return var
+
+    def bump(self, var: int):
+        activity = self.activity
+        activity[var] += self.increment
+        if activity[var] > self.RESCALE_LIMIT:
+            for v in range(1, len(activity)):
+                activity[v] *= 1.0 / self.RESCALE_LIMIT
+            self.increment *= 1.0 / self.RESCALE_LIMIT
+        if self.position[var] >= 0:
+            self._sift_up(self.position[var])
+
+    def decay(self):
+        self.increment /= self.decay_factor
+
+    def randomize(self, rng, scale: float = 1e-3):
+        '''
+        Gives every variable a small random initial activity and rebuilds the heap.
+        Used to diversify solvers that would otherwise branch identically
+        '''
+        activity = self.activity
+        for var in range(1, len(activity)):
+            activity[var] = rng.random() * scale
+        self.rebuild_heap()
+
+    def rebuild_heap(self):
+        '''
+        Puts every variable back into the heap, ordered by the current activities
+        '''
+        self.heap = array('i')
+        self.position = array('i', [-1]) * len(self.activity)
+        for var in range(1, len(self.activity)):
+            self.push(var)
@@ -0,0 +1,66 @@
+from solver.cdcl import CDCL
+from solver.cnf import CNFFormula, Clause
+from solver.state import lit_index, TRUE, FALSE, UNASSIGNED
+
+
+def make_solver(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return CDCL(cnf)
+
+
+def decide(solver, literal):
+    solver.new_decision_level()
+    solver.assign(lit_index(literal))
+    return solver.unit_propagate()
+
+
+def test_backjump_skips_unrelated_levels():
+    '''
+    x1 implies x4 at level 1; x3 at level 3 implies x5 and then falsifies
+    (-3 -5 -4). The learned clause (-3 -4) does not involve level 2, so
+    the solver jumps straight back to level 1
+    '''
+    solver = make_solver(5, [[-1, 4], [-3, 5], [-3, -5, -4]])
+    assert decide(solver, 1) is None
+    assert decide(solver, 2) is None
+    conflict = decide(solver, 3)
+    assert conflict is not None
+
+    learned, level = solver.analyze_conflict(conflict)
+    assert sorted(learned) == sorted([lit_index(-3), lit_index(-4)])
+    assert level == 1
+
+    solver.backjump(level)
+    assert solver.decision_level == 1
+    assert list(solver.trail) == [lit_index(1), lit_index(4)]
+    assert list(solver.trail_lim) == [0]
+    for var in (2, 3, 5):
+        assert solver.values[var << 1] == UNASSIGNED
+        assert solver.reasons[var] is None
+    # Unassigned variables remember the value they had
+    assert solver.saved_phase[2] == TRUE
+    assert solver.saved_phase[3] == TRUE
+    assert solver.saved_phase[5] == TRUE
+
+
+def test_backjump_keeps_lower_levels():
+    solver = make_solver(4, [[-1, 2], [-3, -4]])
+    decide(solver, 1)
+    decide(solver, 3)
+    assert list(solver.trail) == [lit_index(1), lit_index(2), lit_index(3), lit_index(-4)]
+    trail_pos = {lit >> 1: pos for pos, lit in enumerate(solver.trail)}
+
+    solver.backjump(2) # Already at level 2: nothing to undo
+    assert len(solver.trail) == 4
+
+    solver.backjump(1)
+    assert list(solver.trail) == [lit_index(1), lit_index(2)]
+    assert solver.levels[1] == solver.levels[2] == 1
+    assert all(solver.trail_pos[var] == trail_pos[var] for var in (1, 2))
+    assert solver.saved_phase[4] == FALSE
+
+    solver.backjump(0)
+    assert len(solver.trail) == 0 and len(solver.trail_lim) == 0
+    assert solver.decision_level == 0
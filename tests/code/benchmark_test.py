@@ -0,0 +1,74 @@
+from solver.benchmark import Benchmark, FIELDS
+import csv
+import json
+import os
+import pytest
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def make_rows():
+    return [
+        {'solver': 'CDCL', 'instance': 'a.cnf', 'status': 'SAT', 'wall_time': 1.0, 'solve_time': 0.5},
+        {'solver': 'CDCL', 'instance': 'b.cnf', 'status': 'UNSAT', 'wall_time': 3.0, 'solve_time': 2.5},
+        {'solver': 'CDCL', 'instance': 'c.cnf', 'status': 'TIMEOUT', 'wall_time': 10.0},
+        {'solver': 'DPLL', 'instance': 'a.cnf', 'status': 'ERROR', 'wall_time': 0.2, 'error': 'boom'},
+    ]
+
+
+def test_par2_and_cactus():
+    benchmark = Benchmark([], ['CDCL', 'DPLL'], timeout=10.0)
+    benchmark.rows = make_rows()
+    # Solved runs count their wall time, the clock the timeout is judged on, not solve_time
+    assert benchmark.par2_scores() == {'CDCL': pytest.approx((1.0 + 3.0 + 20.0) / 3), 'DPLL': 20.0}
+    assert benchmark.cactus_data() == {'CDCL': [[1, 1.0], [2, 3.0]], 'DPLL': []}
+    summary = benchmark.summary()
+    assert summary['CDCL']['solved'] == 2 and summary['CDCL']['runs'] == 3
+    assert summary['DPLL']['solved'] == 0
+
+
+def test_unknown_solver():
+    with pytest.raises(ValueError, match='Unknown solver'):
+        Benchmark([], ['CDCL', 'MiniSat'])
+
+
+def test_find_instances(tmp_path):
+    for name in ('b.cnf.gz', 'a.cnf', 'notes.txt'):
+        (tmp_path / name).write_bytes(b'')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'c.cnf').write_bytes(b'')
+    instances = Benchmark.find_instances([str(tmp_path)])
+    assert [os.path.relpath(path, tmp_path) for path in instances] == ['a.cnf', 'b.cnf.gz', os.path.join('sub', 'c.cnf')]
+
+
+def test_run_and_export(tmp_path):
+    instances = [os.path.join(CNF_FILES, name) for name in ('basic.cnf', 'unsat_test.cnf')]
+    benchmark = Benchmark(instances, ['CDCL', 'DPLL'], timeout=60.0)
+    rows = benchmark.run()
+    assert [(row['solver'], row['status']) for row in rows] == [
+        ('CDCL', 'SAT'), ('DPLL', 'SAT'), ('CDCL', 'UNSAT'), ('DPLL', 'UNSAT')]
+    assert all(row['wall_time'] >= row['solve_time'] > 0 for row in rows)
+
+    csv_path = tmp_path / 'results.csv'
+    benchmark.write_csv(str(csv_path))
+    with open(csv_path, newline='') as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == FIELDS
+        written = list(reader)
+    assert [row['status'] for row in written] == ['SAT', 'SAT', 'UNSAT', 'UNSAT']
+    assert float(written[0]['wall_time']) == pytest.approx(rows[0]['wall_time'])
+    assert written[0]['error'] == ''
+
+    json_path = tmp_path / 'results.json'
+    benchmark.write_json(str(json_path))
+    with open(json_path) as f:
+        data = json.load(f)
+    assert data['summary']['CDCL'] == {'solved': 2, 'runs': 2, 'par2': benchmark.par2_scores()['CDCL']}
+    assert len(data['runs']) == 4
+
+
+def test_timeout():
+    benchmark = Benchmark([os.path.join(CNF_FILES, 'basic.cnf')], ['CDCL'], timeout=0.001)
+    row, = benchmark.run()
+    assert row['status'] == 'TIMEOUT'
+    assert benchmark.par2_scores() == {'CDCL': 0.002}
@@ -0,0 +1,60 @@
+from solver.budget import make_budget
+from solver.cdcl import CDCL
+from solver.cnf import CNFFormula, Clause
+from solver.dpll import DPLL
+import threading
+import time
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    var = lambda p, h: p * holes + h + 1
+    cnf = CNFFormula((holes + 1) * holes)
+    for p in range(holes + 1):
+        cnf.add_clause(Clause([var(p, h) for h in range(holes)]))
+    for h in range(holes):
+        for p in range(holes + 1):
+            for q in range(p + 1, holes + 1):
+                cnf.add_clause(Clause([-var(p, h), -var(q, h)]))
+    return cnf
+
+
+def test_no_limits():
+    assert make_budget() is None
+
+
+def test_conflict_budget_resumes():
+    for solver in (CDCL(pigeonhole(5)), DPLL(pigeonhole(5))):
+        assert solver.solve(max_conflicts=10) is None
+        assert solver.stop_reason == 'conflicts'
+        assert solver.num_conflicts == 10
+        # Each call gets its own 10 conflicts; the search continues where it stopped
+        assert solver.solve(max_conflicts=10) is None
+        assert solver.num_conflicts == 20
+        result = None
+        while result is None:
+            result = solver.solve(max_conflicts=50)
+        assert result is False
+        assert solver.stop_reason is None
+
+
+def test_propagation_budget():
+    solver = CDCL(pigeonhole(5))
+    assert solver.solve(max_propagations=100) is None
+    assert solver.stop_reason == 'propagations'
+    assert solver.num_propagations >= 100
+
+
+def test_time_and_deadline():
+    solver = CDCL(pigeonhole(6))
+    assert solver.solve(time_limit=0) is None
+    assert solver.stop_reason == 'time'
+    assert solver.solve(deadline=time.monotonic() - 1) is None
+    assert solver.stop_reason == 'time'
+
+
+def test_cancel():
+    cancel = threading.Event()
+    cancel.set()
+    for solver in (CDCL(pigeonhole(6)), DPLL(pigeonhole(6))):
+        assert solver.solve(cancel=cancel) is None
+        assert solver.stop_reason == 'cancelled'
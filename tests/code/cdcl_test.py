@@ -8,8 +8,8 @@ try:
     is_sat = cdcl_solver.solve()
     if is_sat:
         print("Satisfiable with assignment: ", is_sat)
-        cdcl_solver.assignments = {i:cdcl_solver.assignments[i] for i in sorted(cdcl_solver.assignments)}
-        print("Satisfying assignment:", cdcl_solver.assignments)
+        assignments = {i:cdcl_solver.assignments[i] for i in sorted(cdcl_solver.assignments)}
+        print("Satisfying assignment:", assignments)
         print('Statistics:')
         
     else:
@@ -17,9 +17,11 @@ try:
     
     print(f'  Number of decisions: {cdcl_solver.num_decisions}')
     print(f'  Number of conflicts: {cdcl_solver.num_conflicts}')
+    print(f'  Number of restarts: {cdcl_solver.num_restarts}')
     print(f'  Number of propagations: {cdcl_solver.num_propagations}')
     print(f'  Number of learned clauses: {cdcl_solver.num_learned_clauses}')
     print(f'  Maximum decision level reached: {cdcl_solver.max_decision_level}')
+    print(f'  Average learned clause length: {cdcl_solver.avg_learned_clause_length_before_minimization:.2f} -> {cdcl_solver.avg_learned_clause_length:.2f} after minimization')
 
 except DIMACSParseError as e:
     print('DIMACS Parsing Error: ', e)
\ No newline at end of file
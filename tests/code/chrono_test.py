@@ -0,0 +1,79 @@
+from solver.cdcl import CDCL
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.state import SolverState, TRUE, FALSE, lit_index
+import os
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    var = lambda p, h: p * holes + h + 1
+    cnf = CNFFormula((holes + 1) * holes)
+    for p in range(holes + 1):
+        cnf.add_clause(Clause([var(p, h) for h in range(holes)]))
+    for h in range(holes):
+        for p in range(holes + 1):
+            for q in range(p + 1, holes + 1):
+                cnf.add_clause(Clause([-var(p, h), -var(q, h)]))
+    return cnf
+
+
+class CheckedCDCL(CDCL):
+    '''
+    Checks the trail after every backjump: each implied literal sits at the
+    highest level among the other (false) literals of its reason, and every
+    decision starts its level
+    '''
+    def backjump(self, level: int):
+        super().backjump(level)
+        for pos, lit in enumerate(self.trail):
+            var = lit >> 1
+            assert self.values[lit] == TRUE and self.trail_pos[var] == pos
+            assert self.levels[var] <= self.decision_level
+            reason = self.reasons[var]
+            if reason is not None:
+                others = [q for q in reason.literals if q != lit]
+                assert all(self.values[q] == FALSE for q in others)
+                assert self.levels[var] == max((self.levels[q >> 1] for q in others), default=0)
+        for d, start in enumerate(self.trail_lim):
+            decision = self.trail[start] >> 1
+            assert self.levels[decision] == d + 1 and self.reasons[decision] is None
+
+
+def satisfies(cnf, model):
+    return all(any(model.get(abs(lit)) == (lit > 0) for lit in cnf.clause_literals(i)) for i in range(len(cnf)))
+
+
+def test_backtrack_keeps_lower_levels():
+    state = SolverState(4)
+    state.new_decision_level()
+    state.enqueue(lit_index(1))
+    state.new_decision_level()
+    state.enqueue(lit_index(2))
+    state.enqueue(lit_index(-3), level=1) # Implied out of order
+    state.enqueue(lit_index(4))
+    assert state.backtrack(1) == 1
+    assert list(state.trail) == [lit_index(1), lit_index(-3)]
+    assert state.trail_pos[3] == 1 and state.levels[3] == 1
+    assert state.literal_status(2) is None and state.literal_status(4) is None
+    assert state.decision_level == 1
+
+
+def test_trail_invariants():
+    for threshold in (0, 1):
+        for name in ('uf20-01.cnf', 'sat_test.cnf', 'CBS_k3_n100_m403_b10_0.cnf'):
+            cnf = DIMACS_Parser(os.path.join(CNF_FILES, name)).cnf
+            solver = CheckedCDCL(cnf, chrono_threshold=threshold)
+            assert solver.solve() is True
+            assert satisfies(cnf, solver.assignments)
+        solver = CheckedCDCL(pigeonhole(5), chrono_threshold=threshold)
+        assert solver.solve() is False
+        assert solver.num_chrono_backtracks > 0
+
+
+def test_off_by_default():
+    solver = CDCL(pigeonhole(5))
+    assert solver.solve() is False
+    assert solver.num_chrono_backtracks == 0
+    assert solver.stats()['chrono_backtracks'] == 0
@@ -0,0 +1,105 @@
+from solver.cnf import CNFFormula, Clause
+from solver.cube import Cuber, CubeAndConquer, CubeServer
+from solver.dimacs_parser import DIMACS_Parser
+from multiprocessing.connection import Client, AuthenticationError
+import itertools
+import os
+import pytest
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+LOCALHOST = ('127.0.0.1', 0)
+
+
+def make_formula(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return cnf
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    var = lambda p, h: p * holes + h + 1
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    clauses += [[-var(p, h), -var(q, h)] for h in range(holes)
+                for p in range(holes + 1) for q in range(p + 1, holes + 1)]
+    return make_formula((holes + 1) * holes, clauses)
+
+
+def satisfies(cnf, model):
+    return all(any(model[abs(lit)] == (lit > 0) for lit in cnf.clause_literals(i)) for i in range(len(cnf)))
+
+
+def test_cubes_cover_every_model():
+    clauses = [[1, 2, -3], [-1, 4], [2, 5, 6], [-2, -5], [3, -6, 7], [-4, -7, 8], [1, -8]]
+    cnf = make_formula(8, clauses)
+    cubes = Cuber(cnf, num_cubes=8).run()
+    assert 1 < len(cubes) <= 8
+    for values in itertools.product((False, True), repeat=8):
+        model = dict(enumerate(values, 1))
+        if satisfies(cnf, model):
+            assert any(all(model[abs(lit)] == (lit > 0) for lit in cube) for cube in cubes)
+
+
+def test_cubing_refutes_small_formula():
+    cuber = Cuber(make_formula(2, [[1, 2], [1, -2], [-1, 2], [-1, -2]]), num_cubes=4)
+    assert cuber.run() == []
+    assert cuber.unsatisfiable
+
+
+def check_sat(address):
+    cnf = DIMACS_Parser(os.path.join(CNF_FILES, 'uf20-01.cnf')).cnf
+    progress = []
+    solver = CubeAndConquer(cnf, num_cubes=8, num_workers=2, address=address,
+                            progress=lambda solved, total: progress.append((solved, total)))
+    assert solver.solve() is True
+    assert satisfies(cnf, solver.assignments)
+    assert all(solver.assignments[abs(lit)] == (lit > 0) for lit in solver.sat_cube)
+    assert progress and progress[-1][1] == len(solver.cubes)
+
+
+def check_unsat(address):
+    solver = CubeAndConquer(pigeonhole(4), num_cubes=8, num_workers=2, address=address)
+    assert solver.solve() is False
+    assert solver.cubes and solver.num_solved == len(solver.cubes)
+
+
+def test_local_mode():
+    check_sat(None)
+    check_unsat(None)
+
+
+def test_socket_mode():
+    check_sat(LOCALHOST)
+    check_unsat(LOCALHOST)
+
+
+def test_socket_mode_stops_when_workers_die():
+    cnf = DIMACS_Parser(os.path.join(CNF_FILES, 'uf20-01.cnf')).cnf
+    solver = CubeAndConquer(cnf, num_cubes=4, num_workers=2, address=LOCALHOST, config={'restart_policy': 'never'})
+    with pytest.raises(RuntimeError, match='All cube workers exited'):
+        solver.solve()
+
+
+def test_server_key_is_random():
+    cnf = make_formula(1, [[1]])
+    first, second = CubeServer(cnf, [[1]]), CubeServer(cnf, [[1]])
+    try:
+        assert len(first.authkey) == 32 and first.authkey != second.authkey
+        with pytest.raises(AuthenticationError):
+            Client(first.address, authkey=second.authkey)
+        with Client(first.address, authkey=first.authkey) as conn:
+            conn.send(('next',))
+            assert conn.recv() == (0, [1])
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_generated_key_is_printed(capsys):
+    solver = CubeAndConquer(make_formula(2, [[1, 2]]), num_cubes=2, num_workers=1, address=LOCALHOST)
+    assert solver.solve() is True
+    assert 'authkey ' in capsys.readouterr().err
+    solver = CubeAndConquer(make_formula(2, [[1, 2]]), num_cubes=2, num_workers=1, address=LOCALHOST,
+                            authkey=b'secret')
+    assert solver.solve() is True
+    assert 'authkey' not in capsys.readouterr().err
@@ -0,0 +1,81 @@
+from solver import dimacs_parser
+from solver.dimacs_parser import DIMACS_Parser, DIMACSParseError
+import bz2
+import gzip
+import io
+import lzma
+import pytest
+
+FORMULA = b'''c a comment
+p cnf 4 3
+1 -2 0
+2 3
+-4 0 c trailing comment
+-1 4 0
+%
+0
+'''
+CLAUSES = [[1, -2], [2, 3, -4], [-1, 4]]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def tokenizer(request, monkeypatch):
+    if request.param == 'numpy' and dimacs_parser.np is None:
+        pytest.skip("NumPy is not installed")
+    if request.param == 'python':
+        monkeypatch.setattr(dimacs_parser, 'np', None)
+    return request.param
+
+
+def parse(data: bytes, **kwargs) -> DIMACS_Parser:
+    return DIMACS_Parser(io.BytesIO(data), **kwargs)
+
+
+def test_plain_file(tmp_path, tokenizer):
+    path = tmp_path / 'formula.cnf'
+    path.write_bytes(FORMULA)
+    parser = DIMACS_Parser(str(path))
+    assert parser.num_vars == 4
+    assert parser.clauses == CLAUSES
+    assert [clause.literals for clause in parser.cnf.clauses] == CLAUSES
+
+
+@pytest.mark.parametrize('open_compressed', [gzip.open, lzma.open, bz2.open])
+def test_compressed_file(tmp_path, tokenizer, open_compressed):
+    path = tmp_path / 'formula.cnf.z'
+    with open_compressed(str(path), 'wb') as f:
+        f.write(FORMULA)
+    assert DIMACS_Parser(str(path)).clauses == CLAUSES
+
+
+def test_chunks_end_on_line_boundaries(tokenizer):
+    assert parse(FORMULA, chunk_size=3).clauses == CLAUSES
+
+
+def test_text_stream(tokenizer):
+    assert DIMACS_Parser(io.StringIO(FORMULA.decode())).clauses == CLAUSES
+
+
+def test_unterminated_last_clause(tokenizer):
+    parser = parse(b'p cnf 2 2\n1 2 0\n-1')
+    assert parser.clauses == [[1, 2]]
+    assert parser.cnf.satisfiable is False
+
+
+def test_errors(tokenizer):
+    with pytest.raises(DIMACSParseError, match='exceeds'):
+        parse(b'p cnf 2 1\n1 3 0\n')
+    with pytest.raises(DIMACSParseError, match='Expected 2 clauses'):
+        parse(b'p cnf 2 2\n1 2 0\n')
+    with pytest.raises(DIMACSParseError):
+        parse(b'p cnf 2 1\n1 x 0\n')
+
+
+@pytest.mark.parametrize('data', [b'p cnf 2 1\n1 - 2 0\n', b'p cnf 2 1\n+ 1 0\n', b'p cnf 2 1\n1 2 0 -\n',
+                                  b'p cnf 20 1\n1_0 0\n'])
+def test_rejects_what_int_rejects(tokenizer, data):
+    '''
+    A lone sign and a digit separator are invalid in both tokenizers
+    '''
+    with pytest.raises(DIMACSParseError):
+        parse(data)
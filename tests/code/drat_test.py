@@ -0,0 +1,122 @@
+from solver.cdcl import CDCL
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.drat import DRATWriter, DRATChecker, ClauseIndex, read_proof, check_model
+from array import array
+import io
+import os
+import pytest
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def make_formula(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return cnf
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    var = lambda p, h: p * holes + h + 1
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    clauses += [[-var(p, h), -var(q, h)] for h in range(holes)
+                for p in range(holes + 1) for q in range(p + 1, holes + 1)]
+    return make_formula((holes + 1) * holes, clauses)
+
+
+def check(cnf, tmp_path, proof: str):
+    path = tmp_path / 'proof.drat'
+    path.write_text(proof)
+    checker = DRATChecker(cnf)
+    return checker.check(str(path)), checker.error
+
+
+def test_writer_formats():
+    for binary, expected in ((False, b'1 -3 0\nd 1 -3 4 0\n0\n'), (True, b'a\x02\x07\x00d\x02\x07\x08\x00a\x00')):
+        output = io.BytesIO()
+        with DRATWriter(output, binary=binary) as writer:
+            writer.add([1, -3])
+            writer.delete([1, -3, 4])
+            writer.add([])
+        assert output.getvalue() == expected
+        assert writer.num_added == 2 and writer.num_deleted == 1
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_read_proof_round_trip(tmp_path, binary):
+    path = tmp_path / 'proof.drat'
+    with DRATWriter(str(path), binary=binary) as writer:
+        writer.add([1, -300])
+        writer.delete([-1, 2])
+        writer.add([])
+    assert list(read_proof(str(path))) == [(False, [1, -300]), (True, [-1, 2]), (False, [])]
+
+
+@pytest.mark.parametrize('binary', [False, True])
+def test_solver_proof_verifies(tmp_path, binary):
+    cnf = pigeonhole(4)
+    path = tmp_path / 'proof.drat'
+    with DRATWriter(str(path), binary=binary) as writer:
+        assert CDCL(cnf, proof=writer).solve() is False
+    checker = DRATChecker(cnf)
+    assert checker.check(str(path)), checker.error
+    assert 0 < checker.num_core_lemmas <= checker.num_lemmas <= writer.num_added
+
+
+def test_check_model():
+    cnf = DIMACS_Parser(os.path.join(CNF_FILES, 'uf20-01.cnf')).cnf
+    solver = CDCL(cnf)
+    assert solver.solve() is True
+    assert check_model(cnf, solver.assignments)
+    assert not check_model(cnf, {var: not value for var, value in solver.assignments.items()})
+
+
+def test_rejected_proofs(tmp_path):
+    # Every assignment of x1, x2 falsifies one clause, but unit propagation alone finds no conflict
+    cnf = make_formula(3, [[1, 2], [-1, 2], [1, -2], [-1, -2]])
+    assert check(cnf, tmp_path, '2 0\n0\n') == (True, None)
+    assert check(cnf, tmp_path, '3 1 0\n-3 1 0\n1 0\n0\n') == (True, None)
+    assert check(cnf, tmp_path, '1 2 0\n') == (False, "The proof does not lead to a conflict")
+    # x3 occurs nowhere, so (x3) is RAT; the empty clause after it is not RUP
+    assert check(cnf, tmp_path, '3 0\n0\n') == (False, "Lemma 2 is neither RUP nor RAT")
+    # Once (-1 2) is deleted, the unit (x2) no longer follows
+    assert check(cnf, tmp_path, 'd -1 2 0\n2 0\n0\n') == (False, "Lemma 1 is neither RUP nor RAT")
+
+
+def test_rat_on_first_literal(tmp_path):
+    # x4 is false at the top level and x8 occurs nowhere else. (4 8) is RAT on 8 but not on 4,
+    # its first literal; with it, (-8 1) is RUP and refutes the formula by unit propagation
+    cnf = make_formula(8, [[-4], [1, 2], [1, -2], [-1, 3], [-1, -3]])
+    assert check(cnf, tmp_path, '8 4 0\n-8 1 0\n0\n') == (True, None)
+    assert check(cnf, tmp_path, '4 8 0\n-8 1 0\n0\n') == (False, "Lemma 1 is neither RUP nor RAT")
+
+
+def test_clause_index():
+    clauses = [array('i', [2 * i, 2 * i + 3, 2 * i + 5]) for i in range(2000)]
+    index = ClauseIndex(clauses.__getitem__)
+    for c in range(len(clauses)):
+        index.add(c)
+    slot = index.find([2 * 7 + 5, 2 * 7, 2 * 7 + 3])
+    assert index.table[slot] == 7
+    index.remove(slot)
+    assert index.find([2 * 7, 2 * 7 + 3, 2 * 7 + 5]) == -1
+    assert index.find([1, 2]) == -1
+    assert index.table[index.find([2 * 1999 + 3, 2 * 1999, 2 * 1999 + 5])] == 1999
+
+
+def test_deletion_in_any_literal_order(tmp_path):
+    # Deleting (-1 2) as (2 -1) removes it, so the unit (x2) no longer follows
+    cnf = make_formula(3, [[1, 2], [-1, 2], [1, -2], [-1, -2]])
+    assert check(cnf, tmp_path, 'd 2 -1 0\n2 0\n0\n') == (False, "Lemma 1 is neither RUP nor RAT")
+    assert check(cnf, tmp_path, 'd 2 -1 3 0\n2 0\n0\n') == (True, None)
+
+
+def test_checker_is_single_use(tmp_path):
+    cnf = make_formula(3, [[1, 2], [-1, 2], [1, -2], [-1, -2]])
+    path = tmp_path / 'proof.drat'
+    path.write_text('2 0\n0\n')
+    checker = DRATChecker(cnf)
+    assert checker.check(str(path))
+    with pytest.raises(RuntimeError):
+        checker.check(str(path))
@@ -0,0 +1,64 @@
+from solver import evaluation
+from solver.cdcl import CDCL
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.evaluation import literal_values, clause_statuses, first_falsified, formula_status
+from solver.state import TRUE, FALSE, UNASSIGNED
+from array import array
+import os
+import pytest
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def evaluator(request, monkeypatch):
+    if request.param == 'numpy' and evaluation.np is None:
+        pytest.skip("NumPy is not installed")
+    if request.param == 'python':
+        monkeypatch.setattr(evaluation, 'np', None)
+    return request.param
+
+
+def make_formula(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return cnf
+
+
+def test_clause_statuses(evaluator):
+    cnf = make_formula(4, [[1, -2], [2, 3], [-1], [], [-3, 4, 2]])
+    values = literal_values(4, {1: True, 3: True})
+    assert list(clause_statuses(cnf, values)) == [TRUE, TRUE, FALSE, FALSE, UNASSIGNED]
+    values = literal_values(4, {1: False, 2: False})
+    assert list(clause_statuses(cnf, values)) == [TRUE, UNASSIGNED, TRUE, FALSE, UNASSIGNED]
+
+
+def test_first_falsified_and_formula_status(evaluator):
+    cnf = make_formula(3, [[1, 2], [-1, 3], [-2, -3]])
+    assert first_falsified(cnf, literal_values(3, {})) is None
+    assert formula_status(cnf, literal_values(3, {})) is None
+    assert first_falsified(cnf, literal_values(3, {1: True, 3: False})) == 1
+    assert formula_status(cnf, literal_values(3, {1: True, 3: False})) is False
+    assert formula_status(cnf, literal_values(3, {1: True, 2: False, 3: True})) is True
+    assert formula_status(make_formula(3, []), literal_values(3, {})) is True
+
+
+def test_memoryview_arena(evaluator):
+    '''
+    Formulas over shared memory or a snapshot wrap memoryviews instead of arrays
+    '''
+    literals, offsets = array('i', [1, -2, 2, 3, 0, 0]), array('i', [0, 2, 4, 4, 4])
+    cnf = CNFFormula(3, memoryview(literals)[:4], memoryview(offsets)[:3])
+    assert list(clause_statuses(cnf, literal_values(3, {2: True}))) == [UNASSIGNED, TRUE]
+
+
+def test_solver_model(evaluator):
+    cnf = DIMACS_Parser(os.path.join(CNF_FILES, 'uf20-01.cnf')).cnf
+    solver = CDCL(cnf)
+    assert solver.solve() is True
+    model = solver.assignments
+    assert formula_status(cnf, literal_values(cnf.num_vars, model)) is True
+    statuses = clause_statuses(cnf, literal_values(cnf.num_vars, {var: not value for var, value in model.items()}))
+    assert FALSE in statuses
@@ -0,0 +1,76 @@
+from solver.cdcl import CDCL
+from solver.clause_db import LearnedClause
+from solver.cnf import CNFFormula, Clause
+from solver.drat import DRATWriter, DRATChecker
+from solver.inprocess import Inprocessor
+from solver.state import TRUE, lit_index, lit_dimacs
+import io
+
+
+def make_formula(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return cnf
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    var = lambda p, h: p * holes + h + 1
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    clauses += [[-var(p, h), -var(q, h)] for h in range(holes)
+                for p in range(holes + 1) for q in range(p + 1, holes + 1)]
+    return make_formula((holes + 1) * holes, clauses)
+
+
+def learn(solver, literals, lbd=3):
+    clause = LearnedClause([lit_index(lit) for lit in literals], lbd)
+    solver.clause_db.add(clause)
+    solver.propagator.add_clause(clause)
+    return clause
+
+
+def test_vivification_shortens_clause():
+    # Assuming x1 implies x2 through (-1 2), so (-1 2 3) vivifies to (-1 2)
+    output = io.BytesIO()
+    solver = CDCL(make_formula(4, [[-1, 2], [3, 4], [-3, -4]]), proof=DRATWriter(output))
+    clause = learn(solver, [-1, 2, 3])
+    inprocessor = Inprocessor(solver, subsumption=False, probing=False)
+    assert inprocessor.run() is None
+    assert sorted(map(lit_dimacs, clause.literals)) == [-1, 2]
+    assert clause.lbd == 2 and clause.vivified
+    assert list(solver.clause_db) == [clause]
+    assert inprocessor.num_vivified_clauses == 1 and inprocessor.num_vivified_literals == 1
+    solver.proof.flush()
+    assert output.getvalue() == b'-1 2 0\nd -1 2 3 0\n'
+
+
+def test_subsumption():
+    solver = CDCL(make_formula(3, [[1, 2, 3]]))
+    short = learn(solver, [1, -2], lbd=2)
+    learn(solver, [3, -2, 1], lbd=1)
+    inprocessor = Inprocessor(solver, vivification=False, probing=False)
+    assert inprocessor.run() is None
+    assert list(solver.clause_db) == [short]
+    assert short.lbd == 1 and inprocessor.num_subsumed == 1
+
+
+def test_failed_literal_probing():
+    # x1 implies both x2 and -x2, so -x1 holds at level 0
+    solver = CDCL(make_formula(3, [[-1, 2], [-1, -2], [1, 3, -2]]))
+    inprocessor = Inprocessor(solver, subsumption=False, vivification=False)
+    assert inprocessor.run() is None
+    assert solver.values[lit_index(-1)] == TRUE and solver.levels[1] == 0
+    assert inprocessor.num_failed_literals == 1
+
+
+def test_search_with_inprocessing(tmp_path):
+    cnf = pigeonhole(6)
+    path = tmp_path / 'proof.drat'
+    with DRATWriter(str(path)) as writer:
+        solver = CDCL(cnf, proof=writer, inprocessing=True)
+        solver.inprocessor.interval = solver.inprocessor.next_run = 10
+        assert solver.solve() is False
+    stats = solver.stats()['inprocessing']
+    assert stats['runs'] > 0 and stats['vivified_clauses'] > 0
+    checker = DRATChecker(cnf)
+    assert checker.check(str(path)), checker.error
@@ -0,0 +1,61 @@
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.dpll import DPLL
+import os
+import sys
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def make_formula(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return cnf
+
+
+def satisfies(cnf, model):
+    return all(any(model.get(abs(lit)) == (lit > 0) for lit in cnf.clause_literals(i)) for i in range(len(cnf)))
+
+
+def test_max_depth_matches_recursive_solver():
+    # Depths the recursive DPLL reported on these files
+    for name, depth in (('basic.cnf', 2), ('uf20-01.cnf', 10)):
+        cnf = DIMACS_Parser(os.path.join(CNF_FILES, name)).cnf
+        solver = DPLL(cnf)
+        assert solver.solve() is True
+        assert solver.max_depth == depth
+        assert solver.calls == solver.num_decisions + solver.num_conflicts + 1
+        assert satisfies(cnf, solver.assignments)
+
+
+def test_deeper_than_the_recursion_limit():
+    # Each decision x_i = True satisfies only (x_i | x_{n+i}), so the search goes n decisions deep
+    n = sys.getrecursionlimit() + 500
+    cnf = make_formula(2 * n, [[i, n + i] for i in range(1, n + 1)])
+    solver = DPLL(cnf)
+    assert solver.solve() is True
+    assert solver.max_depth == n
+    assert solver.num_conflicts == 0
+    assert solver.calls == n + 1 # The root and one node per decision
+
+
+def test_backtracking_undoes_assignments():
+    # x1 = True leads to a conflict through (-1 2) (-1 -2), so x1 must be False
+    cnf = make_formula(3, [[-1, 2], [-1, -2], [1, 3]])
+    solver = DPLL(cnf)
+    assert solver.solve() is True
+    assert solver.assignments[1] is False and solver.assignments[3] is True
+    assert solver.num_conflicts == 1
+    assert solver.calls == 3 # The root, x1 = True and x1 = False
+
+
+def test_unsat():
+    holes = 3
+    var = lambda p, h: p * holes + h + 1
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    clauses += [[-var(p, h), -var(q, h)] for h in range(holes)
+                for p in range(holes + 1) for q in range(p + 1, holes + 1)]
+    solver = DPLL(make_formula((holes + 1) * holes, clauses))
+    assert solver.solve() is False
+    assert solver.num_conflicts > 1
@@ -0,0 +1,53 @@
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.portfolio import Portfolio, diversify
+import os
+import pytest
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    '''
+    holes + 1 pigeons in `holes` holes: unsatisfiable
+    '''
+    var = lambda p, h: p * holes + h + 1
+    cnf = CNFFormula((holes + 1) * holes)
+    for p in range(holes + 1):
+        cnf.add_clause(Clause([var(p, h) for h in range(holes)]))
+    for h in range(holes):
+        for p in range(holes + 1):
+            for q in range(p + 1, holes + 1):
+                cnf.add_clause(Clause([-var(p, h), -var(q, h)]))
+    return cnf
+
+
+def test_diversify():
+    configs = diversify(6, seed=10)
+    assert len(configs) == 6
+    assert configs[0] == {}
+    assert [config['seed'] for config in configs[1:]] == [11, 12, 13, 14, 15]
+    assert len({config['restart_policy'] for config in configs[1:]}) > 1
+
+
+def test_sat():
+    cnf = DIMACS_Parser(os.path.join(CNF_FILES, 'uf20-01.cnf')).cnf
+    portfolio = Portfolio(cnf, num_workers=2)
+    assert portfolio.solve() is True
+    assert portfolio.winning_config in portfolio.configs
+    model = portfolio.assignments
+    assert all(any(model[abs(lit)] == (lit > 0) for lit in cnf.clause_literals(i)) for i in range(len(cnf)))
+
+
+def test_unsat():
+    cnf = pigeonhole(4)
+    portfolio = Portfolio(cnf, num_workers=2, configs=diversify(3))
+    assert portfolio.solve() is False
+    assert cnf.satisfiable is False
+    assert portfolio.stats['conflicts'] > 0
+
+
+def test_worker_error_is_raised():
+    cnf = DIMACS_Parser(os.path.join(CNF_FILES, 'basic.cnf')).cnf
+    with pytest.raises(ValueError, match='restart policy'):
+        Portfolio(cnf, num_workers=1, configs=[{'restart_policy': 'never'}]).solve()
@@ -0,0 +1,64 @@
+from solver.cdcl import CDCL
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.preprocess import Preprocessor
+import os
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def make_formula(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return cnf
+
+
+def satisfies(cnf, model):
+    return all(any(model[abs(lit)] == (lit > 0) for lit in cnf.clause_literals(i)) for i in range(len(cnf)))
+
+
+def test_eliminated_variable_is_reconstructed():
+    '''
+    Resolving x1 away from (1 2) (-1 3) leaves (2 3); extend_model must pick
+    x1 so that both original clauses hold again
+    '''
+    cnf = make_formula(3, [[1, 2], [-1, 3], [2, 3], [-2, -3]])
+    preprocessor = Preprocessor(cnf, units=False, pure_literals=False, subsumption=False,
+                                self_subsumption=False, max_occurrences=1)
+    reduced = preprocessor.run()
+    assert preprocessor.eliminated == {1}
+    assert all(1 not in map(abs, clause.literals) for clause in reduced.clauses)
+
+    model = preprocessor.extend_model({2: False, 3: True})
+    assert model[1] is True and satisfies(cnf, model)
+    model = preprocessor.extend_model({2: True, 3: False})
+    assert model[1] is False and satisfies(cnf, model)
+
+
+def test_subsumption_and_strengthening():
+    # (1 2 3) is subsumed by (1 2); (1 2) and (1 -2) strengthen to the unit (1)
+    cnf = make_formula(4, [[1, 2], [1, 2, 3], [1, -2], [-1, 3, 4], [-3, -4]])
+    preprocessor = Preprocessor(cnf, pure_literals=False, variable_elimination=False)
+    reduced = preprocessor.run()
+    assert preprocessor.num_subsumed >= 1
+    assert preprocessor.num_strengthened >= 1
+    assert preprocessor.values[1] is True
+    assert sorted(sorted(clause.literals) for clause in reduced.clauses) == [[-4, -3], [3, 4]]
+
+
+def test_empty_clause():
+    reduced = Preprocessor(make_formula(2, [[1, 2], [-1], [-2]])).run()
+    assert reduced.satisfiable is False
+    assert [clause.literals for clause in reduced.clauses] == [[]]
+
+
+def test_model_of_reduced_formula_extends():
+    for name in ('uf20-01.cnf', 'sat_test.cnf'):
+        cnf = DIMACS_Parser(os.path.join(CNF_FILES, name)).cnf
+        preprocessor = Preprocessor(cnf)
+        reduced = preprocessor.run()
+        assert preprocessor.num_removed_clauses > 0
+        solver = CDCL(reduced)
+        assert solver.solve() is True
+        assert satisfies(cnf, preprocessor.extend_model(solver.assignments))
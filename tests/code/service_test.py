@@ -0,0 +1,134 @@
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.service import SolverService, canonical_hash
+import asyncio
+import json
+import os
+import pytest
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def make_formula(num_vars, clauses):
+    cnf = CNFFormula(num_vars)
+    for literals in clauses:
+        cnf.add_clause(Clause(literals))
+    return cnf
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    var = lambda p, h: p * holes + h + 1
+    clauses = [[var(p, h) for h in range(holes)] for p in range(holes + 1)]
+    clauses += [[-var(p, h), -var(q, h)] for h in range(holes)
+                for p in range(holes + 1) for q in range(p + 1, holes + 1)]
+    return make_formula((holes + 1) * holes, clauses)
+
+
+def test_canonical_hash():
+    cnf = make_formula(3, [[1, -2], [2, 3]])
+    same = make_formula(3, [[3, 2], [-2, 1, 1], [2, 3]])
+    assert canonical_hash(cnf) == canonical_hash(same)
+    assert canonical_hash(cnf) != canonical_hash(make_formula(3, [[1, -2], [2, -3]]))
+    assert canonical_hash(cnf) != canonical_hash(make_formula(4, [[1, -2], [2, 3]]))
+
+
+def test_cache_hits():
+    async def run():
+        async with SolverService(num_workers=2) as service:
+            path = os.path.join(CNF_FILES, 'uf20-01.cnf')
+            first = await service.solve(DIMACS_Parser(path).cnf)
+            assert first['status'] == 'SAT' and not first['cached']
+            cnf = DIMACS_Parser(path).cnf
+            model = set(first['model'])
+            assert all(model & set(cnf.clause_literals(i)) for i in range(len(cnf)))
+
+            # Clause order and literal order do not matter
+            reordered = make_formula(cnf.num_vars, [cnf.clause_literals(i)[::-1] for i in reversed(range(len(cnf)))])
+            second = await service.solve(reordered)
+            assert second['cached'] and second['model'] == first['model']
+            assert service.num_requests == 2 and service.num_cache_hits == 1
+    asyncio.run(run())
+
+
+def test_in_flight_requests_share_one_solve():
+    async def run():
+        async with SolverService(num_workers=2) as service:
+            results = await asyncio.gather(service.solve(pigeonhole(6)), service.solve(pigeonhole(6)))
+            assert [result['status'] for result in results] == ['UNSAT', 'UNSAT']
+            assert sorted(result['cached'] for result in results) == [False, True]
+            assert service.num_cache_hits == 1
+    asyncio.run(run())
+
+
+def test_not_started():
+    with pytest.raises(RuntimeError):
+        asyncio.run(SolverService().solve(make_formula(1, [[1]])))
+
+
+async def exchange(server, lines):
+    host, port = server.sockets[0].getsockname()[:2]
+    reader, writer = await asyncio.open_connection(host, port)
+    for line in lines:
+        writer.write(line + b'\n')
+    await writer.drain()
+    responses = [json.loads(await reader.readline()) for _ in lines]
+    writer.close()
+    return responses
+
+
+def test_socket_requests():
+    async def run():
+        async with SolverService(num_workers=2) as service:
+            server = await service.serve()
+            lines = [
+                json.dumps({'id': 1, 'dimacs': 'p cnf 2 2\n1 2 0\n-1 0\n'}).encode(),
+                b'not json',
+                json.dumps({'id': 3, 'formula': 'p cnf 1 1\n1 0\n'}).encode(),
+                json.dumps({'id': 4, 'dimacs': 'p cnf 1 1\n1 2 0\n'}).encode(),
+            ]
+            responses = {response['id']: response for response in await exchange(server, lines)}
+            server.close()
+            await server.wait_closed()
+        assert responses[1]['status'] == 'SAT' and responses[1]['model'] == [-1, 2]
+        assert responses[None]['status'] == 'ERROR'
+        assert responses[3]['status'] == 'ERROR' and 'dimacs' in responses[3]['error']
+        assert responses[4]['status'] == 'ERROR' and 'exceeds' in responses[4]['error']
+    asyncio.run(run())
+
+
+def test_invalid_requests_are_answered():
+    async def run():
+        async with SolverService(num_workers=1, config={'no_such_option': 1}) as service:
+            with pytest.raises(ValueError, match='timeout'):
+                await service.solve(make_formula(1, [[1]]), timeout=-1)
+            server = await service.serve()
+            lines = [
+                json.dumps({'id': 1, 'dimacs': 'p cnf 1 1\n1 0\n', 'timeout': 'soon'}).encode(),
+                json.dumps({'id': 2, 'dimacs': 'p cnf 1 1\n1 0\n'}).encode(), # The worker raises TypeError
+            ]
+            responses = {response['id']: response for response in await exchange(server, lines)}
+            server.close()
+            await server.wait_closed()
+        assert responses[1]['status'] == 'ERROR' and 'timeout' in responses[1]['error']
+        assert responses[2]['status'] == 'ERROR' and 'no_such_option' in responses[2]['error']
+    asyncio.run(run())
+
+
+def test_connection_limits():
+    async def run():
+        async with SolverService(num_workers=2, max_connection_requests=1, max_line_bytes=1000) as service:
+            server = await service.serve()
+            # One request at a time per connection, so responses come back in request order
+            lines = [json.dumps({'id': i, 'dimacs': f'p cnf 3 1\n{i} 0\n'}).encode() for i in (1, 2, 3)]
+            assert [response['id'] for response in await exchange(server, lines)] == [1, 2, 3]
+
+            host, port = server.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b'x' * 2000 + b'\n')
+            response = json.loads(await reader.readline())
+            assert response['status'] == 'ERROR' and 'longer than 1000 bytes' in response['error']
+            assert await reader.readline() == b'' # The connection is closed
+            writer.close()
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
@@ -0,0 +1,66 @@
+from solver.cnf import CNFFormula, Clause
+from solver.portfolio import Portfolio, diversify
+from solver.sharing import ClauseExchange
+import queue
+
+
+class Inbox(queue.Queue):
+    '''
+    In-process stand-in for a multiprocessing queue
+    '''
+    def cancel_join_thread(self):
+        pass
+
+
+def exchanges(num_workers: int, **options):
+    inboxes = [Inbox() for _ in range(num_workers)]
+    return [ClauseExchange(i, inboxes, **options) for i in range(num_workers)]
+
+
+def test_only_short_glue_clauses_are_sent():
+    first, second, third = exchanges(3, max_lbd=2, max_size=3)
+    assert first.export([2, 5], 2)
+    assert not first.export([2, 5, 7], 3) # LBD too high
+    assert not first.export([2, 5, 7, 9], 2) # Too long
+    assert second.receive() == [([2, 5], 2)]
+    assert third.receive() == [([2, 5], 2)]
+    assert first.receive() == [] # Nothing is sent back to the exporter
+
+
+def test_duplicates_are_dropped():
+    first, second = exchanges(2)
+    assert first.export([4, 2], 1)
+    assert not first.export([2, 4], 1)
+    assert second.receive() == [([2, 4], 1)]
+    # second already knows the clause, so it neither exports nor imports it again
+    assert not second.export([2, 4], 1)
+    second.inbox.put(((2, 4), 1))
+    first.export([2, 4, 6], 2)
+    assert second.receive() == [([2, 4, 6], 2)]
+    assert second.num_duplicates == 2
+
+
+def test_rate_limits():
+    first, second = exchanges(2, export_limit=2, import_limit=1)
+    assert first.export([2], 1) and first.export([4], 1)
+    assert not first.export([6], 1)
+    assert first.num_rate_limited == 1
+    assert second.receive() == [([2], 1)]
+    assert second.receive() == [([4], 1)]
+    first.receive() # A new interval
+    assert first.export([6], 1)
+
+
+def test_portfolio_shares_clauses():
+    holes = 5
+    var = lambda p, h: p * holes + h + 1
+    cnf = CNFFormula((holes + 1) * holes)
+    for p in range(holes + 1):
+        cnf.add_clause(Clause([var(p, h) for h in range(holes)]))
+    for h in range(holes):
+        for p in range(holes + 1):
+            for q in range(p + 1, holes + 1):
+                cnf.add_clause(Clause([-var(p, h), -var(q, h)]))
+    portfolio = Portfolio(cnf, num_workers=2, configs=diversify(2), sharing={'max_lbd': 4})
+    assert portfolio.solve() is False
+    assert portfolio.stats['exported_clauses'] > 0
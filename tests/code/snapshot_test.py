@@ -0,0 +1,83 @@
+from solver import cdcl_without_vsids
+from solver.cdcl import CDCL
+from solver.cnf import CNFFormula, Clause
+from solver.dimacs_parser import DIMACS_Parser
+from solver.drat import DRATWriter
+from solver.snapshot import Snapshot, save_formula, load_formula, save_checkpoint, load_checkpoint, HEADER
+import io
+import os
+import pytest
+
+CNF_FILES = os.path.join(os.path.dirname(__file__), '..', 'cnf_files')
+
+
+def pigeonhole(holes: int) -> CNFFormula:
+    var = lambda p, h: p * holes + h + 1
+    cnf = CNFFormula((holes + 1) * holes)
+    for p in range(holes + 1):
+        cnf.add_clause(Clause([var(p, h) for h in range(holes)]))
+    for h in range(holes):
+        for p in range(holes + 1):
+            for q in range(p + 1, holes + 1):
+                cnf.add_clause(Clause([-var(p, h), -var(q, h)]))
+    return cnf
+
+
+def test_formula_round_trip(tmp_path):
+    path = str(tmp_path / 'uf20-01.snap')
+    cnf = DIMACS_Parser(os.path.join(CNF_FILES, 'uf20-01.cnf')).cnf
+    save_formula(path, cnf)
+    loaded = load_formula(path)
+    assert isinstance(loaded.literals, memoryview) # The mapped arena is used in place
+    assert loaded.num_vars == cnf.num_vars and loaded.satisfiable == cnf.satisfiable
+    assert [loaded.clause_literals(i) for i in range(len(loaded))] == [cnf.clause_literals(i) for i in range(len(cnf))]
+    assert CDCL(loaded).solve() is True
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'formula.snap'
+    path.write_bytes(b'p cnf 1 1\n1 0\n' * 4)
+    with pytest.raises(ValueError, match='not a snapshot'):
+        Snapshot(str(path))
+
+    save_formula(str(path), pigeonhole(2))
+    with pytest.raises(ValueError, match='not a solver checkpoint'):
+        load_checkpoint(str(path))
+    data = bytearray(path.read_bytes())
+    magic, version, byte_order_mark, num_sections = HEADER.unpack_from(data)
+    HEADER.pack_into(data, 0, magic, 99, byte_order_mark, num_sections)
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match='version 99'):
+        Snapshot(str(path))
+
+
+def test_checkpoint_resumes(tmp_path):
+    path = str(tmp_path / 'checkpoint.snap')
+    solver = CDCL(pigeonhole(6))
+    assert solver.solve(max_conflicts=100) is None
+    solver.add_clause([1, 2, 3])
+    save_checkpoint(path, solver)
+
+    restored = load_checkpoint(path)
+    assert restored.num_conflicts == solver.num_conflicts == 100
+    assert [c.literals for c in restored.clause_db] == [c.literals for c in solver.clause_db]
+    assert [c.lbd for c in restored.clause_db] == [c.lbd for c in solver.clause_db]
+    assert [c.literals for c in restored.added_clauses] == [c.literals for c in solver.added_clauses]
+    assert restored.saved_phase == solver.saved_phase
+    assert list(restored.vsids.activity) == list(solver.vsids.activity)
+    assert restored.solve() is False
+
+
+def test_checkpoint_without_proof(tmp_path):
+    path = str(tmp_path / 'checkpoint.snap')
+    solver = CDCL(pigeonhole(3))
+    assert solver.solve(max_conflicts=1) is None
+    save_checkpoint(path, solver)
+    with pytest.raises(ValueError, match='DRAT'):
+        load_checkpoint(path, proof=DRATWriter(io.BytesIO()))
+
+
+def test_checkpoint_needs_vsids(tmp_path):
+    solver = cdcl_without_vsids.CDCL(pigeonhole(3))
+    with pytest.raises(ValueError, match='VSIDS'):
+        save_checkpoint(str(tmp_path / 'checkpoint.snap'), solver)